@@ -1,8 +1,9 @@
+from panoptes.etc.instrument import Measurement
 from panoptes.ling.english import Recognition
 
 
 class Deliberation(object):
-    def __init__(self, recognized, out=None):
+    def __init__(self, recognized, out=None, stats=None):
         self.recognized = recognized
         assert isinstance(self.recognized, Recognition)
 
@@ -10,6 +11,11 @@ class Deliberation(object):
         if self.out:
             assert isinstance(self.out, str)
 
+        # Measurement of where the time went (None if not instrumented).
+        self.stats = stats
+        if self.stats:
+            assert isinstance(self.stats, Measurement)
+
 
 class Agent(object):
     def reset(self):
@@ -36,3 +42,21 @@ class Agent(object):
         did.
         """
         raise NotImplementedError
+
+    def prefetch(self, texts):
+        """
+        texts ->
+
+        Hint that these texts are about to be put, so any per-text work can be
+        done up front in bulk.  Optional.
+        """
+        pass
+
+    def factory(self):
+        """
+        -> picklable callable that returns a new Agent
+
+        Used to build an equivalent fresh Agent in each worker process when
+        evaluating in parallel.
+        """
+        raise NotImplementedError
@@ -1,20 +1,32 @@
+from functools import partial
 from random import randint
 
 from panoptes.agent.agent import Agent, Deliberation
+from panoptes.etc.instrument import INSTRUMENT
 from panoptes.ling.english import English
 from panoptes.mind.mind import Mind
 
 
 class PhilosophicalZombie(Agent):
-    def __init__(self, verbose=True):
-        # Static state.
-        self.english = English()
+    def __init__(self, recog_cache_dir=None, instrument=False, budget=None):
+        # Static state.  The budget (a RecognitionBudget) bounds the work of
+        # recognizing each input (default: no limits).
+        self.english = English(recog_cache_dir=recog_cache_dir, budget=budget)
+        self.recog_cache_dir = recog_cache_dir
+        self.budget = budget
+
+        # Whether to time each stage of put() and attach it to the
+        # Deliberation.  The instrument is per process, so we switch it on or
+        # off for the length of each call of ours.
+        self.instrument = instrument
+
+        # Text -> Measurement of the work prefetch() did for it, to be counted
+        # when it is put.
+        self.text2prefetched = {}
 
         # Dynamic state.
         self.reset()
 
-        self.verbose = verbose
-
     def reset(self):
         self.mind = Mind()
         self.self_uid = self.mind.new_user()
@@ -22,14 +34,52 @@ class PhilosophicalZombie(Agent):
     def new_user(self):
         return self.mind.new_user()
 
+    def factory(self):
+        return partial(PhilosophicalZombie,
+                       recog_cache_dir=self.recog_cache_dir,
+                       instrument=self.instrument, budget=self.budget)
+
+    def prefetch(self, texts):
+        was_enabled = INSTRUMENT.enabled
+        INSTRUMENT.enabled = self.instrument
+        try:
+            text2stats = self.english.prefetch(texts)
+        finally:
+            INSTRUMENT.enabled = was_enabled
+        if self.instrument:
+            self.text2prefetched.update(text2stats)
+
     def put(self, from_uid, text):
-        recog = self.english.recognize(text, verbose=self.verbose)
-        delib = Deliberation(recog)
+        was_enabled = INSTRUMENT.enabled
+        INSTRUMENT.enabled = self.instrument
+        try:
+            return self.instrumented_put(from_uid, text)
+        finally:
+            INSTRUMENT.enabled = was_enabled
 
-        if not delib.recognized.dsens:
-            return delib
+    def instrumented_put(self, from_uid, text):
+        # Drop anything measured outside of our calls, but count the work
+        # prefetch() did for this text (parsing it) as part of it.
+        INSTRUMENT.take()
+        prefetched = self.text2prefetched.pop(text, None)
+        INSTRUMENT.add(prefetched)
+        t = INSTRUMENT.start()
+        delib = self.deliberate(from_uid, text)
+        INSTRUMENT.stop('put', t)
+
+        recog = delib.recognized
+        INSTRUMENT.count('parses', len(recog.parses))
+        INSTRUMENT.count('ssens', len(recog.ssens))
+        INSTRUMENT.count('dsens', len(recog.dsens))
+        delib.stats = INSTRUMENT.take()
+        return delib
+
+    def deliberate(self, from_uid, text):
+        recog = self.english.recognize(text)
+        delib = Deliberation(recog)
 
-        for dsen in delib.recognized.dsens:
+        for dsen in recog.dsens:
+            INSTRUMENT.count('dsens_tried')
             r = self.mind.overhear(dsen, [from_uid], [self.self_uid])
 
             # Returns None if it rejected the input dsen.
@@ -1,7 +1,10 @@
-import codecs
 from glob import glob
+import json
+import mmap
+import os
 
 from panoptes.dataset.dataset import Dataset, Task, Episode
+from panoptes.etc.atomic import atomic_write
 
 
 def int_from_fn(f):
@@ -33,34 +36,154 @@ def name_from_fn(f):
     assert False
 
 
-def task_from_fn(fn):
-    name = name_from_fn(fn)
-    episodes = []
+def pair_from_line(line):
+    """
+    line (without its line number) -> (input text, expected output or None)
+    """
+    ss = line.strip().split('\t')
+    if len(ss) == 1:
+        in_s, out_s = ss[0], None
+    elif len(ss) == 3:
+        in_s, out_s = ss[0], ss[1]
+        in_s = in_s.strip()
+    else:
+        assert False
+    return in_s, out_s
+
+
+def episode_from_text(text):
+    """
+    text of one episode's lines -> Episode
+    """
     pairs = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        x = line.find(' ')
+        pairs.append(pair_from_line(line[x + 1:]))
+    return Episode(pairs)
+
+
+def scan_episode_offsets(fn):
+    """
+    filename -> list of byte offsets where episodes start, plus end of file
+
+    Line numbers restart at 1 at the start of each episode.
+    """
+    offsets = []
     prev_n = None
-    with codecs.open(fn, encoding='utf-8') as f:
+    offset = 0
+    with open(fn, 'rb') as f:
         for line in f:
-            x = line.find(' ')
+            if not line.strip():
+                offset += len(line)
+                continue
+            x = line.find(b' ')
             n = int(line[:x])
-            line = line[x + 1:]
-            if n < prev_n:
-                episodes.append(Episode(pairs))
-                pairs = []
-            ss = line.strip().split('\t')
-            if len(ss) == 1:
-                in_s, out_s = ss[0], None
-            elif len(ss) == 3:
-                in_s, out_s = ss[0], ss[1]
-                in_s = in_s.strip()
-            else:
-                assert False
-            pairs.append((in_s, out_s))
+            if prev_n is None or n <= prev_n:
+                offsets.append(offset)
             prev_n = n
+            offset += len(line)
+    offsets.append(offset)
+    return offsets
+
+
+def index_fn(fn):
+    return fn + '.idx.json'
+
+
+def load_episode_offsets(fn):
+    """
+    filename -> list of byte offsets where episodes start, plus end of file
+
+    The offsets are kept in a sidecar file next to the task file, keyed on its
+    size and mtime, and rebuilt when either changes.  If the sidecar can't be
+    written, we just scan every time.
+    """
+    st = os.stat(fn)
+    key = {'size': st.st_size, 'mtime': st.st_mtime}
+
+    idx_f = index_fn(fn)
+    try:
+        with open(idx_f) as f:
+            j = json.load(f)
+        if j['key'] == key:
+            return j['offsets']
+    except (IOError, ValueError, KeyError):
+        pass
+
+    offsets = scan_episode_offsets(fn)
+    j = {'key': key, 'offsets': offsets}
+    try:
+        with atomic_write(idx_f) as f:
+            json.dump(j, f)
+    except (IOError, OSError):
+        pass
+    return offsets
+
+
+class LazyEpisodes(object):
+    """
+    The Episodes of a bAbI task file, read on demand.
+
+    Acts like a read-only list of Episode.  Only the bytes of the episodes you
+    ask for are read (through an mmap) and parsed, so counting, slicing, and
+    sharding a big task file is cheap.
+    """
+
+    def __init__(self, fn, offsets):
+        self.fn = fn
+        self.offsets = offsets
+        self.mm = None
+
+    @staticmethod
+    def from_fn(fn):
+        return LazyEpisodes(fn, load_episode_offsets(fn))
+
+    def __getstate__(self):
+        return {'fn': self.fn, 'offsets': self.offsets, 'mm': None}
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def get(self, i):
+        """
+        episode index -> Episode
+        """
+        if self.mm is None:
+            with open(self.fn, 'rb') as f:
+                self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        begin = self.offsets[i]
+        end = self.offsets[i + 1]
+        text = self.mm[begin:end].decode('utf-8')
+        return episode_from_text(text)
+
+    def __getitem__(self, x):
+        if isinstance(x, slice):
+            return [self.get(i) for i in range(*x.indices(len(self)))]
+
+        if x < 0:
+            x += len(self)
+        if not 0 <= x < len(self):
+            raise IndexError('Episode index out of range: %d' % x)
+        return self.get(x)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.get(i)
+
+
+def task_from_fn(fn):
+    name = name_from_fn(fn)
+    episodes = LazyEpisodes.from_fn(fn)
     return Task(name, episodes)
 
 
-def load_babi(d):
-    ff = glob(d + '/*test.txt')
+def load_babi(d, split='test'):
+    """
+    dir, 'train' or 'test' -> Dataset of that split's tasks
+    """
+    ff = glob(d + '/*_%s.txt' % split)
     nn_ff = [(int_from_fn(f), f) for f in ff]
     nn_ff.sort()
     tasks = []
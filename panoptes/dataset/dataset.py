@@ -1,4 +1,9 @@
 from collections import defaultdict
+from functools import partial
+
+from panoptes.dataset.latency import LatencyReport
+from panoptes.dataset.parallel import each_prefetch_window, map_episodes
+from panoptes.etc.trace import INFO, TRACE
 
 
 class Episode(object):
@@ -16,27 +21,141 @@ class Episode(object):
             if out:
                 print('        > %s' % out.encode('utf-8'))
 
-    def evaluate(self, agent, uid):
+    def inputs(self):
+        return [in_s for in_s, _ in self.pairs]
+
+    def evaluate(self, agent, uid, results, episode_index=None):
         """
-        Agent -> (num correct tests, num tests, list of Deliberation)
+        Agent, user ID, TaskResults, episode index ->
+
+        Put each input to the agent, folding each Deliberation into the results
+        as we go rather than holding on to them.
         """
-        print('\t\t\tEVAL' + '-' * 80)
-        correct = 0
-        total = 0
-        delibs = []
+        tracing = TRACE.enabled(INFO)
+        if tracing:
+            TRACE.emit(INFO, 'eval.episode', num_pairs=len(self.pairs))
         for in_s, expect_out in self.pairs:
-            print('\t\t\tEVAL INPUT:', in_s)
             delib = agent.put(uid, in_s)
-            delibs.append(delib)
-            if expect_out:
-                print('\t\t\tEVAL EXPECTED OUTPUT: (%s)' % expect_out)
-            if delib.out:
-                print('\t\t\tEVAL GOT OUTPUT: (%s)' % delib.out)
-            if expect_out is not None:
-                correct += expect_out == delib.out
-                total += 1
-                # assert expect_out == delib.out
-        return correct, total, delibs
+            if tracing:
+                TRACE.emit(INFO, 'eval.input', text=in_s, expected=expect_out,
+                           got=delib.out)
+            results.add(episode_index, in_s, expect_out, delib)
+
+
+def each_input(episodes):
+    for episode in episodes:
+        for in_s in episode.inputs():
+            yield in_s
+
+
+class Failure(object):
+    """
+    An input whose output was not what was expected.
+    """
+
+    def __init__(self, episode_index, in_s, expect_out, delib):
+        self.episode_index = episode_index
+        self.in_s = in_s
+        self.expect_out = expect_out
+        self.delib = delib
+
+
+class TaskResults(object):
+    """
+    Running totals of how an Agent did on a Task.
+
+    Updated one Deliberation at a time, keeping only counts (and, if asked,
+    the Deliberations of the failures), so memory use doesn't grow with the
+    number of inputs.  Results of disjoint runs can be merged.
+    """
+
+    def __init__(self, name, keep_failures=False):
+        self.name = name
+        self.keep_failures = keep_failures
+
+        self.correct = 0
+        self.total = 0
+
+        # Number of candidates -> number of inputs that had that many.  (How
+        # many deep ones an agent got to is the 'dsens_tried' latency counter.)
+        self.num_parses2count = defaultdict(int)
+        self.num_ssens2count = defaultdict(int)
+        self.num_dsens2count = defaultdict(int)
+
+        self.latency = LatencyReport()
+
+        self.failures = []
+
+    def add(self, episode_index, in_s, expect_out, delib):
+        """
+        episode index, input, expected output, Deliberation ->
+        """
+        r = delib.recognized
+        self.num_parses2count[len(r.parses)] += 1
+        self.num_ssens2count[len(r.ssens)] += 1
+        self.num_dsens2count[len(r.dsens)] += 1
+
+        if delib.stats:
+            self.latency.add(delib.stats)
+
+        if expect_out is None:
+            return
+
+        self.total += 1
+        if expect_out == delib.out:
+            self.correct += 1
+        elif self.keep_failures:
+            self.failures.append(
+                Failure(episode_index, in_s, expect_out, delib))
+
+    def merge(self, other):
+        """
+        TaskResults of the episodes after ours ->
+        """
+        self.correct += other.correct
+        self.total += other.total
+        for n, count in other.num_parses2count.items():
+            self.num_parses2count[n] += count
+        for n, count in other.num_ssens2count.items():
+            self.num_ssens2count[n] += count
+        for n, count in other.num_dsens2count.items():
+            self.num_dsens2count[n] += count
+        self.latency.merge(other.latency)
+        self.failures += other.failures
+
+    def accuracy(self):
+        return float(self.correct) / self.total
+
+    def dump(self, out):
+        """
+        output file ->
+
+        Write the accuracy and the distributions of candidate counts.
+        """
+        line = '-- %s (%.3f%%)\n' % (self.name, self.accuracy() * 100.0)
+        out.write(line)
+
+        for label, n2count in [('parse', self.num_parses2count),
+                               ('surface', self.num_ssens2count),
+                               ('deep', self.num_dsens2count)]:
+            out.write('   * %s\n' % label)
+            for length in sorted(n2count):
+                line = '     * %d (%d)\n' % (length, n2count[length])
+                out.write(line)
+
+
+def evaluate_episode(keep_failures, agent, episode_index, episode):
+    """
+    (keep failures, Agent, episode index, Episode) -> TaskResults
+
+    Run one episode from a clean slate.  Used by the worker processes of
+    Dataset.evaluate().
+    """
+    agent.reset()
+    uid = agent.new_user()
+    results = TaskResults(None, keep_failures)
+    episode.evaluate(agent, uid, results, episode_index)
+    return results
 
 
 class Task(object):
@@ -66,34 +185,21 @@ class Task(object):
             print()
             e.show()
 
-    def evaluate(self, agent, max_num_episodes):
+    def evaluate(self, agent, max_num_episodes, keep_failures=False):
         """
-        Agent -> accuracy, list of stats
+        Agent, max num episodes, keep failures -> TaskResults
         """
-        correct = 0
-        total = 0
-        delibs = []
-        for i, episode in enumerate(self.episodes):
-            if i == max_num_episodes:
-                break
-            agent.reset()
-            uid = agent.new_user()
-            a, b, sub_delibs = episode.evaluate(agent, uid)
-            correct += a
-            total += b
-            delibs += sub_delibs
-        return float(correct) / total, delibs
-
-
-def distribution(nn):
-    d = defaultdict(int)
-    for n in nn:
-        d[n] += 1
-    rr = []
-    for n in sorted(d):
-        c = d[n]
-        rr.append((n, c))
-    return rr
+        episodes = self.episodes[:max_num_episodes]
+        results = TaskResults(self.name, keep_failures)
+        i = 0
+        for window in each_prefetch_window(episodes):
+            agent.prefetch(each_input(window))
+            for episode in window:
+                agent.reset()
+                uid = agent.new_user()
+                episode.evaluate(agent, uid, results, i)
+                i += 1
+        return results
 
 
 class Dataset(object):
@@ -126,44 +232,67 @@ class Dataset(object):
         for i, task in enumerate(self.tasks):
             task.preview(i + 1, num_episodes_to_show)
 
-    def evaluate(self, agent, max_num_episodes=None, out=None):
-        accs = []
-        delibs_per_task = []
-        for i, task in enumerate(self.tasks):
-            if i < 0:
-                continue
-            acc, delibs = task.evaluate(agent, max_num_episodes)
-            accs.append(acc)
-            delibs_per_task.append(delibs)
+    def evaluate_serial(self, agent, max_num_episodes, keep_failures):
+        """
+        Agent, max num episodes, keep failures -> list of TaskResults
+        """
+        return [t.evaluate(agent, max_num_episodes, keep_failures)
+                for t in self.tasks]
 
-        if out:
-            names = [t.name for t in self.tasks]
+    def evaluate_parallel(self, agent, max_num_episodes, keep_failures,
+                          workers):
+        """
+        Agent, max num episodes, keep failures, num workers
+            -> list of TaskResults
 
-            for name, acc, delibs in zip(names, accs, delibs_per_task):
-                line = '-- %s (%.3f%%)\n' % (name, acc * 100.0)
-                out.write(line)
+        Each worker process builds its own copy of the agent.
+        """
+        episodes_per_task = \
+            [t.episodes[:max_num_episodes] for t in self.tasks]
+        func = partial(evaluate_episode, keep_failures)
+        results_per_task = map_episodes(
+            agent.factory(), workers, func, episodes_per_task)
+        rr = []
+        for task, episode_results in zip(self.tasks, results_per_task):
+            results = TaskResults(task.name, keep_failures)
+            for sub_results in episode_results:
+                results.merge(sub_results)
+            rr.append(results)
+        return rr
+
+    def evaluate_results(self, agent, max_num_episodes=None,
+                         keep_failures=False, workers=None):
+        """
+        Agent, max num episodes, keep failures, num worker processes
+            -> list of TaskResults
 
-                parses = []
-                ssens = []
-                dsens = []
-                for d in delibs:
-                    parses.append(len(d.recognized.parses))
-                    ssens.append(len(d.recognized.ssens))
-                    dsens.append(len(d.recognized.dsens))
-
-                out.write('   * parse\n')
-                for length, count in distribution(parses):
-                    line = '     * %d (%d)\n' % (length, count)
-                    out.write(line)
-
-                out.write('   * surface\n')
-                for length, count in distribution(ssens):
-                    line = '     * %d (%d)\n' % (length, count)
-                    out.write(line)
-
-                out.write('   * deep\n')
-                for length, count in distribution(dsens):
-                    line = '     * %d (%d)\n' % (length, count)
-                    out.write(line)
+        If workers is given, episodes are spread across that many processes.
+        Results are merged in episode order, so they match a serial run.
+        """
+        if workers and 1 < workers:
+            return self.evaluate_parallel(
+                agent, max_num_episodes, keep_failures, workers)
+        else:
+            return self.evaluate_serial(
+                agent, max_num_episodes, keep_failures)
+
+    def evaluate(self, agent, max_num_episodes=None, out=None, workers=None):
+        """
+        Agent, max num episodes, output file, num worker processes
+            -> mean accuracy
+
+        See evaluate_results().  If the agent attaches stage timings to its
+        Deliberations, latency percentiles per stage and per task are written
+        after the rest.
+        """
+        rr = self.evaluate_results(
+            agent, max_num_episodes, workers=workers)
+
+        if out:
+            for results in rr:
+                results.dump(out)
+            for results in rr:
+                results.latency.dump(results.name, out)
 
+        accs = [results.accuracy() for results in rr]
         return float(sum(accs)) / len(accs)
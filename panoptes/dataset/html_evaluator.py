@@ -1,7 +1,11 @@
+from functools import partial
+from io import StringIO
 import os
 import shutil
 
+from panoptes.dataset.dataset import each_input
 from panoptes.dataset.evaluator import Evaluator
+from panoptes.dataset.parallel import each_prefetch_window, map_episodes
 
 
 class HtmlEvaluator(Evaluator):
@@ -126,7 +130,7 @@ body {
                 len(delib.recognized.parses), len(delib.recognized.ssens),
                 len(delib.recognized.dsens), in_s.encode('utf-8'))
             """
-            line = in_s.encode('utf-8')
+            line = in_s
             if want_out or delib.out:
                 if want_out == delib.out:
                     line += ' %s' % want_out
@@ -157,11 +161,15 @@ body {
                 episodes = task.episodes[:episodes_per_task]
             correct = 0
             total = 0
-            for i, episode in enumerate(episodes):
-                sub_correct, sub_total = \
-                    self.evaluate_episode(agent, i, episode, out)
-                correct += sub_correct
-                total += sub_total
+            i = 0
+            for window in each_prefetch_window(episodes):
+                agent.prefetch(each_input(window))
+                for episode in window:
+                    sub_correct, sub_total = \
+                        self.evaluate_episode(agent, i, episode, out)
+                    correct += sub_correct
+                    total += sub_total
+                    i += 1
             self.dump_task_foot(out)
             return correct, total
         except:
@@ -169,24 +177,87 @@ body {
                 raise
             return 0, 1
 
-    def evaluate(self, agent, dataset, episodes_per_task=None,
-                 die_on_error=False):
-        root = 'data/evaluation/%s/' % dataset.name
-        if os.path.exists(root):
-            shutil.rmtree(root)
-        os.makedirs(root)
-        dataset.overview()
+    def render_episode(self, die_on_error, agent, episode_index, episode):
+        """
+        (die on error, Agent, episode index, Episode)
+            -> (correct, total, HTML) or None if it raised
+
+        Evaluate an episode into a standalone fragment of the task page.  Used
+        by the worker processes of a parallel evaluation.
+        """
+        out = StringIO()
+        try:
+            correct, total = \
+                self.evaluate_episode(agent, episode_index, episode, out)
+        except:
+            if die_on_error:
+                raise
+            return None
+        return correct, total, out.getvalue()
+
+    def write_task(self, episode_results, out):
+        """
+        list of results of render_episode(), output file -> (correct, total)
+
+        Assemble a task page from its episode fragments.  Like evaluate_task(),
+        the first episode that raised ends the page and fails the task.
+        """
+        self.dump_task_head(out)
+        correct = 0
+        total = 0
+        for r in episode_results:
+            if r is None:
+                return 0, 1
+            sub_correct, sub_total, html = r
+            out.write(html)
+            correct += sub_correct
+            total += sub_total
+        self.dump_task_foot(out)
+        return correct, total
+
+    def evaluate_serial(self, agent, dataset, episodes_per_task, root,
+                        die_on_error):
         results = []
         for i, task in enumerate(dataset.tasks):
             fn = root + '%02d_%s.html' % (i + 1, task.name)
-            with open(fn, 'wb') as out:
+            with open(fn, 'w') as out:
                 correct, total = \
                     self.evaluate_task(
                         agent, task, episodes_per_task, out, die_on_error)
                 results.append((correct, total))
+        return results
+
+    def evaluate_parallel(self, agent, dataset, episodes_per_task, root,
+                          die_on_error, workers):
+        func = partial(self.render_episode, die_on_error)
+        episodes = [t.episodes[:episodes_per_task] for t in dataset.tasks]
+        episode_results_per_task = \
+            map_episodes(agent.factory(), workers, func, episodes)
+        results = []
+        for i, (task, episode_results) in \
+                enumerate(zip(dataset.tasks, episode_results_per_task)):
+            fn = root + '%02d_%s.html' % (i + 1, task.name)
+            with open(fn, 'w') as out:
+                correct, total = self.write_task(episode_results, out)
+                results.append((correct, total))
+        return results
+
+    def evaluate(self, agent, dataset, episodes_per_task=None,
+                 die_on_error=False, workers=None):
+        root = 'data/evaluation/%s/' % dataset.name
+        if os.path.exists(root):
+            shutil.rmtree(root)
+        os.makedirs(root)
+        dataset.overview()
+        if workers and 1 < workers:
+            results = self.evaluate_parallel(
+                agent, dataset, episodes_per_task, root, die_on_error, workers)
+        else:
+            results = self.evaluate_serial(
+                agent, dataset, episodes_per_task, root, die_on_error)
 
         fn = root + 'overview.html'
-        with open(fn, 'wb') as out:
+        with open(fn, 'w') as out:
             self.dump_overview_head(out)
             out.write('<table>')
             for i, ((correct, total), task) in \
@@ -0,0 +1,164 @@
+from math import ceil, log
+
+
+# The order to list pipeline stages in.  Others follow in sorted order.
+# Prefetched texts are parsed (table, spacy, fixed) under 'prefetch' instead of
+# under 'put'.
+STAGES = ['put', 'prefetch', 'table', 'spacy', 'fixed', 'surface', 'deep',
+          'decode', 'handle']
+
+
+# Percentiles to report.
+PERCENTILES = [50, 95, 99]
+
+
+# Ratio between the bounds of each bucket of a timing Histogram.  A
+# percentile is reported to within (GAMMA - 1) / (GAMMA + 1), about 1%.
+GAMMA = 1.02
+
+
+class Histogram(object):
+    """
+    Counts of values per bucket, to report percentiles of them in space that
+    doesn't grow with the number of values.
+
+    Without gamma, each value is its own bucket (for small ints, like
+    counts).  With it, positive values go in logarithmic buckets, each gamma
+    times as wide as the one before, and are reported as the middle of theirs.
+    Zeros aren't kept: they are however many of the values the caller says
+    there were that weren't added.
+    """
+
+    def __init__(self, gamma=None):
+        self.gamma = gamma
+        self.log_gamma = log(gamma) if gamma else None
+        self.bucket2n = {}
+
+    def bucket(self, x):
+        if self.gamma is None:
+            return x
+        return int(ceil(log(x) / self.log_gamma))
+
+    def value(self, bucket):
+        if self.gamma is None:
+            return bucket
+        return 2.0 * self.gamma ** bucket / (self.gamma + 1)
+
+    def add(self, x):
+        """
+        value ->
+        """
+        if not x:
+            return
+        b = self.bucket(x)
+        self.bucket2n[b] = self.bucket2n.get(b, 0) + 1
+
+    def merge(self, other):
+        """
+        Histogram (with the same gamma) ->
+        """
+        for b, n in other.bucket2n.items():
+            self.bucket2n[b] = self.bucket2n.get(b, 0) + n
+
+    def percentiles(self, num_values, pp):
+        """
+        total number of values (any not added were zero), percentiles
+            -> list of value (nearest-rank)
+        """
+        num_zeros = num_values - self.num_nonzero()
+        bb = sorted(self.bucket2n)
+        rr = []
+        for p in pp:
+            rank = int(ceil(num_values * p / 100.0))
+            rank = min(max(rank, 1), num_values)
+            if rank <= num_zeros:
+                rr.append(0)
+                continue
+            rank -= num_zeros
+            for b in bb:
+                rank -= self.bucket2n[b]
+                if rank <= 0:
+                    rr.append(self.value(b))
+                    break
+        return rr
+
+    def num_nonzero(self):
+        return sum(self.bucket2n.values())
+
+
+def ordered(names):
+    known = [s for s in STAGES if s in names]
+    rest = sorted(set(names) - set(STAGES))
+    return known + rest
+
+
+class LatencyReport(object):
+    """
+    Aggregates the per-input Measurements attached to Deliberations into
+    latency percentiles per stage, for one task.
+
+    An input that never reached a stage (eg, spacy on a cache hit) counts as
+    zero time for it, so the percentiles of every stage are over the same
+    inputs.  Values are kept in Histograms, so its size doesn't grow with the
+    number of inputs: counters are exact, timings are to within about 1%.
+    """
+
+    def __init__(self):
+        self.num_inputs = 0
+        self.stage2hist = {}
+        self.counter2hist = {}
+
+    def add(self, m):
+        """
+        Measurement ->
+        """
+        self.num_inputs += 1
+        for stage, secs in m.stage2secs.items():
+            if stage not in self.stage2hist:
+                self.stage2hist[stage] = Histogram(GAMMA)
+            self.stage2hist[stage].add(secs)
+        for counter, n in m.counter2n.items():
+            if counter not in self.counter2hist:
+                self.counter2hist[counter] = Histogram()
+            self.counter2hist[counter].add(n)
+
+    def merge(self, other):
+        """
+        LatencyReport ->
+        """
+        self.num_inputs += other.num_inputs
+        for name2hist, other_name2hist in [
+                (self.stage2hist, other.stage2hist),
+                (self.counter2hist, other.counter2hist)]:
+            for name, hist in other_name2hist.items():
+                if name not in name2hist:
+                    name2hist[name] = Histogram(hist.gamma)
+                name2hist[name].merge(hist)
+
+    def summarize(self, hist):
+        return hist.percentiles(self.num_inputs, PERCENTILES)
+
+    def dump(self, name, out):
+        """
+        task name, output file ->
+
+        Write a table of stage timings (in ms) and counters, if there were any
+        measurements.
+        """
+        if not self.num_inputs:
+            return
+
+        header = ' '.join(['p%d' % p for p in PERCENTILES])
+        out.write('-- %s (%d inputs)\n' % (name, self.num_inputs))
+
+        out.write('   * latency (ms): %s\n' % header)
+        for stage in ordered(self.stage2hist):
+            ms = self.summarize(self.stage2hist[stage])
+            ss = ['%.3f' % (x * 1000.0) for x in ms]
+            out.write('     * %s: %s\n' % (stage, ' '.join(ss)))
+
+        out.write('   * counts: %s\n' % header)
+        for counter in sorted(self.counter2hist):
+            nn = self.summarize(self.counter2hist[counter])
+            ss = ['%d' % x for x in nn]
+            out.write('     * %s: %s\n' % (counter, ' '.join(ss)))
@@ -0,0 +1,116 @@
+from multiprocessing import Pool
+
+from panoptes.etc.trace import TRACE
+
+
+# How many jobs to cut each task into per worker.  More jobs balance the load
+# better when episodes vary in length, at the cost of more pickling.
+JOBS_PER_WORKER = 4
+
+
+# Most inputs to prefetch at once.  Well under the size of the agent's
+# in-memory recognition cache (English's recog_cache_size), so nothing that is
+# prefetched gets evicted before it is put.
+PREFETCH_INPUTS = 1024
+
+
+# The Agent owned by this worker process (built once by init_worker()).
+_AGENT = None
+
+
+def init_worker(agent_factory):
+    """
+    agent factory ->
+
+    Build this worker process's Agent.  Pool workers exit without running
+    atexit handlers, so each job flushes its traces (see run_job()).
+    """
+    global _AGENT
+    TRACE.discard()
+    _AGENT = agent_factory()
+
+
+def run_job(job):
+    """
+    (per-episode function, first episode index, list of Episode)
+        -> list of per-episode results
+    """
+    func, start, episodes = job
+    rr = []
+    try:
+        for window in each_prefetch_window(episodes):
+            _AGENT.prefetch([s for e in window for s in e.inputs()])
+            for episode in window:
+                r = func(_AGENT, start + len(rr), episode)
+                rr.append(r)
+    finally:
+        TRACE.flush()
+    return rr
+
+
+def each_prefetch_window(episodes, max_inputs=PREFETCH_INPUTS):
+    """
+    list of Episode, max number of inputs -> yields list of Episode
+
+    Split into contiguous runs of episodes with at most max_inputs inputs in
+    all (or of one episode, if it has more), to prefetch one at a time.
+    """
+    window = []
+    num_inputs = 0
+    for episode in episodes:
+        n = len(episode.pairs)
+        if window and max_inputs < num_inputs + n:
+            yield window
+            window = []
+            num_inputs = 0
+        window.append(episode)
+        num_inputs += n
+    if window:
+        yield window
+
+
+def each_slice(items, num_slices):
+    """
+    list, max number of slices -> yields (start index, sublist)
+
+    Split into contiguous slices of nearly equal size.
+    """
+    num_slices = max(min(num_slices, len(items)), 1)
+    size, extra = divmod(len(items), num_slices)
+    start = 0
+    for i in range(num_slices):
+        end = start + size + (i < extra)
+        if start < end:
+            yield start, items[start:end]
+        start = end
+
+
+def map_episodes(agent_factory, num_workers, func, episodes_per_task):
+    """
+    (agent factory, number of worker processes, per-episode function,
+     list of list of Episode) -> list of list of per-episode results
+
+    Call func(agent, episode index, episode) on every episode across a pool of
+    worker processes, each of which builds its own Agent with agent_factory.
+
+    Episodes share no state (each starts with Agent.reset()), so they can be
+    run anywhere in any order.  Results are returned in input order, so merging
+    them gives the same answer as a serial run.
+    """
+    jobs = []
+    task_indexes = []
+    for task_index, episodes in enumerate(episodes_per_task):
+        num_slices = num_workers * JOBS_PER_WORKER
+        for start, sub_episodes in each_slice(episodes, num_slices):
+            jobs.append((func, start, sub_episodes))
+            task_indexes.append(task_index)
+
+    # Write out our own traces first, so the workers don't inherit them.
+    TRACE.flush()
+    with Pool(num_workers, init_worker, (agent_factory,)) as pool:
+        job_results = pool.map(run_job, jobs, chunksize=1)
+
+    rrr = [[] for _ in episodes_per_task]
+    for task_index, rr in zip(task_indexes, job_results):
+        rrr[task_index] += rr
+    return rrr
@@ -0,0 +1,35 @@
+from contextlib import contextmanager
+import os
+
+
+@contextmanager
+def atomic_write(f, mode='w'):
+    """
+    output file, mode ('w' or 'wb') -> context of the open file to write
+
+    Write to a temporary file next to f, then rename it over f if the block
+    exits cleanly (or remove it if not), so readers see the old contents or
+    the new, never part of them.
+
+    The file gets the usual permissions of a new file (0666 less the umask),
+    like open() would give it, and not mkstemp()'s 0600.
+    """
+    d = os.path.dirname(f) or '.'
+    base = os.path.basename(f)
+    while True:
+        tmp_f = os.path.join(d, '.%s.%d.%s.tmp' % (
+            base, os.getpid(), os.urandom(4).hex()))
+        try:
+            fd = os.open(tmp_f, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+            break
+        except FileExistsError:
+            continue
+
+    try:
+        with os.fdopen(fd, mode) as out:
+            yield out
+        os.replace(tmp_f, f)
+    except BaseException:
+        if os.path.exists(tmp_f):
+            os.remove(tmp_f)
+        raise
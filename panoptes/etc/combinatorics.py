@@ -1,9 +1,17 @@
 from collections import defaultdict
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 def collapse_int_tuples_to_wildcards(tuples, num_options_per_field):
     """
-    int tuples, num options per field -> tuples with wildcards
+    int tuples, num options per field -> tuples with wildcards (sorted lists)
+
+    A field's wildcard is num options.  Greedy: each pass collapses the field
+    that removes the most tuples, until none helps.
     """
     while True:
         best_new_tuples = tuples
@@ -43,7 +51,7 @@ def collapse_int_tuples_to_wildcards(tuples, num_options_per_field):
             break
 
         tuples = best_new_tuples
-    return tuples
+    return sorted(map(list, tuples))
 
 
 def expand_helper(nn, num_options_per_field, index):
@@ -70,3 +78,121 @@ def expand_int_tuples_from_wildcards(tuples, num_options_per_field):
         for r in expand_helper(nn, num_options_per_field, 0):
             rr.append(r)
     return rr
+
+
+def radix_muls(num_options_per_field):
+    """
+    num options per field -> place value of each field in a packed int, or
+    None if packed ints wouldn't fit in an int64
+
+    Field 0 is least significant, and each field has a slot for its wildcard.
+    """
+    muls = []
+    mul = 1
+    for z in num_options_per_field:
+        muls.append(mul)
+        mul *= z + 1
+    if (1 << 63) <= mul:
+        return None
+    return muls
+
+
+def pack_int_tuples(tuples, muls):
+    """
+    int tuples, place values -> array of packed int
+    """
+    a = numpy.array(tuples, dtype=numpy.int64).reshape(-1, len(muls))
+    return a.dot(numpy.array(muls, dtype=numpy.int64))
+
+
+def unpack_int_tuples(a, num_options_per_field, muls):
+    """
+    array of packed int, num options per field, place values -> 2D array
+    """
+    bases = numpy.array(num_options_per_field, dtype=numpy.int64) + 1
+    return a[:, None] // numpy.array(muls, dtype=numpy.int64) % bases
+
+
+def collapse_field_numpy(a, z, mul):
+    """
+    array of packed int, num options of the field, its place value -> array of
+    packed int
+
+    One greedy step of collapse_int_tuples_to_wildcards() for one field.
+    """
+    option = a // mul % (z + 1)
+    is_done = option == z
+    uniq = numpy.unique(a[~is_done])
+    wildcarded = uniq + (z - uniq // mul % (z + 1)) * mul
+    keys, inverse, counts = numpy.unique(
+        wildcarded, return_inverse=True, return_counts=True)
+    is_full = counts == z
+    return numpy.concatenate(
+        [a[is_done], keys[is_full], uniq[~is_full[inverse]]])
+
+
+def collapse_int_tuples_to_wildcards_numpy(tuples, num_options_per_field):
+    """
+    int tuples, num options per field -> tuples with wildcards (sorted lists)
+
+    Same as collapse_int_tuples_to_wildcards(), on arrays of packed ints.
+    Needs numpy.
+    """
+    muls = radix_muls(num_options_per_field)
+    assert muls is not None
+    a = pack_int_tuples(tuples, muls)
+    while True:
+        best = a
+        for z, mul in zip(num_options_per_field, muls):
+            new = collapse_field_numpy(a, z, mul)
+            if len(new) < len(best):
+                best = new
+
+        if best is a:
+            break
+
+        a = best
+    rows = unpack_int_tuples(a, num_options_per_field, muls)
+    return sorted(rows.tolist())
+
+
+def expand_int_tuples_from_wildcards_numpy(tuples, num_options_per_field):
+    """
+    int tuples, num options per field -> tuples without wildcards
+
+    Same as expand_int_tuples_from_wildcards() (in the same order), expanding
+    one field at a time over an array of all the tuples.  Needs numpy.
+
+    Nothing expands at runtime (verbs are decoded with their wildcards), so
+    this is only used to check the collapsed tables, by
+    scripts/bench_combinatorics.py.
+    """
+    rows = numpy.array(tuples, dtype=numpy.int64).reshape(
+        -1, len(num_options_per_field))
+    for field_index, z in enumerate(num_options_per_field):
+        is_wild = rows[:, field_index] == z
+        if not is_wild.any():
+            continue
+        reps = numpy.where(is_wild, z, 1)
+        rows = numpy.repeat(rows, reps, axis=0)
+        starts = numpy.repeat(numpy.cumsum(reps) - reps, reps)
+        offsets = numpy.arange(len(rows)) - starts
+        is_wild = numpy.repeat(is_wild, reps)
+        rows[is_wild, field_index] = offsets[is_wild]
+    return rows.tolist()
+
+
+def can_use_numpy(num_options_per_field):
+    return numpy is not None and radix_muls(num_options_per_field) is not None
+
+
+def collapse_int_tuples_to_wildcards_fast(tuples, num_options_per_field):
+    """
+    int tuples, num options per field -> tuples with wildcards (sorted lists)
+
+    With numpy if it's installed, else in pure Python.
+    """
+    if can_use_numpy(num_options_per_field):
+        return collapse_int_tuples_to_wildcards_numpy(
+            tuples, num_options_per_field)
+    return collapse_int_tuples_to_wildcards(tuples, num_options_per_field)
@@ -0,0 +1,33 @@
+from copy import copy
+
+
+class Frozen(object):
+    """
+    An object whose fields are each set once (in the constructor) and never
+    changed, so it can be shared instead of copied.
+
+    Subclasses list their fields in __slots__.  To change something, make a
+    new object with replace(), which shares all the other fields.  Fields that
+    are lists are shared too, so treat them as read-only.
+    """
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        if hasattr(self, name):
+            raise AttributeError('%s is frozen (tried to set %s)' % (
+                self.__class__.__name__, name))
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError('%s is frozen (tried to delete %s)' % (
+            self.__class__.__name__, name))
+
+    def replace(self, **name2value):
+        """
+        field name -> new value -> copy with those fields replaced
+        """
+        r = copy(self)
+        for name, value in name2value.items():
+            object.__setattr__(r, name, value)
+        return r
@@ -0,0 +1,86 @@
+from collections import defaultdict
+from time import monotonic
+
+
+class Measurement(object):
+    """
+    Time spent per stage and counts per counter over some span of work (eg, one
+    input to an Agent).
+    """
+
+    def __init__(self, stage2secs, counter2n):
+        self.stage2secs = stage2secs
+        self.counter2n = counter2n
+
+    def dump(self):
+        return {
+            'stage2secs': self.stage2secs,
+            'counter2n': self.counter2n,
+        }
+
+
+class Instrument(object):
+    """
+    Stage timers and counters for the recognize -> decode -> handle pipeline.
+
+    Off by default.  When off, start() returns None and stop() and count()
+    return right away, so leaving the calls in hot code costs next to nothing.
+
+        t = INSTRUMENT.start()
+        ...
+        INSTRUMENT.stop('deep', t)
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.stage2secs = defaultdict(float)
+        self.counter2n = defaultdict(int)
+
+    def start(self):
+        """
+        -> start time, or None if disabled
+        """
+        if not self.enabled:
+            return None
+        return monotonic()
+
+    def stop(self, stage, t):
+        """
+        stage name, start time from start() ->
+        """
+        if t is None:
+            return
+        self.stage2secs[stage] += monotonic() - t
+
+    def count(self, counter, n=1):
+        if not self.enabled:
+            return
+        self.counter2n[counter] += n
+
+    def add(self, m):
+        """
+        Measurement or None ->
+
+        Fold work measured elsewhere (see take()) into the running totals.
+        """
+        if not self.enabled or m is None:
+            return
+        for stage, secs in m.stage2secs.items():
+            self.stage2secs[stage] += secs
+        for counter, n in m.counter2n.items():
+            self.counter2n[counter] += n
+
+    def take(self):
+        """
+        -> Measurement of everything since the last take(), or None if disabled
+        """
+        if not self.enabled:
+            return None
+        m = Measurement(dict(self.stage2secs), dict(self.counter2n))
+        self.stage2secs.clear()
+        self.counter2n.clear()
+        return m
+
+
+# The instrument for this process.
+INSTRUMENT = Instrument()
@@ -0,0 +1,47 @@
+class SuffixTrieNode(object):
+    """
+    Node of a SuffixTrie.
+    """
+
+    __slots__ = ('values', 'char2child')
+
+    def __init__(self):
+        self.values = []
+        self.char2child = {}
+
+
+class SuffixTrie(object):
+    """
+    Trie of reversed strings, for finding the values of every added suffix that
+    a given string ends with, in time linear in the length of the string.
+
+    Example: append-suffix of a conjugation -> the ways to undo it.
+    """
+
+    def __init__(self):
+        self.root = SuffixTrieNode()
+
+    def add(self, suffix, value):
+        node = self.root
+        for c in reversed(suffix):
+            child = node.char2child.get(c)
+            if child is None:
+                child = SuffixTrieNode()
+                node.char2child[c] = child
+            node = child
+        node.values.append(value)
+
+    def get(self, s):
+        """
+        string -> list of values of the added suffixes it ends with
+
+        In order of suffix length, then order added.
+        """
+        rr = list(self.root.values)
+        node = self.root
+        for c in reversed(s):
+            node = node.char2child.get(c)
+            if node is None:
+                break
+            rr += node.values
+        return rr
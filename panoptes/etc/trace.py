@@ -0,0 +1,160 @@
+import atexit
+import json
+import sys
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# Trace levels.  Events at or above the tracer's level are emitted.
+DEBUG = 10
+INFO = 20
+OFF = 100
+
+
+LEVEL2NAME = {
+    DEBUG: 'DEBUG',
+    INFO: 'INFO',
+}
+
+
+class TextSink(object):
+    """
+    Writes events as human-readable text (eg, to the terminal).
+    """
+
+    def __init__(self, out=None):
+        self.out = out
+
+    def write(self, level, event, fields):
+        out = self.out or sys.stdout
+        ss = []
+        blocks = []
+        for k in sorted(fields):
+            v = fields[k]
+            if isinstance(v, str) and '\n' not in v:
+                ss.append('%s=%s' % (k, v))
+            elif isinstance(v, (int, float)) or v is None:
+                ss.append('%s=%s' % (k, v))
+            elif isinstance(v, str):
+                blocks.append(v)
+            else:
+                blocks.append(json.dumps(v, indent=4, sort_keys=True))
+        line = ' '.join(['[%s]' % LEVEL2NAME.get(level, level), event] + ss)
+        out.write(line + '\n')
+        for block in blocks:
+            out.write(block + '\n')
+
+    def flush(self):
+        (self.out or sys.stdout).flush()
+
+    def discard(self):
+        pass
+
+
+class JsonLinesSink(object):
+    """
+    Writes events as JSON objects, one per line, for offline debugging.
+
+    Lines are buffered and written buffer_size at a time, and on flush().
+    Several processes can append to the same file: each flush is written
+    under an exclusive lock on it (where there is fcntl), so their lines don't
+    interleave.
+    """
+
+    def __init__(self, f, buffer_size=1024):
+        self.f = f
+        self.buffer_size = buffer_size
+        self.lines = []
+
+    def write(self, level, event, fields):
+        d = {
+            'level': LEVEL2NAME.get(level, level),
+            'event': event,
+        }
+        d.update(fields)
+        self.lines.append(json.dumps(d, sort_keys=True))
+        if self.buffer_size <= len(self.lines):
+            self.flush()
+
+    def flush(self):
+        if not self.lines:
+            return
+        with open(self.f, 'a') as out:
+            if fcntl:
+                fcntl.flock(out, fcntl.LOCK_EX)
+            out.write('\n'.join(self.lines) + '\n')
+            out.flush()
+        self.lines = []
+
+    def discard(self):
+        """
+        Drop the buffered lines (eg, the copy a forked process inherited).
+        """
+        self.lines = []
+
+
+class Tracer(object):
+    """
+    Leveled tracing of what the pipeline is doing.
+
+    Off by default.  Configure it once, in the entry point (worker processes
+    forked to evaluate in parallel inherit it), not from library code.  Check
+    enabled() before building an event, so that when tracing is off none of
+    the formatting is done:
+
+        if TRACE.enabled(DEBUG):
+            TRACE.emit(DEBUG, 'parse.fixed', parse=self.format())
+    """
+
+    def __init__(self):
+        self.level = OFF
+        self.sinks = []
+        atexit.register(self.flush)
+
+    def enabled(self, level):
+        return self.level <= level
+
+    def configure(self, level, sinks):
+        """
+        level, list of sinks ->
+        """
+        self.flush()
+        self.level = level if sinks else OFF
+        self.sinks = sinks
+
+    def to_stdout(self, level=DEBUG):
+        self.configure(level, [TextSink()])
+
+    def to_json_lines(self, f, level=DEBUG, buffer_size=1024):
+        self.configure(level, [JsonLinesSink(f, buffer_size)])
+
+    def disable(self):
+        self.configure(OFF, [])
+
+    def emit(self, level, event, **fields):
+        """
+        level, event name, JSON-able fields ->
+        """
+        if level < self.level:
+            return
+        for sink in self.sinks:
+            sink.write(level, event, fields)
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+    def discard(self):
+        """
+        Drop whatever the sinks have buffered, unwritten.  For child processes,
+        whose buffers are copies of their parent's.
+        """
+        for sink in self.sinks:
+            sink.discard()
+
+
+# The tracer for this process.
+TRACE = Tracer()
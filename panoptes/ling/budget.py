@@ -0,0 +1,85 @@
+from collections import defaultdict
+from time import monotonic
+
+
+class RecognitionBudget(object):
+    """
+    Limits on how much work recognizing one text may do, so a text whose
+    candidates multiply out (eg, a long sentence full of conjunctions) can't
+    hold up the whole run.
+
+    * max_candidates: how many candidates each stage ('surface' clauses,
+      'deep' clauses) may try per text, or None for no limit.
+    * max_secs: wall-clock seconds per text, or None for no limit.
+
+    The default is no limits.
+    """
+
+    def __init__(self, max_candidates=None, max_secs=None):
+        self.max_candidates = max_candidates
+        if self.max_candidates is not None:
+            assert isinstance(self.max_candidates, int)
+            assert 0 < self.max_candidates
+
+        self.max_secs = max_secs
+        if self.max_secs is not None:
+            assert 0 < self.max_secs
+
+    def start(self):
+        """
+        -> Allowance for one text, starting now
+        """
+        if self.max_secs is None:
+            deadline = None
+        else:
+            deadline = monotonic() + self.max_secs
+        return Allowance(self.max_candidates, deadline)
+
+
+class Allowance(object):
+    """
+    What is left of a RecognitionBudget while recognizing one text.
+
+    The product loops of surface and deep recognition call spend() before
+    making each candidate (or in_time() before other work), and stop when it
+    says no.  The first limit that was hit is kept in exceeded.
+    """
+
+    def __init__(self, max_candidates=None, deadline=None):
+        self.max_candidates = max_candidates
+        self.deadline = deadline
+        self.stage2n = defaultdict(int)
+        self.exceeded = None  # 'deadline' or the name of a stage
+
+    def exceed(self, limit):
+        if self.exceeded is None:
+            self.exceeded = limit
+
+    def in_time(self):
+        """
+        -> whether the deadline (if any) has not passed yet
+        """
+        if self.deadline is not None and self.deadline < monotonic():
+            self.exceed('deadline')
+            return False
+        return True
+
+    def spend(self, stage):
+        """
+        stage name -> whether it may make another candidate
+        """
+        if not self.in_time():
+            return False
+
+        if self.max_candidates is not None:
+            n = self.stage2n[stage] + 1
+            if self.max_candidates < n:
+                self.exceed(stage)
+                return False
+            self.stage2n[stage] = n
+
+        return True
+
+
+# Never says no, and so never changes.
+UNLIMITED = Allowance()
@@ -1,5 +1,6 @@
-import json
-
+from panoptes.etc.instrument import INSTRUMENT
+from panoptes.etc.trace import DEBUG, INFO, TRACE
+from panoptes.ling.budget import RecognitionBudget
 from panoptes.ling.glue.inflection import InflectionManager
 from panoptes.ling.glue.purpose import PurposeManager
 from panoptes.ling.glue.relation import RelationManager
@@ -7,7 +8,11 @@ from panoptes.ling.join.joiner import Joiner
 from panoptes.ling.morph.comparative.comparative import ComparativeManager
 from panoptes.ling.morph.plural.plural import PluralManager
 from panoptes.ling.morph.pronunciation.syllable_counter import SyllableCounter
-from panoptes.ling.parse.parser import Parser as TextToParse
+from panoptes.ling.parse.parser import PARSE_TABLE_F, \
+    Parser as TextToParse
+from panoptes.ling.recognition_cache import RecognitionCache, \
+    default_lexicon_files
+from panoptes.ling.tree.base import json_order
 from panoptes.ling.tree.deep.base import TransformState
 from panoptes.ling.tree.deep.recog import SurfaceToDeep
 from panoptes.ling.tree.common.personal_pronoun import PersonalManager
@@ -19,23 +24,79 @@ from panoptes.ling.tree.surface.util.pronoun import DetPronounManager
 from panoptes.ling.verb.verb_manager import VerbManager
 
 
+def rank_key(tree):
+    """
+    surface or deep sentence -> key to rank candidates by
+
+    Sorts like their JSON, as candidates have always been ranked, but is made
+    from their cached structural key() instead of encoding them (see
+    json_order()).  The structural key itself orders them differently (it
+    ranks values by type first), which would change which candidate is tried
+    first.
+    """
+    return json_order(tree.key()[1])
+
+
+def rank(trees):
+    """
+    list of surface or deep sentence ->
+
+    Sort them in place by rank_key(), unless there is nothing to sort.
+    """
+    if 1 < len(trees):
+        trees.sort(key=rank_key)
+
+
 class Recognition(object):
     """
     The results of recognizing deep structure in English text.
+
+    Surface and deep sentences may be left to be found when it is recognized
+    (see English.prefetch()), in which case complete is False and they are
+    empty.
+
+    If recognizing it ran out of budget (see RecognitionBudget), over_budget
+    is the limit it hit ('deadline' or a stage name) and ssens and dsens are
+    only what was found before then.
     """
 
-    def __init__(self, parses, ssens, dsens):
+    def __init__(self, parses, ssens, dsens, complete=True, over_budget=None):
         self.parses = parses
         self.ssens = ssens
         self.dsens = dsens
+        self.complete = complete  # whether ssens and dsens have been found
+        self.over_budget = over_budget
 
 
 class English(object):
-    def __init__(self):
+    """
+    Text <-> deep structure.
+
+    One instance can serve a pool of threads calling recognize(), say(), etc:
+    * The caches it reads and fills as it goes are safe to share:
+      RecognitionCache (locked LRU), Conjugator.identify_word_cache (locked
+      LRU), Conjugator.verb_cache and SyllableCounter.cache (plain dicts of
+      values that never change), and the verb lookup tables (frozen verbs,
+      decoded into a plain dict).
+    * The trees it makes are frozen, and ParseToSurface keeps its per-parse
+      memo per thread.
+    * Except the parser: spacy is not documented to be thread-safe.  Parse
+      up front with prefetch() from one thread, or serialize calls that miss
+      the cache.
+    """
+
+    def __init__(self, recog_cache_size=4096, recog_cache_dir=None,
+                 budget=None):
         conj_f = 'panoptes/ling/verb/conjugations.csv'
-        verb_f = 'data/verbs.json'
+        verb_f = 'data/verbs.bin'
         verb_mgr = VerbManager.from_files(conj_f, verb_f)
 
+        # Text -> Recognition.  Keyed on the lexicon files, which must exist
+        # (verb_f is generated by VerbManager above) before fingerprinting.
+        lexicon_ff = default_lexicon_files(verb_f, PARSE_TABLE_F)
+        self.recog_cache = RecognitionCache.from_files(
+            lexicon_ff, recog_cache_size, recog_cache_dir)
+
         syllable_counter = SyllableCounter.default()
         comparative_mgr = ComparativeManager.default(syllable_counter)
         det_pronoun_mgr = DetPronounManager()
@@ -68,55 +129,177 @@ class English(object):
 
         self.joiner = Joiner()
 
-    def recognize(self, text, verbose=False):
+        # Limits on the surface and deep recognition of each text.
+        if budget is None:
+            budget = RecognitionBudget()
+        self.budget = budget
+
+    def recognize(self, text):
         """
         text -> Recognition
         """
-        parses = []
-        for parse in self.text_to_parse.parse(text):
-            parses.append(parse)
+        recog = self.recog_cache.get(text)
+        cached = recog is not None
+        if cached:
+            INSTRUMENT.count('recog_cache_hits')
+        else:
+            parses = self.text_to_parse.parse(text)
+            recog = self.started(text, parses)
+        return self.finish(text, recog, cached)
 
-        if verbose:
-            print('-- %d parses' % len(parses))
-            for parse in parses:
-                print('-- PARSE')
-                parse.dump()
+    def uncached(self, texts):
+        """
+        texts -> the texts that are not cached, in order of first appearance
+        """
+        todo = []
+        seen = set()
+        for text in texts:
+            if text in seen or self.recog_cache.has(text):
+                continue
+            todo.append(text)
+            seen.add(text)
+        return todo
+
+    def prefetch(self, texts, batch_size=256, n_process=1):
+        """
+        texts, batch size, num processes -> text -> Measurement
+
+        Parse all the texts that are not cached in batches, and cache them
+        with surface and deep recognition left to be done when they are
+        recognized.
 
-        keys = set()
-        keys_ssens = []
+        Returns what the instrument measured parsing each of them (None if it
+        is off), to be counted when the text is put, with the whole of it as
+        the 'prefetch' stage.  What it had measured before is left alone.
+        """
+        text2stats = {}
+        stats = INSTRUMENT.take()
+        todo = self.uncached(texts)
+        t = INSTRUMENT.start()
+        for text, parses in zip(todo, self.text_to_parse.parse_many(
+                todo, batch_size, n_process)):
+            self.recog_cache.put(text, self.started(text, parses))
+            INSTRUMENT.stop('prefetch', t)
+            text2stats[text] = INSTRUMENT.take()
+            t = INSTRUMENT.start()
+        INSTRUMENT.add(stats)
+        return text2stats
+
+    def recognize_many(self, texts, batch_size=256, n_process=1):
+        """
+        texts, batch size, num processes -> yields Recognition per text
+
+        Like recognize(), but all the texts that are not cached are parsed by
+        spacy in batches.  Results are yielded in input order.
+        """
+        texts = list(texts)
+
+        # The texts to parse, in order of first appearance.
+        todo = self.uncached(texts)
+        unparsed = set(todo)
+        todo_parses = zip(todo, self.text_to_parse.parse_many(
+            todo, batch_size, n_process))
+
+        for text in texts:
+            recog = self.recog_cache.get(text)
+            if recog is not None:
+                yield self.finish(text, recog, True)
+            elif text in unparsed:
+                # Texts are met in the same order they were queued in.
+                unparsed.remove(text)
+                parsed_text, parses = next(todo_parses)
+                assert parsed_text == text
+                yield self.recognize_parses(text, parses)
+            else:
+                # It was cached but got evicted before we got to it.
+                yield self.recognize(text)
+
+    def recognize_parses(self, text, parses):
+        """
+        text, list of Parse -> Recognition
+        """
+        return self.finish(text, self.started(text, parses), False)
+
+    def started(self, text, parses):
+        """
+        text, list of Parse -> Recognition with nothing found yet
+        """
+        if TRACE.enabled(DEBUG):
+            TRACE.emit(DEBUG, 'recognize.parses', text=text, count=len(parses))
+            for i, parse in enumerate(parses):
+                TRACE.emit(DEBUG, 'recognize.parse', index=i,
+                           parse=parse.format())
+
+        return Recognition(parses, [], [], False)
+
+    def finish(self, text, recog, cached):
+        """
+        text, Recognition, whether it is cached as is -> Recognition
+
+        If the Recognition was only started (eg, by prefetch()), find its
+        surface and deep sentences (within the budget).  Cache it if it isn't.
+        """
+        if not recog.complete:
+            allowance = self.budget.start()
+            try:
+                recog.ssens, recog.dsens = self.expand(recog.parses, allowance)
+                recog.complete = True
+            finally:
+                if allowance.exceeded:
+                    recog.over_budget = allowance.exceeded
+                    INSTRUMENT.count('over_budget')
+                    TRACE.emit(INFO, 'recognize.over_budget', text=text,
+                               limit=allowance.exceeded)
+            cached = False
+        if not cached:
+            self.recog_cache.put(text, recog)
+        return recog
+
+    def expand(self, parses, allowance):
+        """
+        list of Parse, Allowance
+            -> (list of SurfaceSentence, list of DeepSentence)
+
+        Find the surface sentences of all the parses, and the deep sentences of
+        all of those, each skipping structural duplicates and ranked (see
+        rank_key()) across the lot.  Surface and deep recognition stop making
+        candidates when the allowance runs out.
+        """
+        ssens = []
+        ssen_keys = set()
         for parse in parses:
-            for ssen in self.parse_to_surface.recog(parse):
-                key = json.dumps(ssen.dump(), indent=4, sort_keys=True)
-                if key in keys:
+            t = INSTRUMENT.start()
+            parse_ssens = list(self.parse_to_surface.recog(parse, allowance))
+            INSTRUMENT.stop('surface', t)
+            for ssen in parse_ssens:
+                key = ssen.key()
+                if key in ssen_keys:
                     continue
-                keys_ssens.append((key, ssen))
-        keys_ssens.sort()
-
-        if verbose:
-            print('-- %d ssens' % len(keys_ssens))
-            for i, (key, ssen) in enumerate(keys_ssens):
-                print('-- SSEN %d' % i)
-                print(key)
-
-        keys = set()
-        keys_dsens = []
-        for _, ssen in keys_ssens:
-            for dsen in self.surface_to_deep.recog(ssen):
-                key = json.dumps(dsen.dump(), indent=4, sort_keys=True)
-                if key in keys:
+                ssen_keys.add(key)
+                ssens.append(ssen)
+        rank(ssens)
+
+        dsens = []
+        dsen_keys = set()
+        for ssen in ssens:
+            t = INSTRUMENT.start()
+            ssen_dsens = list(self.surface_to_deep.recog(ssen, allowance))
+            INSTRUMENT.stop('deep', t)
+            for dsen in ssen_dsens:
+                key = dsen.key()
+                if key in dsen_keys:
                     continue
-                keys_dsens.append((key, dsen))
-        keys_dsens.sort()
-
-        if verbose:
-            print('-- %d dsens' % len(keys_dsens))
-            for i, (key, dsen) in enumerate(keys_dsens):
-                print('-- DSEN %d' % i)
-                print(key)
-
-        ssens = [k_s[1] for k_s in keys_ssens]
-        dsens = [k_d[1] for k_d in keys_dsens]
-        return Recognition(parses, ssens, dsens)
+                dsen_keys.add(key)
+                dsens.append(dsen)
+        rank(dsens)
+
+        if TRACE.enabled(DEBUG):
+            for i, ssen in enumerate(ssens):
+                TRACE.emit(DEBUG, 'recognize.ssen', index=i, ssen=ssen.dump())
+            for i, dsen in enumerate(dsens):
+                TRACE.emit(DEBUG, 'recognize.dsen', index=i, dsen=dsen.dump())
+
+        return ssens, dsens
 
     def say(self, dsen, idiolect):
         """
@@ -3,6 +3,11 @@ from panoptes.ling.morph.pronunciation.rmv_syllable_counter import RmvSyllableCo
 
 
 class SyllableCounter(object):
+    """
+    Safe to share between threads: the cache is a plain dict of word -> count
+    (single gets and sets are atomic), and a race just counts a word twice.
+    """
+
     def __init__(self, cmu, rmv):
         self.cmu = cmu
         self.rmv = rmv
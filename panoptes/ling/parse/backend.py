@@ -0,0 +1,56 @@
+class ParserBackend(object):
+    """
+    Something that tags and dependency-parses text for the Parser.
+
+    parse() returns spacy-style tokens (with i, idx, orth_, tag_, dep_, head)
+    or None if it isn't sure, in which case the Parser asks the next backend.
+    A Parser told to learn shows each backend the tokens that a later one came
+    up with, so it can learn from them.
+    """
+
+    name = None  # INSTRUMENT stage to time it under
+
+    def parse(self, text):
+        """
+        text -> tokens or None
+        """
+        raise NotImplementedError
+
+    def parse_many(self, texts, batch_size, n_process):
+        """
+        texts, batch size, num processes -> yields tokens or None per text
+        """
+        for text in texts:
+            yield self.parse(text)
+
+    def learn(self, text, tokens):
+        """
+        text, tokens from another backend ->
+        """
+        pass
+
+
+class SpacyBackend(ParserBackend):
+    """
+    The full spacy English pipeline.  Loaded on first use, and always sure.
+    """
+
+    name = 'spacy'
+
+    def __init__(self):
+        self.nlp = None
+
+    def load(self):
+        if self.nlp is not None:
+            return
+
+        from spacy.lang.en import English
+        self.nlp = English()
+
+    def parse(self, text):
+        self.load()
+        return self.nlp(text, parse=True)
+
+    def parse_many(self, texts, batch_size, n_process):
+        self.load()
+        return self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
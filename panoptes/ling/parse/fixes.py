@@ -0,0 +1,650 @@
+from collections import defaultdict
+
+from panoptes.ling.parse.parse import *
+from panoptes.ling.parse.rules import Rule, RuleEngine
+
+
+# Each fix is a Rule: a token rule is tried on the tokens (in order) that have
+# one of its keys at the time, a sentence rule once.  They run in the order of
+# FIXES, each over the tree as the previous ones left it.
+
+
+def fix_xx(p, ix, x):
+    """
+    XX tokens, ugh.
+    """
+    if p.tags[x] != TAG_XX:
+        return False
+    ix.set_tag(x, TAG_NNP)
+    ix.set_dep(x, DEP_NSUBJ)
+    p.reassign_parent(x, p.heads[x])
+    return True
+
+
+NAMES = ('jason', 'antoine', 'sumit', 'yann')
+
+
+def fix_name(p, ix, x):
+    """
+    Jason is a proper noun.
+    """
+    if p.texts[x] not in NAMES:
+        return False
+    ix.set_tag(x, TAG_NNP)
+    return True
+
+
+def fix_under_period(p, ix):
+    """
+    Tokens that descend from sentence-ending punctuation shall be reassigned to
+    the root.
+
+      "What is the hallway north of?"
+    """
+    x = len(p.texts) - 1
+    if p.tags[x] != TAG_PERIOD:
+        return False
+
+    if not p.downs[x]:
+        return False
+
+    for child_x, _ in p.downs[x]:
+        p.reassign_parent(child_x, p.root_x)
+    return True
+
+
+def fix_the_subject(p, ix, x):
+    """
+    "The" is not a direct verb argument.
+
+      "What is the hallway north of?"
+
+    Convert
+
+      V* -nsubj-> the
+
+    to
+
+     (token after the) -det-> the
+    """
+    parent_x = p.heads[x]
+    if parent_x == NO_HEAD:
+        return False
+    if not p.is_verb(parent_x):
+        return False
+    if p.up_deps[x] != DEP_NSUBJ:
+        return False
+    if p.texts[x] != 'the':
+        return False
+    if len(p.texts) <= x + 1:
+        return False
+    next_x = x + 1
+    if p.up_deps[next_x] != DEP_NMOD:
+        return False
+    ix.set_dep(next_x, DEP_NSUBJ)
+    p.reassign_parent(next_x, p.heads[next_x])
+    ix.set_dep(x, DEP_DET)
+    p.heads[x] = parent_x
+    p.reassign_parent(x, next_x)
+    return True
+
+
+def fix_do_support(p, ix):
+    """
+    "Does (subject) (verb)"-style questions sometimes get parsed like the
+    (verb) is a noun, compounded to the true subject.  Requires much fiddling
+    to fix.
+    """
+    downs = p.downs
+    heads = p.heads
+
+    root_x = p.root_x
+    if p.texts[root_x] not in ['do', 'does', 'did']:
+        return False
+
+    dobj_x = None
+    has_aux = False
+    for child_x, dep in downs[root_x]:
+        if dep == DEP_DOBJ:
+            dobj_x = child_x
+        elif dep == DEP_AUX:
+            has_aux = True
+    if dobj_x is None:
+        return False
+    if has_aux:
+        return False
+    if p.tags[dobj_x] != TAG_NN:
+        return False
+
+    # Fuck you too!
+    ix.set_dep(root_x, DEP_AUX)
+    heads[root_x] = NO_HEAD
+    p.unlink(root_x, dobj_x)
+    for child_x, dep in downs[root_x]:
+        if dep == DEP_DOBJ:
+            continue
+        p.reassign_parent(child_x, dobj_x)
+    p.reassign_parent(root_x, dobj_x)
+    ix.set_tag(dobj_x, TAG_VB)
+    ix.set_dep(dobj_x, DEP_ROOT)
+    heads[dobj_x] = NO_HEAD
+    p.root_x = dobj_x
+    compound_x = None
+    root_downs = downs[dobj_x]
+    for i, (child_x, dep) in enumerate(root_downs):
+        if dep == DEP_COMPOUND:
+            root_downs[i] = child_x, DEP_NSUBJ
+            compound_x = child_x
+            break
+    for i, (child_x, dep) in enumerate(root_downs):
+        if dep == DEP_DET:
+            del root_downs[i]
+            if compound_x is not None:
+                p.link(compound_x, dep, child_x)
+            break
+    return True
+
+
+def fix_stranded_period(p, ix):
+    """
+    Sometimes when there's a stranded preposition at the end, the ending
+    punctuation is made its child.  Annoying.
+
+      "What is the bedroom east of?"
+    """
+    n = len(p.texts)
+    if not n:
+        return False
+
+    x = n - 1
+    if p.tags[x] != TAG_PERIOD:
+        return False
+
+    if p.up_deps[x] == DEP_PUNCT:
+        return False
+    orig_parent_x = p.heads[x]
+
+    prev_parent_x = NO_HEAD
+    parent_x = orig_parent_x
+    while parent_x != NO_HEAD:
+        prev_parent_x = parent_x
+        parent_x = p.heads[parent_x]
+    top_verb_x = prev_parent_x
+
+    p.unlink(orig_parent_x, x)
+    ix.set_dep(x, DEP_PUNCT)
+    p.heads[x] = top_verb_x
+    p.link(top_verb_x, DEP_PUNCT, x)
+    return True
+
+
+def fix_subject_under_acomp(p, ix, x):
+    """
+    Sometimes the parser puts the subject under an acomp for whatever reason.
+
+      "Is the chocolate bigger than the box?"
+
+    Got
+
+      is -> bigger -> chocolate
+
+    Want
+
+      is -> chocolate
+      is -> bigger
+
+    That is, transform
+
+      verb -acomp-> JJR -nsubj-> anything
+
+    into
+
+      verb -nsubj-> anything
+      verb -acomp-> JJR
+    """
+    if p.up_deps[x] != DEP_NSUBJ:
+        return False
+    parent_x = p.heads[x]
+    if parent_x == NO_HEAD:
+        return False
+    if p.tags[parent_x] != TAG_JJR:
+        return False
+    grandparent_x = p.heads[parent_x]
+    if grandparent_x == NO_HEAD:
+        return False
+    if p.up_deps[parent_x] != DEP_ACOMP:
+        return False
+    if not p.is_verb(grandparent_x):
+        return False
+
+    # Tree surgery.
+    p.reassign_parent(x, grandparent_x)
+    return True
+
+
+def fix_prep_under_advmod(p, ix, x):
+    """
+    We don't like adverbial phrases.  We do like prepositional phrases as verb
+    arguments.
+
+      "Mary went back to the garden."
+
+    Got
+
+      went -> back -> to -> garden -> the
+
+    Want
+
+      * went -> back
+      * went -> to -> garden -> the
+
+    That is, transform
+
+      verb -advmod-> adverb -prep-> prep
+
+    into
+
+      verb -advmod-> adverb
+      verb -prep-> prep
+    """
+    if p.tags[x] != TAG_IN:
+        return False
+    if p.up_deps[x] != DEP_PREP:
+        return False
+    parent_x = p.heads[x]
+    if parent_x == NO_HEAD:
+        return False
+    if p.tags[parent_x] != TAG_RB:
+        return False
+    if p.up_deps[parent_x] != DEP_ADVMOD:
+        return False
+    grandparent_x = p.heads[parent_x]
+    if grandparent_x == NO_HEAD:
+        return False
+    if not p.is_verb(grandparent_x):
+        return False
+
+    # Do the tree surgery.
+    p.reassign_parent(x, grandparent_x)
+    return True
+
+
+def fix_prep_under_prep(p, ix, x):
+    """
+    Usually, preps don't descend from other preps.  If spacy gives us that,
+    attach the child prep to its grandparent instead.  Transform
+
+      verb -prep-> IN-1 -prep-> IN-2
+
+    into
+
+      verb -prep-> IN-1
+      verb -prep-> IN-2
+    """
+    if p.tags[x] != TAG_IN:
+        return False
+    if p.up_deps[x] != DEP_PREP:
+        return False
+    parent_x = p.heads[x]
+    if parent_x == NO_HEAD:
+        return False
+    if p.tags[parent_x] != TAG_IN:
+        return False
+    grandparent_x = p.heads[parent_x]
+    if grandparent_x == NO_HEAD:
+        return False
+    if p.up_deps[parent_x] != DEP_PREP:
+        return False
+
+    # Do the surgery.
+    p.reassign_parent(x, grandparent_x)
+    return True
+
+
+def fix_compound(p, ix, x):
+    """
+    Break up compounds of the form (determiner) (noun) (direction) (PP).
+
+      "What is the bathroom east of?"
+    """
+    parent_x = p.heads[x]
+    if parent_x == NO_HEAD:
+        return False
+    if p.up_deps[x] != DEP_COMPOUND:
+        return False
+    grandparent_x = p.heads[parent_x]
+    if grandparent_x == NO_HEAD:
+        return False
+
+    # Give the child of the "compound" relation to its grandparent, with some
+    # generic relation for nouns that won't break surface recog.
+    ix.set_dep(x, DEP_NSUBJ)
+    p.reassign_parent(x, grandparent_x)
+
+    # Reassign its parent's det to it.
+    det_x = None
+    parent_downs = p.downs[parent_x]
+    for i, (child_x, dep) in enumerate(parent_downs):
+        if dep == DEP_DET:
+            det_x = child_x
+            del parent_downs[i]
+            break
+    if det_x is not None:
+        p.link(x, DEP_DET, det_x)
+    return True
+
+
+def is_to_be_with_one_arg(p):
+    """
+    Parse -> whether it's "(is) (something) (punct)"
+    """
+    if p.tags[0] != TAG_VBZ:
+        return False
+
+    root_x = p.root_x
+    if root_x:
+        return False
+
+    if len(p.downs[root_x]) != 2:  # The joined arg, then ending punct.
+        return False
+
+    _, dep = p.downs[root_x][1]
+    return dep == DEP_PUNCT
+
+
+def fix_joined_comparison(p, ix):
+    """
+    Possibly the worst hack.
+
+    Example:
+
+      "Is [the box of chocolates] [bigger than the box]?"
+    """
+    if not is_to_be_with_one_arg(p):
+        return False
+
+    root_x = p.root_x
+    fired = False
+    for x in sorted(ix.key2xx[('tag', TAG_JJR)]):
+        if p.up_deps[x] == DEP_AMOD:
+            ix.set_dep(x, DEP_NSUBJ)
+            p.reassign_parent(x, root_x)
+            fired = True
+    return fired
+
+
+def fix_to_be_split(p, ix):
+    """
+    If it starts with a "to be" VBZ, it should be of the form
+
+      "(is) (something) (something)"
+
+    so if you get "(is) (something)" try to split the something.
+
+      "Is the triangle above the pink rectangle?"
+
+    and
+
+      "Is the box bigger than the box of chocolates?"
+
+    however note this won't handle the following alone:
+
+      "Is [the box of chocolates] [bigger than the box]?"
+    """
+    if not is_to_be_with_one_arg(p):
+        return False
+
+    root_x = p.root_x
+    child_x, _ = p.downs[root_x][0]
+    child_downs = p.downs[child_x]
+    if len(child_downs) < 2:  # det, (amod,) prep
+        return False
+
+    grandchild_x, child_dep = child_downs[-1]
+    if child_dep == DEP_PREP:
+        p.reassign_parent(grandchild_x, root_x)
+    elif child_dep == DEP_AMOD:
+        # The child's second link down is dropped (historically by overwriting
+        # it with the grandchild and then moving that).
+        del child_downs[1]
+        ix.set_dep(grandchild_x, DEP_ACOMP)
+        p.heads[grandchild_x] = root_x
+        p.link(root_x, DEP_ACOMP, grandchild_x)
+    else:
+        return False
+    return True
+
+
+def fix_npadvmod_under_prep(p, ix, x):
+    """
+    Convert from
+
+      verb -prep-> IN -npadvmod-> anything
+
+    to
+
+      verb -prep-> IN
+      verb -nsubj-> anything
+    """
+    parent_x = p.heads[x]
+    if parent_x == NO_HEAD:
+        return False
+    if p.up_deps[x] != DEP_NPADVMOD:
+        return False
+    if p.tags[parent_x] != TAG_IN:
+        return False
+    grandparent_x = p.heads[parent_x]
+    if grandparent_x == NO_HEAD:
+        return False
+    if p.up_deps[parent_x] != DEP_PREP:
+        return False
+    if not p.is_verb(grandparent_x):
+        return False
+
+    ix.set_dep(x, DEP_NSUBJ)
+    p.reassign_parent(x, grandparent_x)
+    return True
+
+
+DIRECTIONS = ('north', 'south', 'east', 'west')
+
+
+def fix_direction_of(p, ix, x):
+    """
+    Prepositional phrase attachment: should be owned by another arg.
+
+      "The hallway is south of the bedroom."
+    """
+    right_x = x + 1
+    if len(p.texts) <= right_x:
+        return False
+    if not (p.texts[x] in DIRECTIONS and p.tags[right_x] == TAG_IN):
+        return False
+    ix.set_tag(x, TAG_NN)
+
+    if p.texts[right_x] != 'of':
+        return True
+
+    if p.heads[right_x] == x:
+        return True
+
+    p.reassign_parent(right_x, x)
+    return True
+
+
+def fix_before(p, ix, x):
+    """
+    Prepositional phrase attachment: should be its own arg.
+
+      "Where was the apple before the beach?"
+    """
+    if p.texts[x] != 'before':
+        return False
+
+    parent_x = p.heads[x]
+    if parent_x == NO_HEAD:
+        return False
+    if p.tags[parent_x] != TAG_NN:
+        return False
+    grandparent_x = p.heads[parent_x]
+    if grandparent_x == NO_HEAD:
+        return False
+
+    # Note that it's the parent whose link up changes.
+    dep = p.up_deps[x]
+    p.unlink(parent_x, x)
+    ix.set_dep(parent_x, dep)
+    p.heads[parent_x] = grandparent_x
+    p.link(grandparent_x, dep, x)
+    return True
+
+
+def fix_under_aux(p, ix, x):
+    """
+    Handle verb args descended from an aux relation.
+    """
+    parent_x = p.heads[x]
+    if parent_x == NO_HEAD:
+        return False
+    grandparent_x = p.heads[parent_x]
+    if grandparent_x == NO_HEAD:
+        return False
+    if p.up_deps[parent_x] not in (DEP_AUX, DEP_AUXPASS):
+        return False
+    p.reassign_parent(x, grandparent_x)
+    return True
+
+
+def fix_advmod_under_noun(p, ix, x):
+    """
+    Handle advmod descending from a noun (relative clauses?), when at least in
+    bAbi it is always descended from the verb.
+    """
+    parent_x = p.heads[x]
+    if parent_x == NO_HEAD:
+        return False
+    if p.up_deps[x] != DEP_ADVMOD:
+        return False
+    if p.tags[parent_x] != TAG_NN:
+        return False
+
+    # Do the tree surgery.
+    p.reassign_parent(x, p.heads[parent_x])
+    return True
+
+
+def fix_npadvmod_pair(p, ix):
+    """
+    The parser may give us multiple npadvmod links when what we want is just
+    one npadvmod that compound-links to the "other" one.  In other words:
+
+    Make
+
+      "[Yesterday] [evening] Tim moved to the abyss."
+
+    parse similar to
+
+      "[This evening] Tim moved to the abyss."
+    """
+    verb2npadvmods = defaultdict(list)
+    for x in sorted(ix.key2xx[('dep', DEP_NPADVMOD)]):
+        parent_x = p.heads[x]
+        if parent_x == NO_HEAD:
+            continue
+        if not p.is_verb(parent_x):
+            continue
+        verb2npadvmods[parent_x].append(x)
+
+    fired = False
+    for verb_x, npadvmod_xx in verb2npadvmods.items():
+        if len(npadvmod_xx) == 1:
+            continue
+        elif len(npadvmod_xx) != 2:
+            assert False
+        left_x, right_x = npadvmod_xx
+        ix.set_dep(left_x, DEP_COMPOUND)
+        p.reassign_parent(left_x, right_x)
+        fired = True
+    return fired
+
+
+def fix_conj_under_prep(p, ix, x):
+    """
+    At least in the bAbi dataset, the same sentence 'shape' almost always
+    parses one way, but in a few cases it parses the other way.  Normalize
+    those to the common way.
+
+      "Julie is either in the bedroom or the office." -- canonical
+      "Mary is either in the school or the office." -- non-canonical
+
+    Reassign "cc" and "conj" relations descending from an IN token to its
+    "pobj" child.
+    """
+    if p.tags[x] != TAG_IN:
+        return False
+
+    pobj_x = None
+    for child_x, dep in p.downs[x]:
+        if dep == DEP_POBJ:
+            pobj_x = child_x
+            break
+    if pobj_x is None:
+        return False
+
+    fired = False
+    for child_x, dep in list(p.downs[x]):
+        if dep in (DEP_CC, DEP_CONJ):
+            p.reassign_parent(child_x, pobj_x)
+            fired = True
+    return fired
+
+
+def fix_advmod_under_nouns(p, ix, x):
+    """
+    Convert
+
+      V* -*-> NN(s) -advmod-> RB
+
+    to
+
+      V* -*-> NN(s)
+      V* -advmod-> RB
+    """
+    if p.tags[x] != TAG_RB:
+        return False
+    if p.up_deps[x] != DEP_ADVMOD:
+        return False
+    parent_x = p.heads[x]
+    if parent_x == NO_HEAD:
+        return False
+    if not TAGS.i2s[p.tags[parent_x]].startswith('N'):
+        return False
+    p.reassign_parent(x, p.heads[parent_x])
+    return True
+
+
+FIXES = RuleEngine([
+    Rule('xx', fix_xx, [('tag', TAG_XX)]),
+    Rule('name', fix_name, [('text', s) for s in NAMES]),
+    Rule('under_period', fix_under_period, per_token=False),
+    Rule('the_subject', fix_the_subject, [('text', 'the')]),
+    Rule('do_support', fix_do_support, per_token=False),
+    Rule('stranded_period', fix_stranded_period, per_token=False),
+    Rule('subject_under_acomp', fix_subject_under_acomp,
+         [('dep', DEP_NSUBJ)]),
+    Rule('prep_under_advmod', fix_prep_under_advmod, [('tag', TAG_IN)]),
+    Rule('prep_under_prep', fix_prep_under_prep, [('tag', TAG_IN)]),
+    Rule('compound', fix_compound, [('dep', DEP_COMPOUND)]),
+    Rule('joined_comparison', fix_joined_comparison, per_token=False),
+    Rule('to_be_split', fix_to_be_split, per_token=False),
+    Rule('npadvmod_under_prep', fix_npadvmod_under_prep,
+         [('dep', DEP_NPADVMOD)]),
+    Rule('direction_of', fix_direction_of,
+         [('text', s) for s in DIRECTIONS]),
+    Rule('before', fix_before, [('text', 'before')]),
+    Rule('under_aux', fix_under_aux),
+    Rule('advmod_under_noun', fix_advmod_under_noun, [('dep', DEP_ADVMOD)]),
+    Rule('npadvmod_pair', fix_npadvmod_pair, per_token=False),
+    Rule('conj_under_prep', fix_conj_under_prep, [('tag', TAG_IN)]),
+    Rule('advmod_under_nouns', fix_advmod_under_nouns, [('tag', TAG_RB)]),
+])
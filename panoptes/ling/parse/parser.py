@@ -1,7 +1,12 @@
-from collections import defaultdict
+import os
 import sys
 
-from panoptes.ling.parse.parse import Parse, Token
+from panoptes.etc.instrument import INSTRUMENT
+from panoptes.ling.parse.backend import SpacyBackend
+from panoptes.ling.parse.parse import DEPS, NO_HEAD, Parse, TAGS
+from panoptes.ling.parse.rewriter import Rewriter
+from panoptes.ling.parse.shape_cache import ShapeCache
+from panoptes.ling.parse.table_backend import TableBackend
 
 
 def truecase(tokens):
@@ -19,73 +24,194 @@ def truecase(tokens):
     return ss
 
 
-class Parser(object):
-    def __init__(self):
-        print('Initializing spacy...', end=' ')
-        sys.stdout.flush()
-        self.nlp = None
-        print('done')
+def parses_from_tokens(tokens, offset2word):
+    """
+    spacy tokens, dict of char offset -> original word -> list of Parse
 
-    def parse(self, text):
-        from spacy.lang.en import English
+    Convert spacy's output for one text (whose words were swapped out by the
+    Rewriter) to our own Parse, putting back the words it says to restore.
+    """
+    words = truecase(tokens)
+    if offset2word:
+        for i, t in enumerate(tokens):
+            s = offset2word.get(t.idx)
+            if s is not None:
+                words[i] = s
+
+    tags = []
+    up_deps = []
+    heads = []
+    downs = [[] for _ in tokens]
+    root_x = None
+    for i, t in enumerate(tokens):
+        tags.append(TAGS.code(t.tag_))
+        dep = DEPS.code(t.dep_)
+        up_deps.append(dep)
+        if t.head is t:
+            heads.append(NO_HEAD)
+            if root_x is None:
+                root_x = i
+        else:
+            heads.append(t.head.i)
+            downs[t.head.i].append((i, dep))
 
-        if self.nlp is None:
-            self.nlp = English()
+    parse = Parse(words, tags, up_deps, heads, downs, root_x)
+    t = INSTRUMENT.start()
+    parses = list(filter(bool, [p.fixed() for p in [parse]]))
+    INSTRUMENT.stop('fixed', t)
+    return parses
 
-        # I'm deciding "afraid" is a passive verb.  Have it parse as such.
-        text = text.replace('afraid of', 'seen by')
-        text = text.replace('afraid', 'seen')
 
-        # Fred gets parsed by spacy as VBN.  Replace with a unique name.
-        text = text.replace(' Fred ', ' Jameson ')
-        text = text.replace(' fred ', ' jameson ')
+# Where scripts/build_parse_table.py puts the table.
+PARSE_TABLE_F = 'data/parse_table.json'
 
-        # It thinks Emily is an adverb.
-        text = text.replace(' emily ', ' Elliot ')
-        text = text.replace(' Emily ', ' Elliot ')
 
-        # It thinks Winona is an adjective.
-        text = text.replace(' winona ', ' Ashley ')
-        text = text.replace(' Winona ', ' Ashley ')
+def default_backends(table_f=PARSE_TABLE_F):
+    """
+    table file -> list of ParserBackend
 
-        # And that gertrude is a common noun.
-        text = text.replace(' gertrude ', ' Gertrude ')
+    The lookup table (if it has been built), then spacy.
+    """
+    bb = []
+    if os.path.exists(table_f):
+        bb.append(TableBackend.from_file(table_f))
+    bb.append(SpacyBackend())
+    return bb
 
-        # spaCy doesn't like "following" used as a preposition, so we use a
-        # similar word instead.  Oh well.
-        text = text.replace('Following', 'After')
 
-        tokens = self.nlp(text, parse=True)
-        words = truecase(tokens)
-        words = ['Fred' if s == 'Jameson' else s for s in words]
-        words = ['thwacked' if s == 'seen' else s for s in words]
-        words = ['Emily' if s == 'Elliot' else s for s in words]
-        words = ['Winona' if s == 'Ashley' else s for s in words]
+class Parser(object):
+    """
+    Text -> fixed Parses.
+
+    Tries each backend in turn until one is sure; the last one must always be
+    (see default_backends()).  If learn is set, backends before the one that
+    parsed a text get to learn from its tokens.  It's off by default, as then
+    how a text parses would depend on which texts came before it (in this
+    process), and so on the input order and on how work is split across
+    workers.  Build the table ahead of time with scripts/build_parse_table.py
+    instead.
+
+    If cache_shapes is set, a ShapeCache reuses the parses of each sentence
+    shape.  It's off by default for the same reason: it learns as it goes.
+    """
+
+    def __init__(self, backends=None, learn=False, cache_shapes=False):
+        print('Initializing parser...', end=' ')
+        sys.stdout.flush()
+        if backends is None:
+            backends = default_backends()
+        self.backends = backends
+        self.learn = learn
+        self.rewriter = Rewriter.default()
+        self.shape_cache = ShapeCache.default() if cache_shapes else None
+        print('done')
 
-        x2dep_x = {}
-        x2deps_xx = defaultdict(list)
-        for i, t in enumerate(tokens):
-            if t.head is t:
-                head_x = None
+    def tokens(self, text):
+        """
+        rewritten text -> tokens from the first backend that is sure
+        """
+        for i, backend in enumerate(self.backends):
+            t = INSTRUMENT.start()
+            tokens = backend.parse(text)
+            INSTRUMENT.stop(backend.name, t)
+            if tokens is not None:
+                self.teach(i, text, tokens)
+                return tokens
+        assert False
+
+    def teach(self, backend_index, text, tokens):
+        """
+        index of the backend that parsed the text, text, tokens ->
+        """
+        if not self.learn:
+            return
+        for backend in self.backends[:backend_index]:
+            backend.learn(text, tokens)
+
+    def parse(self, text):
+        """
+        text -> list of Parse
+        """
+        text, offset2word = self.rewriter.rewrite(text)
+        if self.shape_cache is not None:
+            parses = self.shape_cache.get(text, offset2word)
+            if parses is not None:
+                INSTRUMENT.count('shape_cache_hits')
+                return parses
+
+        tokens = self.tokens(text)
+        parses = parses_from_tokens(tokens, offset2word)
+        if self.shape_cache is not None:
+            self.shape_cache.put(text, offset2word, tokens, parses)
+        return parses
+
+    def parse_many(self, texts, batch_size=256, n_process=1):
+        """
+        texts, batch size, num processes -> yields list of Parse per text
+
+        Like parse(), but runs the texts the other backends are unsure of
+        through the last one (spacy) in batches (optionally across several
+        processes).  Results are yielded lazily, in input order.  Texts whose
+        shape is already cached (if caching shapes) skip the backends.
+
+        What the instrument measures for a text is counted by the time it is
+        yielded, so take() after each one to get the work of each text.  But
+        spacy parses a whole batch on the pull for its first text.
+        """
+        rewrites = list(map(self.rewriter.rewrite, texts))
+        if self.shape_cache is None:
+            hits = [False] * len(rewrites)
+        else:
+            hits = [self.shape_cache.has(*r) for r in rewrites]
+
+        # Text index -> (backend index, tokens), for the texts the backends
+        # other than the last were sure of.
+        x2parsed = {}
+
+        # Text index -> Measurement of trying those backends on it, added back
+        # when the text is yielded so its time is counted with the rest of it.
+        x2stats = {}
+        stats = INSTRUMENT.take()
+
+        todo = [x for x, hit in enumerate(hits) if not hit]
+        for i, backend in enumerate(self.backends[:-1]):
+            still_todo = []
+            for x in todo:
+                INSTRUMENT.add(x2stats.get(x))
+                t = INSTRUMENT.start()
+                tokens = backend.parse(rewrites[x][0])
+                INSTRUMENT.stop(backend.name, t)
+                x2stats[x] = INSTRUMENT.take()
+                if tokens is None:
+                    still_todo.append(x)
+                else:
+                    x2parsed[x] = i, tokens
+            todo = still_todo
+        INSTRUMENT.add(stats)
+
+        last_index = len(self.backends) - 1
+        last = self.backends[last_index]
+        if todo:
+            docs = last.parse_many(
+                [rewrites[x][0] for x in todo], batch_size, n_process)
+
+        for x, ((text, offset2word), hit) in enumerate(zip(rewrites, hits)):
+            if hit:
+                INSTRUMENT.count('shape_cache_hits')
+                yield self.shape_cache.get(text, offset2word)
+                continue
+
+            INSTRUMENT.add(x2stats.pop(x, None))
+            if x in x2parsed:
+                i, tokens = x2parsed[x]
             else:
-                head_x = t.head.i
-            x2dep_x[i] = (t.dep_, head_x)
-            x2deps_xx[head_x].append((t.dep_, t.i))
-
-        tt = []
-        for i, token in enumerate(tokens):
-            t = Token(i, words[i], token.tag_, x2dep_x[i], x2deps_xx[i])
-            tt.append(t)
-
-        for t in tt:
-            dep, x = t.up
-            if x is not None:
-                t.up = (dep, tt[x])
-            new_downs = []
-            for dep, x in t.downs:
-                new_downs.append((dep, tt[x]))
-            t.downs = new_downs
-
-        root = tt[x2deps_xx[None][0][1]]
-        parse = Parse(tt, root)
-        return list(filter(bool, [p.fixed() for p in [parse]]))
+                # Time each pull, as spacy does its work lazily as we iterate.
+                t = INSTRUMENT.start()
+                tokens = next(docs)
+                INSTRUMENT.stop(last.name, t)
+                i = last_index
+            self.teach(i, text, tokens)
+            parses = parses_from_tokens(tokens, offset2word)
+            if self.shape_cache is not None:
+                self.shape_cache.put(text, offset2word, tokens, parses)
+            yield parses
@@ -0,0 +1,92 @@
+import re
+import yaml
+
+
+class Rewrite(object):
+    """
+    Give spacy one string instead of another, and maybe restore the words
+    afterward.
+    """
+
+    def __init__(self, from_s, to_s, restore_s, spaced):
+        self.from_s = from_s        # text to find
+        self.to_s = to_s            # text to give spacy instead
+        self.restore_s = restore_s  # words to put back, or None
+        self.spaced = spaced        # whether it must be between spaces
+
+        # Offset of each word in to_s -> the word to restore it to.
+        self.offset2word = {}
+        if restore_s is None:
+            return
+
+        to_ss = to_s.split(' ')
+        restore_ss = restore_s.split(' ')
+        assert len(to_ss) == len(restore_ss)
+        offset = 0
+        for to_word, restore_word in zip(to_ss, restore_ss):
+            if to_word != restore_word:
+                self.offset2word[offset] = restore_word
+            offset += len(to_word) + 1
+
+    def pattern(self):
+        s = re.escape(self.from_s)
+        if self.spaced:
+            s = '(?<= )%s(?= )' % s
+        return s
+
+
+class Rewriter(object):
+    """
+    Applies every Rewrite to a text in one pass, using a single compiled regex,
+    and records where the restorable words ended up.
+    """
+
+    def __init__(self, rewrites):
+        self.from2rewrite = {}
+        for r in rewrites:
+            assert r.from_s not in self.from2rewrite
+            self.from2rewrite[r.from_s] = r
+
+        # Longest first, so "afraid of" wins over "afraid".
+        rewrites = sorted(rewrites, key=lambda r: -len(r.from_s))
+        s = '|'.join([r.pattern() for r in rewrites])
+        self.regex = re.compile(s) if rewrites else None
+
+    @staticmethod
+    def from_file(f):
+        rewrites = []
+        for d in yaml.safe_load(open(f)):
+            r = Rewrite(d['from'], d['to'], d.get('restore'),
+                        d.get('spaced', False))
+            rewrites.append(r)
+        return Rewriter(rewrites)
+
+    @staticmethod
+    def default():
+        f = 'panoptes/ling/parse/rewrites.yaml'
+        return Rewriter.from_file(f)
+
+    def rewrite(self, text):
+        """
+        text -> (text to give spacy, dict of its char offset -> word to restore)
+        """
+        if not self.regex:
+            return text, {}
+
+        ss = []
+        offset2word = {}
+        begin = 0
+        out_len = 0
+        for m in self.regex.finditer(text):
+            s = text[begin:m.start()]
+            ss.append(s)
+            out_len += len(s)
+
+            r = self.from2rewrite[m.group(0)]
+            for offset, word in r.offset2word.items():
+                offset2word[out_len + offset] = word
+            ss.append(r.to_s)
+            out_len += len(r.to_s)
+            begin = m.end()
+        ss.append(text[begin:])
+        return ''.join(ss), offset2word
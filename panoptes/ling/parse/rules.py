@@ -0,0 +1,137 @@
+from collections import defaultdict
+
+from panoptes.etc.instrument import INSTRUMENT
+
+
+class ParseIndex(object):
+    """
+    Which tokens of a Parse have each tag, dep, and text.
+
+    Built once per run of the rules.  Rewrites must change tags and deps
+    through it so it stays current.
+    """
+
+    def __init__(self, parse):
+        self.parse = parse
+        self.key2xx = defaultdict(set)
+        for x in range(len(parse.texts)):
+            self.key2xx[('tag', parse.tags[x])].add(x)
+            self.key2xx[('dep', parse.up_deps[x])].add(x)
+            self.key2xx[('text', parse.texts[x])].add(x)
+
+    def set_tag(self, x, tag):
+        """
+        token index, tag code ->
+        """
+        tags = self.parse.tags
+        self.key2xx[('tag', tags[x])].discard(x)
+        tags[x] = tag
+        self.key2xx[('tag', tag)].add(x)
+
+    def set_dep(self, x, dep):
+        """
+        token index, dep code ->
+        """
+        up_deps = self.parse.up_deps
+        self.key2xx[('dep', up_deps[x])].discard(x)
+        up_deps[x] = dep
+        self.key2xx[('dep', dep)].add(x)
+
+    def next_token(self, keys, after_x):
+        """
+        keys, token index -> lowest index after it with any of the keys, or
+        None
+        """
+        best = None
+        for key in keys:
+            for x in self.key2xx.get(key, ()):
+                if after_x < x and (best is None or x < best):
+                    best = x
+        return best
+
+
+class Rule(object):
+    """
+    A named tree rewrite.
+
+    A token rule is tried on each token in order (like a loop over the
+    tokens), but only on tokens that currently have one of its keys, if it
+    has any.  Its function takes (Parse, ParseIndex, token index).  A
+    sentence rule runs once and takes (Parse, ParseIndex).  Either returns
+    whether it changed anything.
+    """
+
+    def __init__(self, name, func, keys=None, per_token=True):
+        self.name = name
+        self.stage = 'fix.' + name  # name of its INSTRUMENT stage and counter
+        self.func = func
+        self.keys = keys
+        self.per_token = per_token
+
+    def run(self, parse, index):
+        """
+        Parse, ParseIndex -> (num tries, num fires)
+        """
+        if not self.per_token:
+            return 1, int(bool(self.func(parse, index)))
+
+        num_tries = 0
+        num_fires = 0
+        if self.keys is None:
+            for x in range(len(parse.texts)):
+                num_tries += 1
+                num_fires += bool(self.func(parse, index, x))
+        else:
+            x = index.next_token(self.keys, -1)
+            while x is not None:
+                num_tries += 1
+                num_fires += bool(self.func(parse, index, x))
+                x = index.next_token(self.keys, x)
+        return num_tries, num_fires
+
+
+class RuleEngine(object):
+    """
+    Runs a list of Rules over a Parse in order, and keeps count of how often
+    each one is tried and fires across all the parses it has seen.
+
+    Their total time is reported as stage 'fixed'.  Set instrument_rules to
+    also give each rule's time and fires to INSTRUMENT (when it is on), as
+    stage and counter 'fix.(rule name)', to break that down in latency
+    reports.
+    """
+
+    def __init__(self, rules, instrument_rules=False):
+        self.rules = rules
+        self.instrument_rules = instrument_rules
+        self.name2tries = defaultdict(int)
+        self.name2fires = defaultdict(int)
+
+    def run(self, parse):
+        """
+        Parse ->
+        """
+        index = ParseIndex(parse)
+        for rule in self.rules:
+            if not self.instrument_rules:
+                num_tries, num_fires = rule.run(parse, index)
+            else:
+                t = INSTRUMENT.start()
+                num_tries, num_fires = rule.run(parse, index)
+                INSTRUMENT.stop(rule.stage, t)
+                if num_fires:
+                    INSTRUMENT.count(rule.stage, num_fires)
+            self.name2tries[rule.name] += num_tries
+            self.name2fires[rule.name] += num_fires
+
+    def dump_stats(self, out):
+        """
+        output file ->
+
+        Write a line per rule: how many tokens it was tried on and how many
+        times it fired.
+        """
+        for rule in self.rules:
+            name = rule.name
+            out.write('%s: tried %d, fired %d\n' % (
+                name, self.name2tries[name], self.name2fires[name]))
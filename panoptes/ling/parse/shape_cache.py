@@ -0,0 +1,171 @@
+import re
+import yaml
+
+
+# Roughly how spacy splits simple sentences into tokens.  If it splits a text
+# differently, we just don't cache its shape.
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+class Slot(object):
+    """
+    A kind of word that can be swapped for another of its kind without
+    changing the parse.
+    """
+
+    def __init__(self, name, tag, words):
+        self.name = name    # placeholder
+        self.tag = tag      # the tag spacy must have given it
+        self.words = words  # set of words
+
+
+class Skeleton(object):
+    """
+    The fixed Parses of a sentence shape, with the slots still filled by the
+    words of the sentence they were made from.
+    """
+
+    def __init__(self, parses, x2lower):
+        self.parses = parses    # list of Parse
+        self.x2lower = x2lower  # slot token index -> whether to lowercase
+
+    def fill(self, fillers):
+        """
+        list of (token index, word) -> list of Parse
+        """
+        parses = []
+        for parse in self.parses:
+            parse = parse.copy()
+            for x, word in fillers:
+                if self.x2lower[x]:
+                    word = word.lower()
+                parse.tokens[x].text = word
+            parses.append(parse)
+        return parses
+
+
+class ShapeCache(object):
+    """
+    Sentence shape -> fixed Parses, so that sentences differing only in which
+    name or noun fills each slot are parsed by spacy once.
+
+        "Mary went to the kitchen." -> "NAME went to the PLACE."
+
+    Shapes are only cached when spacy's tokens line up with ours and each slot
+    word got its slot's tag, so a lookup is a dict lookup plus a token copy.
+
+    It is learned as it goes, per process: the parses of a shape are the ones
+    made from the first sentence of that shape that was seen.  Spacy may have
+    parsed a later sentence of the shape differently, so what a text parses to
+    can depend on what came before it (eg, on the order of the inputs and on
+    how episodes are split across worker processes).  So the Parser only
+    uses one if asked to (see Parser's cache_shapes).
+    """
+
+    def __init__(self, slots, max_size=65536):
+        self.word2slot = {}
+        for slot in slots:
+            for word in slot.words:
+                self.word2slot[word] = slot
+        self.max_size = max_size
+        self.shape2skeleton = {}
+
+        self.num_hits = 0
+        self.num_misses = 0
+
+    @staticmethod
+    def from_file(f):
+        slots = []
+        for d in yaml.safe_load(open(f)):
+            slot = Slot(d['slot'], d['tag'], set(d['words']))
+            slots.append(slot)
+        return ShapeCache(slots)
+
+    @staticmethod
+    def default():
+        f = 'panoptes/ling/parse/slots.yaml'
+        return ShapeCache.from_file(f)
+
+    def shape(self, text, offset2word):
+        """
+        rewritten text, dict of char offset -> word to restore
+            -> (words, shape, list of (token index, word))
+
+        Shape is None if it has no slots (or we can't tell which tokens get
+        restored).  Which words get restored is part of the shape, as the same
+        rewritten text can come from different originals.
+        """
+        words = []
+        ss = []
+        fillers = []
+        restores = []
+        for i, m in enumerate(TOKEN_RE.finditer(text)):
+            word = m.group(0)
+            words.append(word)
+            restore = offset2word.get(m.start())
+            if restore is not None:
+                restores.append((i, restore))
+            slot = self.word2slot.get(word)
+            if slot:
+                ss.append(slot.name)
+                fillers.append((i, word))
+            else:
+                ss.append(word)
+        if not fillers or len(restores) != len(offset2word):
+            return words, None, fillers
+        return words, (tuple(ss), tuple(restores)), fillers
+
+    def has(self, text, offset2word):
+        """
+        rewritten text, dict of char offset -> word to restore
+            -> whether get() would hit
+        """
+        _, shape, _ = self.shape(text, offset2word)
+        return shape in self.shape2skeleton
+
+    def get(self, text, offset2word):
+        """
+        rewritten text, dict of char offset -> word to restore
+            -> list of Parse, or None
+        """
+        _, shape, fillers = self.shape(text, offset2word)
+        skeleton = self.shape2skeleton.get(shape)
+        if skeleton is None:
+            self.num_misses += 1
+            return None
+
+        self.num_hits += 1
+        return skeleton.fill(fillers)
+
+    def put(self, text, offset2word, tokens, parses):
+        """
+        rewritten text, dict of char offset -> word to restore, spacy tokens,
+        list of Parse made from them ->
+        """
+        if self.max_size <= len(self.shape2skeleton):
+            return
+
+        words, shape, fillers = self.shape(text, offset2word)
+        if shape is None:
+            return
+
+        if [t.orth_ for t in tokens] != words:
+            return
+
+        x2lower = {}
+        for x, word in fillers:
+            if tokens[x].tag_ != self.word2slot[word].tag:
+                return
+            for parse in parses:
+                s = parse.tokens[x].text
+                if s == word:
+                    lower = False
+                elif s == word.lower():
+                    lower = True
+                else:
+                    return
+                if x2lower.setdefault(x, lower) != lower:
+                    return
+
+        parses = [p.copy() for p in parses]
+        self.shape2skeleton[shape] = Skeleton(parses, x2lower)
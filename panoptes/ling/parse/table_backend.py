@@ -0,0 +1,132 @@
+import json
+
+from panoptes.etc.atomic import atomic_write
+from panoptes.ling.parse.backend import ParserBackend
+from panoptes.ling.parse.shape_cache import TOKEN_RE
+
+
+class TableToken(object):
+    """
+    A token from TableBackend, with the fields of a spacy token that we use.
+    """
+
+    __slots__ = ('i', 'idx', 'orth_', 'tag_', 'dep_', 'head')
+
+    def __init__(self, i, idx, orth_, tag_, dep_, head):
+        self.i = i          # index
+        self.idx = idx      # char offset in the text
+        self.orth_ = orth_  # text
+        self.tag_ = tag_    # tag
+        self.dep_ = dep_    # dep of the link to its head
+        self.head = head    # head TableToken (itself if root)
+
+
+class TableBackend(ParserBackend):
+    """
+    Tags and parses sentences in a closed vocabulary by table lookup, using
+    what spacy did with the sentences it was shown before.
+
+    Each word gets the tag spacy always gave it, and then each sequence of tags
+    gets the tree (head and dep per token) spacy always gave it.  It's unsure
+    (returns None) about unseen or ambiguous words, about tag sequences that
+    were seen fewer than min_count times or got different trees, and about
+    texts we tokenize differently from spacy.
+    """
+
+    name = 'table'
+
+    def __init__(self, word2tag, tags2tree, min_count=2):
+        self.word2tag = word2tag    # word -> tag, or None if ambiguous
+        self.tags2tree = tags2tree  # tags -> [tree or None if ambiguous, count]
+        self.min_count = min_count
+
+    @staticmethod
+    def empty(min_count=2):
+        return TableBackend({}, {}, min_count)
+
+    @staticmethod
+    def from_file(f, min_count=2):
+        j = json.load(open(f))
+        tags2tree = {}
+        for tags, tree, count in j['tags2tree']:
+            if tree is not None:
+                tree = tuple(map(tuple, tree))
+            tags2tree[tuple(tags)] = [tree, count]
+        return TableBackend(j['word2tag'], tags2tree, min_count)
+
+    def save(self, f):
+        """
+        output file ->
+
+        Written atomically, so a crash can't leave a half-written table.
+        """
+        tags2tree = []
+        for tags in sorted(self.tags2tree):
+            tree, count = self.tags2tree[tags]
+            tags2tree.append([tags, tree, count])
+        j = {
+            'word2tag': self.word2tag,
+            'tags2tree': tags2tree,
+        }
+        with atomic_write(f) as out:
+            json.dump(j, out, sort_keys=True)
+
+    def learn(self, text, tokens):
+        """
+        text, spacy tokens ->
+        """
+        words = TOKEN_RE.findall(text)
+        if [t.orth_ for t in tokens] != words:
+            return
+
+        for t in tokens:
+            tag = self.word2tag.setdefault(t.orth_, t.tag_)
+            if tag != t.tag_:
+                self.word2tag[t.orth_] = None
+
+        tags = tuple([t.tag_ for t in tokens])
+        tree = []
+        for t in tokens:
+            head = None if t.head is t else t.head.i
+            tree.append((head, t.dep_))
+        tree = tuple(tree)
+        entry = self.tags2tree.setdefault(tags, [tree, 0])
+        if entry[0] != tree:
+            entry[0] = None
+        entry[1] += 1
+
+    def parse(self, text):
+        tags = []
+        ms = list(TOKEN_RE.finditer(text))
+        for m in ms:
+            tag = self.word2tag.get(m.group(0))
+            if tag is None:
+                return None
+            tags.append(tag)
+
+        tree, count = self.tags2tree.get(tuple(tags), (None, 0))
+        if tree is None or count < self.min_count:
+            return None
+
+        tokens = []
+        for i, (m, tag) in enumerate(zip(ms, tags)):
+            dep = tree[i][1]
+            tokens.append(TableToken(i, m.start(), m.group(0), tag, dep, None))
+        for t, (head, _) in zip(tokens, tree):
+            t.head = t if head is None else tokens[head]
+        return tokens
+
+    def stats(self):
+        """
+        -> dict of table sizes, for seeing how much of the input it covers
+        """
+        num_ambiguous_words = \
+            sum([1 for tag in self.word2tag.values() if tag is None])
+        num_sure_tag_seqs = \
+            sum([1 for tree, _ in self.tags2tree.values() if tree is not None])
+        return {
+            'words': len(self.word2tag),
+            'ambiguous_words': num_ambiguous_words,
+            'tag_sequences': len(self.tags2tree),
+            'sure_tag_sequences': num_sure_tag_seqs,
+        }
@@ -0,0 +1,171 @@
+from collections import OrderedDict
+from glob import glob
+import hashlib
+import os
+import pickle
+import threading
+
+from panoptes.etc.atomic import atomic_write
+
+
+# Bump when the pickled layout of Recognition or the tree classes changes in a
+# way the fingerprinted sources (see default_lexicon_files()) don't show.
+FORMAT_VERSION = 6
+
+
+# Directory of the panoptes package.
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def default_lexicon_files(verb_f, parse_table_f=None):
+    """
+    verb lookup table file, parse table file -> list of files that recognition
+    depends on
+
+    The conjugations, the verb lookup tables, the parse table (if it has been
+    built, as the texts it is sure of parse its way), the lexicon/rule data
+    that ships with panoptes.ling (plurals, comparatives, pronunciations), and
+    the source of the code that recognizes (panoptes.ling, and panoptes.etc
+    which it builds on), so editing a rewrite or a fix retires the cache too.
+    Found relative to the package, wherever we are run from.
+    """
+    ff = []
+    for sub, exts in [('ling', ['csv', 'py', 'txt', 'yaml']), ('etc', ['py'])]:
+        for ext in exts:
+            pattern = os.path.join(PACKAGE_DIR, sub, '**', '*.%s' % ext)
+            ff += glob(pattern, recursive=True)
+    ff.append(verb_f)
+    if parse_table_f and os.path.exists(parse_table_f):
+        ff.append(parse_table_f)
+    return sorted(ff)
+
+
+def fingerprint_files(ff):
+    """
+    list of files -> hex digest of their names and contents
+
+    Changing any of the files changes the fingerprint, which retires every
+    cache entry made with the old files.
+    """
+    h = hashlib.sha1()
+    h.update(str(FORMAT_VERSION).encode('utf-8'))
+    for f in ff:
+        # By path relative to the package, so it's the same from any checkout.
+        name = os.path.relpath(os.path.abspath(f), PACKAGE_DIR)
+        h.update(name.encode('utf-8'))
+        if not os.path.exists(f):
+            h.update(b'\0')
+            continue
+        with open(f, 'rb') as fp:
+            for block in iter(lambda: fp.read(1 << 20), b''):
+                h.update(block)
+    return h.hexdigest()
+
+
+class RecognitionCache(object):
+    """
+    Text -> Recognition, so repeated sentences are only parsed once.
+
+    Entries are held in memory as pickles and unpickled on every hit, so each
+    caller gets its own trees and nothing downstream (eg, Memory) can mutate
+    the cached copy.
+
+    The in-memory layer is an LRU of up to max_size entries.  If a directory is
+    given, entries are also written there, one file per text under a
+    subdirectory named after the fingerprint of the lexicon files, so changing
+    the lexicon invalidates the store.  Files are written atomically, so
+    several processes can share one directory.  The LRU is guarded by a lock,
+    so several threads can share one cache.
+    """
+
+    def __init__(self, fingerprint, max_size=4096, d=None):
+        self.fingerprint = fingerprint
+        self.max_size = max_size
+        self.text2blob = OrderedDict()
+        self.lock = threading.Lock()
+
+        if d:
+            self.dir = os.path.join(d, fingerprint)
+            os.makedirs(self.dir, exist_ok=True)
+        else:
+            self.dir = None
+
+        self.num_hits = 0
+        self.num_misses = 0
+
+    @staticmethod
+    def from_files(ff, max_size=4096, d=None):
+        fingerprint = fingerprint_files(ff)
+        return RecognitionCache(fingerprint, max_size, d)
+
+    def path_for(self, text):
+        name = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        return os.path.join(self.dir, name + '.pkl')
+
+    def remember(self, text, blob):
+        with self.lock:
+            self.text2blob[text] = blob
+            self.text2blob.move_to_end(text)
+            while self.max_size < len(self.text2blob):
+                self.text2blob.popitem(last=False)
+
+    def load_blob(self, text):
+        """
+        text -> pickled (text, Recognition) or None
+        """
+        with self.lock:
+            blob = self.text2blob.get(text)
+            if blob is not None:
+                self.text2blob.move_to_end(text)
+                return blob
+
+        if not self.dir:
+            return None
+
+        try:
+            with open(self.path_for(text), 'rb') as f:
+                blob = f.read()
+        except IOError:
+            return None
+
+        self.remember(text, blob)
+        return blob
+
+    def has(self, text):
+        """
+        text -> whether it is cached (in memory or on disk)
+        """
+        if text in self.text2blob:
+            return True
+        return bool(self.dir) and os.path.exists(self.path_for(text))
+
+    def get(self, text):
+        """
+        text -> fresh copy of the cached Recognition, or None
+        """
+        blob = self.load_blob(text)
+        if blob is None:
+            self.num_misses += 1
+            return None
+
+        # The text is stored alongside in case of hash collisions on disk.
+        stored_text, recog = pickle.loads(blob)
+        if stored_text != text:
+            self.num_misses += 1
+            return None
+
+        self.num_hits += 1
+        return recog
+
+    def put(self, text, recog):
+        """
+        text, Recognition ->
+        """
+        blob = pickle.dumps((text, recog), pickle.HIGHEST_PROTOCOL)
+        self.remember(text, blob)
+
+        if not self.dir:
+            return
+
+        with atomic_write(self.path_for(text), 'wb') as f:
+            f.write(blob)
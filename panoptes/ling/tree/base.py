@@ -1,11 +1,115 @@
+from json.encoder import encode_basestring_ascii
+
 from panoptes.etc.enum import enum
+from panoptes.etc.frozen import Frozen
 from panoptes.ling.glue.relation import RelationArgType
 
 
 ArgPosRestriction = enum('ArgPosRestriction = SUBJECT NOT_SUBJECT ANYWHERE')
 
 
-class BaseArgument(object):
+def freeze(x):
+    """
+    dump (dicts, lists, primitives) -> nested tuples
+
+    The result is hashable, and any two of them can be compared (each value is
+    tagged with a rank for its type, so eg None vs str is never compared).
+    """
+    if isinstance(x, dict):
+        return (5, tuple(sorted([(k, freeze(v)) for k, v in x.items()])))
+    elif isinstance(x, (list, tuple)):
+        return (4, tuple(map(freeze, x)))
+    elif isinstance(x, str):
+        return (3, x)
+    elif isinstance(x, bool):
+        return (1, x)
+    elif isinstance(x, (int, float)):
+        return (2, x)
+    elif x is None:
+        return (0,)
+    else:
+        assert False
+
+
+def json_order(x):
+    """
+    freeze() output -> nested tuples that sort like its JSON
+
+    The JSON being json.dumps(dump, indent=4, sort_keys=True), without making
+    it.  Where two such texts first differ decides their order, so:
+    * Values of different types compare by their first character, which is
+      what each is tagged with below (numbers all start with '-' or a digit).
+    * Strings compare by their escaped text, closing quote included.
+    * Numbers compare by their text.  When one is a prefix of the other, the
+      shorter is followed by ',' or a newline, which come before anything a
+      number could go on with.
+    * Non-empty containers come before empty ones ('{' then a newline, versus
+      '{}'), then compare item by item, as a container that ends (a newline)
+      comes before one that goes on (',').
+    """
+    tag = x[0]
+    if tag == 5:
+        if not x[1]:
+            return '{', 1
+        return '{', 0, tuple([(encode_basestring_ascii(k), json_order(v))
+                              for k, v in x[1]])
+    elif tag == 4:
+        if not x[1]:
+            return '[', 1
+        return '[', 0, tuple(map(json_order, x[1]))
+    elif tag == 3:
+        return '"', encode_basestring_ascii(x[1])
+    elif tag == 2:
+        return '0', repr(x[1])
+    elif tag == 1:
+        return ('t',) if x[1] else ('f',)
+    else:
+        return ('n',)
+
+
+class Structural(Frozen):
+    """
+    Equality, hashing, and a canonical ordering by structure (by dump()),
+    instead of by identity.
+
+    The key is computed once and cached, which is safe because trees are
+    frozen.
+    """
+
+    __slots__ = ('_key',)
+
+    def key(self):
+        """
+        -> hashable, orderable canonical form
+        """
+        try:
+            return self._key
+        except AttributeError:
+            key = self.__class__.__name__, freeze(self.dump())
+            object.__setattr__(self, '_key', key)
+            return key
+
+    def replace(self, **name2value):
+        r = Frozen.replace(self, **name2value)
+        if hasattr(r, '_key'):
+            object.__delattr__(r, '_key')
+        return r
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if type(self) is not type(other):
+            return False
+        return self.key() == other.key()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.key())
+
+
+class BaseArgument(Structural):
     """
     A standalone (a) verb argument or (b) child of a noun phrase.
 
@@ -21,8 +125,13 @@ class BaseArgument(object):
     Technically, sometimes an argument can be used as a non-standalone component
     of another argument, such as Attributes and Numbers inside a CommonNoun, but
     it will always be able to be used on its own.
+
+    Arguments are frozen: combinations of them share subtrees, so derive new
+    ones with replace() instead of changing them.
     """
 
+    __slots__ = ()
+
     def dump(self):
         """
         -> dict
@@ -4,6 +4,8 @@ from panoptes.ling.tree.surface.base import SayResult
 
 
 class Adjective(CommonArgument):
+    __slots__ = ('s',)
+
     def __init__(self, s):
         self.s = s
         assert self.s
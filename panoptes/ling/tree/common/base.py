@@ -7,6 +7,8 @@ class CommonArgument(DeepArgument, SurfaceArgument):
     An argument that can pass as both surface and deep structure.
     """
 
+    __slots__ = ()
+
     def to_surface(self, transform_state, say_state, idiolect):
         """
         -> SurfaceArgument
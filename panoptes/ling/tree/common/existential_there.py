@@ -10,6 +10,8 @@ class ExistentialThere(CommonArgument):
     Eg, "[There] are cats here.", "Because of the cats, [there] are fewer mice".
     """
 
+    __slots__ = ()
+
     # --------------------------------------------------------------------------
     # From base.
 
@@ -1,3 +1,4 @@
+from panoptes.etc.frozen import Frozen
 from panoptes.ling.glue.inflection import Conjugation
 
 
@@ -12,11 +13,13 @@ def tokens_from_int(n):
     }[n]
 
 
-class Number(object):
+class Number(Frozen):
     """
     Simple hack because I don't want the full thing yet.
     """
 
+    __slots__ = ('n',)
+
     def __init__(self, n):
         self.n = n
         if self.n is not None:
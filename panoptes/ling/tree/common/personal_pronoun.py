@@ -24,6 +24,8 @@ class PersonalPronoun(CommonArgument):
     (Non-possessive) personal pronouns.
     """
 
+    __slots__ = ('declension', 'ppcase')
+
     def __init__(self, declension, ppcase):
         self.declension = declension
         assert Declension.is_valid(self.declension)
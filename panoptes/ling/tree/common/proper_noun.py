@@ -9,6 +9,8 @@ class ProperNoun(CommonArgument):
     A simple proper noun.
     """
 
+    __slots__ = ('name', 'is_plur')
+
     def __init__(self, name, is_plur):
         self.name = name
         assert isinstance(self.name, tuple)
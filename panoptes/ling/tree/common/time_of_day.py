@@ -9,6 +9,8 @@ DaySection = enum('DaySection = MORNING AFTERNOON EVENING NIGHT')
 
 
 class TimeOfDay(CommonArgument):
+    __slots__ = ('day_offset', 'section')
+
     def __init__(self, day_offset, section):
         self.day_offset = day_offset
         assert isinstance(self.day_offset, int)
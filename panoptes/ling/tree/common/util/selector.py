@@ -1,6 +1,5 @@
-from copy import deepcopy
-
 from panoptes.etc.enum import enum
+from panoptes.etc.frozen import Frozen
 from panoptes.ling.glue.grammatical_number import compints_from_nx, N2, N5, \
     nx_to_nx, nx_to_nxs
 
@@ -54,7 +53,7 @@ COUNT_RESTRICTION2CHECK = {
 }
 
 
-class Selector(object):
+class Selector(Frozen):
     """
     Internal field of common nouns.
 
@@ -74,6 +73,8 @@ class Selector(object):
     * "no black cats" -> NEG zero of plural
     """
 
+    __slots__ = ('correlative', 'n_min', 'n_max', 'of_n_min', 'of_n_max')
+
     def __init__(self, correlative, n_min, n_max, of_n_min, of_n_max):
         self.correlative = correlative
         assert Correlative.is_valid(self.correlative)
@@ -184,7 +185,7 @@ class Selector(object):
         # hosed.
         if gram_num_override:
             if gram_num_override == required_gram_num:
-                return [deepcopy(self)]
+                return [self]
             else:
                 return []
 
@@ -198,7 +199,7 @@ class Selector(object):
         if len(gram_nums) == 1:
             got = list(gram_nums)[0]
             if got == required_gram_num:
-                return [deepcopy(self)]
+                return [self]
             else:
                 return []
 
@@ -17,6 +17,8 @@ class DeepArgument(BaseArgument):
     An argument in deep structure.
     """
 
+    __slots__ = ()
+
     def to_surface(self, transform_state, say_state, idiolect):
         """
         TransformState, SayState, Idiolect -> SurfaceArgument
@@ -6,6 +6,9 @@ from panoptes.ling.tree.surface.common_noun import SurfaceCommonNoun
 
 
 class DeepCommonNoun(DeepArgument):
+    __slots__ = (
+        'possessor', 'selector', 'number', 'attributes', 'noun', 'rels_nargs')
+
     def __init__(self, possessor=None, selector=None, number=None,
                  attributes=None, noun=None, rels_nargs=None):
         if attributes is None:
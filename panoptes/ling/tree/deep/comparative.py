@@ -4,6 +4,8 @@ from panoptes.ling.tree.surface.comparative import SurfaceComparative
 
 
 class DeepComparative(DeepArgument):
+    __slots__ = ('polarity', 'adjective', 'than')
+
     def __init__(self, polarity, adjective, than):
         self.polarity = polarity
         assert ComparativePolarity.is_valid(self.polarity)
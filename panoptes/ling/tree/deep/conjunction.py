@@ -4,6 +4,8 @@ from panoptes.ling.tree.surface.conjunction import SurfaceConjunction
 
 
 class DeepConjunction(DeepArgument):
+    __slots__ = ('op', 'aa')
+
     def __init__(self, op, aa):
         self.op = op
         assert Conjunction.is_valid(self.op)
@@ -116,6 +116,10 @@ def transform(orig_preps_vargs, subj_index, is_imperative, argx_to_front,
 
 
 class DeepContentClause(DeepArgument):
+    __slots__ = (
+        'status', 'purpose', 'is_intense', 'verb', 'adverbs', 'rels_vargs',
+        'subj_index')
+
     def __init__(self, status, purpose, is_intense, verb, adverbs, rels_vargs,
                  subj_index):
         self.status = status
@@ -3,6 +3,8 @@ from panoptes.ling.tree.surface.direction import SurfaceDirection
 
 
 class DeepDirection(DeepArgument):
+    __slots__ = ('which', 'of')
+
     def __init__(self, which, of):
         self.which = which
         assert self.which
@@ -1,6 +1,6 @@
-from copy import deepcopy
 from itertools import product
 
+from panoptes.ling.budget import UNLIMITED
 from panoptes.ling.glue.purpose import PurposeManager
 from panoptes.ling.glue.relation import RelationManager
 from panoptes.ling.tree.base import ArgPosRestriction
@@ -18,7 +18,7 @@ from panoptes.ling.verb.verb import ModalFlavor, Voice
 
 
 class RecogContext(object):
-    def __init__(self, end_punct, is_inside_an_if):
+    def __init__(self, end_punct, is_inside_an_if, allowance):
         # Ending punctuation token.  Matters for Purpose.
         #
         # Will be None if not the root clause of the sentence.
@@ -27,6 +27,9 @@ class RecogContext(object):
         # Modality restrictions ("if I [were] a cat, I [would be] a cat").
         self.is_inside_an_if = is_inside_an_if
 
+        # How much more work recognizing the sentence may do (Allowance).
+        self.allowance = allowance
+
 
 class SurfaceToDeep(object):
     """
@@ -84,14 +87,12 @@ class SurfaceToDeep(object):
                             possessor=pos, selector=n.selector, number=n.number,
                             attributes=n.attributes, noun=n.noun,
                             rels_nargs=list(zip(rels, nn)))
-                        r = deepcopy(r)
                         rr.append(r)
         else:
             for pos in poss:
                 r = DeepCommonNoun(
                     possessor=pos, selector=n.selector, number=n.number,
                     attributes=n.attributes, noun=n.noun)
-                r = deepcopy(r)
                 rr.append(r)
         return rr
 
@@ -153,7 +154,7 @@ class SurfaceToDeep(object):
             prep, arg = hallu_preps_vargs[i]
             if arg:
                 if arg.has_hole():
-                    arg.put_fronted_arg_back(fronted_arg)
+                    arg = arg.with_fronted_arg_back(fronted_arg)
                     used_fronted = True
             else:
                 assert not used_fronted
@@ -182,7 +183,9 @@ class SurfaceToDeep(object):
 
     def recog_content_clause(self, c, context):
         """
-        SurfaceContentClause -> list of DeepContentClause
+        SurfaceContentClause, RecogContext -> list of DeepContentClause
+
+        Stops early (with what it has) if the context's allowance runs out.
         """
         if c.is_subjunctive() and not context.is_inside_an_if:
             return []
@@ -219,6 +222,8 @@ class SurfaceToDeep(object):
 
             for purpose, is_intense in purposes_isstresseds:
                 for deeps in product(*deep_options_per_arg):
+                    if not context.allowance.in_time():
+                        return rr
                     ok = True
                     for i, deep in enumerate(deeps):
                         res = deep.arg_position_restriction()
@@ -238,6 +243,8 @@ class SurfaceToDeep(object):
                         continue
 
                     for rels in product(*relation_options_per_arg):
+                        if not context.allowance.spend('deep'):
+                            return rr
                         rels_vargs = list(zip(rels, deeps))
                         r = DeepContentClause(
                             status, purpose, is_intense, c.verb.intrinsics,
@@ -245,9 +252,13 @@ class SurfaceToDeep(object):
                         rr.append(r)
         return rr
 
-    def recog(self, ssen):
+    def recog(self, ssen, allowance=UNLIMITED):
+        """
+        SurfaceSentence, Allowance -> list of DeepSentence
+        """
         assert isinstance(ssen, SurfaceSentence)
-        context = RecogContext(end_punct=ssen.end_punct, is_inside_an_if=False)
+        context = RecogContext(end_punct=ssen.end_punct, is_inside_an_if=False,
+                               allowance=allowance)
         rr = []
         for root in self.recog_content_clause(ssen.root, context):
             r = DeepSentence(root)
@@ -1,8 +1,11 @@
+from panoptes.ling.tree.base import Structural
 from panoptes.ling.tree.deep.content_clause import DeepContentClause
 from panoptes.ling.tree.surface.sentence import SurfaceSentence
 
 
-class DeepSentence(object):
+class DeepSentence(Structural):
+    __slots__ = ('root',)
+
     def __init__(self, root):
         self.root = root
         assert isinstance(self.root, DeepContentClause)
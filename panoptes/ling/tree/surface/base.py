@@ -84,6 +84,8 @@ class SurfaceArgument(BaseArgument):
     An argument in surface structure.
     """
 
+    __slots__ = ()
+
     def has_hole(self):
         """
         -> bool
@@ -95,13 +97,13 @@ class SurfaceArgument(BaseArgument):
         """
         return False
 
-    def put_fronted_arg_back(self, n):
+    def with_fronted_arg_back(self, n):
         """
-        ->
+        SurfaceArgument -> SurfaceArgument
 
-        Put an internal that was extracted to be the fronted argument back into
-        its original position.  Used by deep recog.  Only call this if
-        has_hole() is True.
+        Return a copy of us with an internal that was extracted to be the
+        fronted argument put back into its original position.  Used by deep
+        recog.  Only call this if has_hole() is True.
 
         Example: "What are you east of?" -> east of [what]
         """
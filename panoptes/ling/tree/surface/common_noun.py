@@ -28,6 +28,9 @@ class SurfaceCommonNoun(SurfaceArgument):
     * [Every idea of Einstein that dogs bark which I don't believe] is true.
     """
 
+    __slots__ = (
+        'possessor', 'selector', 'number', 'attributes', 'noun', 'preps_nargs')
+
     def __init__(self, possessor=None, selector=None, number=None,
                  attributes=None, noun=None, preps_nargs=None):
         # Prevent aliasing hell.
@@ -182,11 +185,12 @@ class SurfaceCommonNoun(SurfaceArgument):
                 return True
         return False
 
-    def put_fronted_arg_back(self, what):
+    def with_fronted_arg_back(self, what):
         for i, (p, n) in enumerate(self.preps_nargs):
             if not n:
-                self.preps_nargs[i][1] = what
-                return
+                preps_nargs = list(self.preps_nargs)
+                preps_nargs[i] = p, what
+                return self.replace(preps_nargs=preps_nargs)
 
         assert False
 
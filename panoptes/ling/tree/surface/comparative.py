@@ -6,6 +6,8 @@ from panoptes.ling.tree.surface.base import SurfaceArgument, SayContext, \
 
 
 class SurfaceComparative(SurfaceArgument):
+    __slots__ = ('polarity', 'adjective', 'than')
+
     def __init__(self, polarity, adjective, than):
         self.polarity = polarity
         assert ComparativePolarity.is_valid(self.polarity)
@@ -35,9 +37,9 @@ class SurfaceComparative(SurfaceArgument):
     def has_hole(self):
         return not self.than
 
-    def put_fronted_arg_back(self, than):
+    def with_fronted_arg_back(self, than):
         assert not self.than
-        self.than = than
+        return self.replace(than=than)
 
     def decide_conjugation(self, state, idiolect, context):
         return Conjugation.S3
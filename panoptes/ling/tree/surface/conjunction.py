@@ -7,6 +7,8 @@ from panoptes.ling.tree.surface.base import SayContext, SayResult, \
 
 
 class SurfaceConjunction(SurfaceArgument):
+    __slots__ = ('op', 'aa')
+
     def __init__(self, op, aa):
         self.op = op
         assert Conjunction.is_valid(self.op)
@@ -41,13 +43,12 @@ class SurfaceConjunction(SurfaceArgument):
     def has_hole(self):
         return any([a.has_hole() for a in self.aa])
 
-    def put_fronted_arg_back(self, n):
-        for a in self.aa:
-            try:
-                a.put_fronted_arg_back(n)
-                return
-            except:
-                pass
+    def with_fronted_arg_back(self, n):
+        for i, a in enumerate(self.aa):
+            if a.has_hole():
+                aa = list(self.aa)
+                aa[i] = a.with_fronted_arg_back(n)
+                return self.replace(aa=aa)
         assert False
 
     def decide_conjugation(self, state, idiolect, context):
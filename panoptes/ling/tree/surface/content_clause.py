@@ -20,6 +20,9 @@ COMPLEMENTIZER2WORD = {
 
 
 class SurfaceContentClause(SurfaceArgument):
+    __slots__ = (
+        'complementizer', 'verb', 'adverbs', 'preps_vargs', 'vmain_index')
+
     def __init__(self, complementizer, verb, adverbs, preps_vargs, vmain_index):
         # Complementizer.
         #
@@ -4,6 +4,8 @@ from panoptes.ling.tree.surface.base import SurfaceArgument, SayContext, \
 
 
 class SurfaceDirection(SurfaceArgument):
+    __slots__ = ('which', 'of')
+
     def __init__(self, which, of):
         self.which = which
         assert self.which
@@ -29,9 +31,9 @@ class SurfaceDirection(SurfaceArgument):
     def has_hole(self):
         return not self.of
 
-    def put_fronted_arg_back(self, of):
+    def with_fronted_arg_back(self, of):
         assert not self.of
-        self.of = of
+        return self.replace(of=of)
 
     def decide_conjugation(self, state, idiolect, context):
         return Conjugation.S3
@@ -1,6 +1,9 @@
-from copy import deepcopy
+from functools import wraps
 from itertools import product
+import threading
 
+from panoptes.etc.instrument import INSTRUMENT
+from panoptes.ling.budget import UNLIMITED
 from panoptes.ling.glue.conjunction import STR2CONJUNCTION
 from panoptes.ling.glue.grammatical_number import N2, N3, N5, \
     nx_eq_nx_is_possible, nx_to_nxs
@@ -29,6 +32,34 @@ from panoptes.ling.verb.annotation import annotate_as_aux
 from panoptes.ling.verb.verb import ModalFlavor
 
 
+def memoized(context):
+    """
+    context name -> decorator
+
+    Memoize a ParseToSurface method of (root token, *args) -> list of (prep,
+    arg) or None in its per-parse memo table, keyed by (token index, context,
+    args).  The args it returns are frozen, so each subtree is recognized once
+    per parse and shared between every verb span hypothesis and clause
+    alternative that contains it.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapped(self, root_token, *args):
+            key = root_token.index, context, args
+            memo = self.local.memo
+            if key in memo:
+                INSTRUMENT.count('surface_memo_hits')
+                rr = memo[key]
+            else:
+                rr = f(self, root_token, *args)
+                memo[key] = rr
+            if rr is None:
+                return None
+            return list(rr)
+        return wrapped
+    return decorator
+
+
 class VerbExtractor(object):
     """
     Finds and parses verbs.
@@ -148,6 +179,11 @@ class ParseToSurface(object):
         self.pro_adverb_mgr = pro_adverb_mgr
         self.time_of_day_mgr = time_of_day_mgr
 
+        # Per thread, the memo table of the parse being recognized: (token
+        # index, context, args) -> list of (prep, arg) or None.  See
+        # memoized().
+        self.local = threading.local()
+
         self.tag2recognize_arg = {
             'DT': self.recog_dt,
             'EX': self.recog_ex,
@@ -190,6 +226,7 @@ class ParseToSurface(object):
     def recog_jj(self, root_token):
         return [(None, Adjective(root_token.text))]
 
+    @memoized('comparative')
     def recog_jjr(self, root_token):
         if len(root_token.downs) != 1:
             return []
@@ -385,6 +422,7 @@ class ParseToSurface(object):
             preps_optionss.append((prep, nn))
         return preps_optionss
 
+    @memoized('common_noun')
     def recog_common_noun(self, root_token, noun, n2):
         head_pp_nn = self.recog_common_noun_head(root_token, noun, n2)
 
@@ -397,11 +435,12 @@ class ParseToSurface(object):
         tail_preps, tail_optionss = list(zip(*preps_optionss))
         for head_p, head_n in head_pp_nn:
             for tail_options in product(*tail_optionss):
-                n = deepcopy(head_n)
-                n.preps_nargs = list(zip(tail_preps, tail_options))
+                n = head_n.replace(
+                    preps_nargs=list(zip(tail_preps, tail_options)))
                 rr.append((head_p, n))
         return rr
 
+    @memoized('direction')
     def recog_direction(self, root_token):
         if root_token.text not in self.directions:
             return []
@@ -541,6 +580,7 @@ class ParseToSurface(object):
         """
         return None
 
+    @memoized('verb_arg')
     def recognize_verb_arg(self, root_token):
         """
         Token -> None or list of (prep or None, SurfaceArgument)
@@ -783,9 +823,12 @@ class ParseToSurface(object):
         n_conjs = self.conjs_from_verb_args(pp_nn, subj_argx)
         return v_conjs & n_conjs
 
-    def recognize_clause(self, root_token, is_root_clause):
+    def recognize_clause(self, root_token, is_root_clause, allowance):
         """
-        root token -> yields SurfaceContentClause
+        root token, whether root clause, Allowance -> list of
+        SurfaceContentClause
+
+        Stops early (with what it has) if the allowance runs out.
         """
         cc = []
         for verb_span_pair, vv in \
@@ -807,28 +850,40 @@ class ParseToSurface(object):
                 assert 0 <= subj_argx < len(ppp_nnn)
 
             for v in vv:
+                # The verbs and args are frozen, so the clauses share them, with
+                # one variant of the verb per conjugation.
+                conj2v = {}
                 for pp_nn in product(*ppp_nnn):
+                    if not allowance.spend('surface'):
+                        return cc
                     pp_nn = list(pp_nn)
                     for conj in self.possible_conjugations(v, pp_nn, subj_argx):
                         complementizer = Complementizer.ZERO
-                        new_v = deepcopy(v)
-                        new_v.conj = conj
+                        new_v = conj2v.get(conj)
+                        if new_v is None:
+                            new_v = v.replace(conj=conj)
+                            conj2v[conj] = new_v
                         c = SurfaceContentClause(
-                            complementizer, new_v, adverbs, deepcopy(pp_nn),
-                            vmain_index)
+                            complementizer, new_v, adverbs, pp_nn, vmain_index)
                         cc.append(c)
         return cc
 
-    def recog(self, parse):
+    def recog(self, parse, allowance=UNLIMITED):
         """
-        Parse -> yields SurfaceSentence
+        Parse, Allowance -> yields SurfaceSentence
         """
         assert isinstance(parse, Parse)
 
         assert parse.tokens
         end_punct = self.end_punct_clf.classify(parse.tokens[-1].text)
 
-        for clause in self.recognize_clause(parse.root, is_root_clause=True):
+        # Subtrees are memoized per parse.
+        self.local.memo = {}
+        cc = self.recognize_clause(
+            parse.root, is_root_clause=True, allowance=allowance)
+        self.local.memo = {}
+
+        for clause in cc:
             if '?' in end_punct and clause.verb.is_imperative():
                 continue
             yield SurfaceSentence(clause, end_punct)
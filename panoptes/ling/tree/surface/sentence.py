@@ -1,8 +1,11 @@
+from panoptes.ling.tree.base import Structural
 from panoptes.ling.tree.surface.base import SayContext
 from panoptes.ling.tree.surface.content_clause import SurfaceContentClause
 
 
-class SurfaceSentence(object):
+class SurfaceSentence(Structural):
+    __slots__ = ('root', 'end_punct')
+
     def __init__(self, root, end_punct):
         self.root = root
         assert isinstance(self.root, SurfaceContentClause)
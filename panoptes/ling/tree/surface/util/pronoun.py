@@ -1,5 +1,4 @@
 from collections import defaultdict
-from copy import deepcopy
 
 from panoptes.etc.dicts import v2kk_from_k2v
 from panoptes.etc.enum import enum
@@ -241,11 +240,11 @@ class DetPronounManager(object):
         word -> list of Selectors
         """
         rr = self.determiner2selectors[s]
-        return deepcopy(rr)
+        return list(rr)
 
     def parse_pronoun(self, s):
         """
         word -> list of Selectors
         """
         rr = self.pronoun2selectors[s]
-        return deepcopy(rr)
+        return list(rr)
@@ -1,7 +1,9 @@
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+import threading
 
 from panoptes.etc.suffix_transform import SuffixTransform
 from panoptes.etc.suffix_generalizing_map import SuffixGeneralizingMap
+from panoptes.etc.suffix_trie import SuffixTrie
 from panoptes.ling.verb.annotation import annotate_as_aux
 
 
@@ -136,27 +138,23 @@ class VerbDerivation(object):
         past = [t.transform(lemma) for t in self.past]
         return Verb(lemma, pres_part, past_part, nonpast, past)
 
-    def identify_word(self, conjugated):
-        rr = []
-
-        s = self.pres_part.inverse_transform(conjugated)
-        if s:
-            rr.append((s, 1))
-
-        s = self.past_part.inverse_transform(conjugated)
-        if s:
-            rr.append((s, 2))
-
+    def each_field_transform(self):
+        """
+        -> yields (verb field index, SuffixTransform)
+        """
+        yield 1, self.pres_part
+        yield 2, self.past_part
         for i, t in enumerate(self.nonpast):
-            s = t.inverse_transform(conjugated)
-            if s:
-                rr.append((s, i + 3))
-
+            yield i + 3, t
         for i, t in enumerate(self.past):
+            yield i + 9, t
+
+    def identify_word(self, conjugated):
+        rr = []
+        for field_index, t in self.each_field_transform():
             s = t.inverse_transform(conjugated)
             if s:
-                rr.append((s, i + 9))
-
+                rr.append((s, field_index))
         return rr
 
 
@@ -197,10 +195,24 @@ def collect_verb_derivations(vv):
 class Conjugator(object):
     """
     Conjugates and un-conjugates verbs.
+
+    Safe to share between threads.  The caches only ever gain (or, for the
+    LRU, lose) entries whose values are computed the same way every time and
+    never changed, so a race just does the work twice.  The LRU's reordering
+    and eviction are done under a lock.
     """
 
-    def __init__(self, verbs):
-        self.identify_word_cache = {}
+    def __init__(self, verbs, identify_word_cache_size=65536):
+        # List of Verb it was made from (to make it again in another process).
+        self.verbs = verbs
+
+        # (word, is picky) -> list of (lemma, verb field index), LRU.  Guarded
+        # by identify_word_lock.
+        self.identify_word_cache = OrderedDict()
+        self.identify_word_cache_size = identify_word_cache_size
+        self.identify_word_lock = threading.Lock()
+
+        # Lemma -> Verb.  Plain dict (single gets and sets are atomic).
         self.verb_cache = {}
 
         self.verb_derivations, self.lemma2deriv_index = \
@@ -209,6 +221,21 @@ class Conjugator(object):
         self.deriv_index_picker = \
             SuffixGeneralizingMap(self.lemma2deriv_index, min)
 
+        # Appended suffix -> (SuffixTransform, list of (derivation index, verb
+        # field index) that conjugate with it), over the distinct transforms
+        # of every derivation.  Used to find the only transforms worth undoing
+        # for a word, and to undo each of them once.
+        key2t_ii = OrderedDict()
+        for i, deriv in enumerate(self.verb_derivations):
+            for field_index, t in deriv.each_field_transform():
+                key = t.truncate, t.repeat, t.append
+                if key not in key2t_ii:
+                    key2t_ii[key] = t, []
+                key2t_ii[key][1].append((i, field_index))
+        self.append_trie = SuffixTrie()
+        for t, ii in key2t_ii.values():
+            self.append_trie.add(t.append, (t, ii))
+
     @staticmethod
     def from_file(f):
         vv = conjugations_from_file(f)
@@ -237,20 +264,34 @@ class Conjugator(object):
         conjugated word, is picky -> list of (lemma, verb field index)
         """
         key = (word, is_picky_about_verbs)
-        lemmas_indexes = self.identify_word_cache.get(key)
-        if lemmas_indexes is not None:
-            return lemmas_indexes
-
-        # For each verb derivation, undo the conjugation in order to get the
-        # hypothetical original lemma.
+        with self.identify_word_lock:
+            lemmas_indexes = self.identify_word_cache.get(key)
+            if lemmas_indexes is not None:
+                self.identify_word_cache.move_to_end(key)
+                return lemmas_indexes
+
+        # For each conjugation whose appended suffix the word ends with, undo
+        # it in order to get the hypothetical original lemma.
         #
         # If the generalizing suffix map picks the same verb derivation we used
-        # for that lemma, it's a match.
-        lemmas_indexes = []
-        for i, deriv in enumerate(self.verb_derivations):
-            for lemma, field_index in deriv.identify_word(word):
-                if self.deriv_index_picker.get(lemma) == i:
-                    lemmas_indexes.append((lemma, field_index))
+        # for that lemma, it's a match.  Matches are listed in order of
+        # derivation, then verb field.
+        lemma2deriv_index = {}
+        found = []
+        for t, ii in self.append_trie.get(word):
+            lemma = t.inverse_transform(word)
+            if not lemma:
+                continue
+            deriv_index = lemma2deriv_index.get(lemma)
+            if deriv_index is None:
+                deriv_index = self.deriv_index_picker.get(lemma)
+                lemma2deriv_index[lemma] = deriv_index
+            for i, field_index in ii:
+                if i == deriv_index:
+                    found.append((i, field_index, lemma))
+        found.sort()
+        lemmas_indexes = [(lemma, field_index)
+                          for i, field_index, lemma in found]
 
         # If we're picky, and we have some results that contain known verbs,
         # forget about the results with unknown verbs.
@@ -265,6 +306,9 @@ class Conjugator(object):
 
         lemmas_indexes.append((word, 0))
 
-        key = (word, is_picky_about_verbs)
-        self.identify_word_cache[key] = lemmas_indexes
+        with self.identify_word_lock:
+            self.identify_word_cache[key] = lemmas_indexes
+            while self.identify_word_cache_size < \
+                    len(self.identify_word_cache):
+                self.identify_word_cache.popitem(last=False)
         return lemmas_indexes
@@ -1,12 +1,15 @@
 from panoptes.etc.enum import enum
+from panoptes.etc.frozen import Frozen
 from panoptes.ling.glue.inflection import Conjugation
 
 
-class Polarity(object):
+class Polarity(Frozen):
     """
     Linguistic polarity (English).
     """
 
+    __slots__ = ('tf', 'is_contrary')
+
     def __init__(self, tf, is_contrary):
         # The actual truth value.
         #
@@ -41,13 +44,15 @@ class Polarity(object):
         return Polarity(d['tf'], d['is_contrary'])
 
 
-class Aspect(object):
+class Aspect(Frozen):
     """
     Linguistic aspect (English).
 
     Just enough to handle the different renderings, nothing more.
     """
 
+    __slots__ = ('is_perf', 'is_prog')
+
     def __init__(self, is_perf, is_prog):
         self.is_perf = is_perf
 
@@ -110,7 +115,9 @@ ModalFlavor = enum("""ModalFlavor =
 """)
 
 
-class Modality(object):
+class Modality(Frozen):
+    __slots__ = ('flavor', 'is_cond')
+
     def __init__(self, flavor, is_cond):
         self.flavor = flavor
         self.is_cond = is_cond  # TODO: check where is_cond is wildcarded.
@@ -156,7 +163,7 @@ Tense = enum('Tense = PAST PRESENT FUTURE')
 VerbForm = enum('VerbForm = FINITE BARE_INF TO_INF GERUND SUBJLESS_GERUND')
 
 
-class DeepVerb(object):
+class DeepVerb(Frozen):
     """
     The collection of concepts underlying a verb that are intrinsic to it, like
     polarity, aspect, etc.
@@ -166,6 +173,9 @@ class DeepVerb(object):
     Note that there are combinations of fields that are invalid.
     """
 
+    __slots__ = ('lemma', 'polarity', 'tense', 'aspect', 'modality',
+                 'verb_form', 'is_pro_verb')
+
     def __init__(self, lemma, polarity, tense, aspect, modality, verb_form,
                  is_pro_verb):
         self.lemma = lemma
@@ -274,7 +284,7 @@ RelativeContainment = enum('RelativeContainment = ZERO WORD NOT_REL')
 SubjunctiveHandling = enum('SubjunctiveHandling = WERE_SBJ WAS_SBJ')
 
 
-class SurfaceVerb(object):
+class SurfaceVerb(Frozen):
     """
     A DeepVerb paired with concepts underlying verbs that tell us about their
     surroundings instead of the verb itself, like voice, conjugation, and so on.
@@ -282,8 +292,14 @@ class SurfaceVerb(object):
     Used in surface structure.
 
     Note that there are combinations of fields that are invalid.
+
+    Frozen, like its parts, so the verbs in the lookup tables are flyweights
+    shared by every parse that finds them.  Use replace() to get a variant.
     """
 
+    __slots__ = ('intrinsics', 'voice', 'conj', 'is_split', 'relative_cont',
+                 'contract_not', 'split_inf', 'sbj_handling')
+
     def __init__(self, intrinsics, voice, conj, is_split, relative_cont,
                  contract_not, split_inf, sbj_handling):
         self.intrinsics = intrinsics
@@ -1,12 +1,11 @@
-from collections import defaultdict
-from itertools import chain, product
 import json
 import os
 
-from panoptes.etc.combinatorics import collapse_int_tuples_to_wildcards, \
-    expand_int_tuples_from_wildcards
-from panoptes.ling.verb.conjugation import Conjugator, MAGIC_INTS_LEMMA
-from panoptes.ling.verb.verb import SurfaceVerb
+from panoptes.ling.verb.conjugation import Conjugator
+from panoptes.ling.verb.verb_table import VerbTable, load_verb_tables, \
+    save_verb_tables
+from panoptes.ling.verb.verb_table_builder import TABLE_SPECS, \
+    build_tables, lookup_options_per_field, table_input_hashes
 
 
 def remove_lemma_specific_word(sss):
@@ -20,147 +19,48 @@ def deverb(sss):
     return tuple(sss[0]), tuple(sss[1][:-1])
 
 
-def int_from_wildcardy_int_tuple(nn, num_options_per_field):
+def save_lookup_tables(name2s2nn, name2input, f):
     """
-    int tuple, num options per field -> int
-    """
-    r = 0
-    mul = 1
-    for n, z in zip(nn, num_options_per_field):
-        r += n * mul
-        mul *= (z + 1)  # Reserve the top slot for wildcard values.
-    return r
-
-
-def wildcardy_int_tuple_from_int(n, num_options_per_field):
-    """
-    int, num options per field -> int tuple
-    """
-    rr = []
-    for z in num_options_per_field:
-        r = n % (z + 1)
-        rr.append(r)
-        n //= (z + 1)
-    return rr
-
-
-def pack_verb_words(sss):
-    return ' '.join(list(sss[0]) + ['|'] + list(sss[1]))
-
-
-def unpack_verb_words(s):
-    ss = s.split()
-    x = ss.index('|')
-    return tuple(ss[:x]), tuple(ss[x + 1:])
-
-
-def to_ints(sss2vv, options_per_field, num_options_per_field, verify=False):
-    print('Collapsing:')
-    s2nn = {}
-    for sss in sorted(sss2vv):
-        vv = sss2vv[sss]
+    table name -> packed verb words -> list of packed int, table name -> input
+    hash, f -> None
 
-        s = pack_verb_words(sss)
-
-        nnn = []
-        for v in vv:
-            nn = v.to_int_tuple(options_per_field)
-            nnn.append(nn)
-
-        collapsed = collapse_int_tuples_to_wildcards(
-            nnn, num_options_per_field)
-
-        print('%6d -> %2d: %s' % (
-            len(nnn), len(collapsed), s.replace('|', '...')))
-
-        if verify:
-            nnn2 = sorted(expand_int_tuples_from_wildcards(
-                collapsed, num_options_per_field))
-            assert sorted(nnn) == nnn2
-
-        ints = []
-        for nn in collapsed:
-            n = int_from_wildcardy_int_tuple(nn, num_options_per_field)
-            ints.append(n)
-
-        s2nn[s] = ints
-    return s2nn
-
-
-def save_lookup_tables(be, pro, deverbed, f):
-    """
-    be, pro, deverbed, f -> None
+    Writes the binary format (see save_verb_tables()), or JSON if the file
+    name ends in .json.
     """
-    verbs_used = ['be', 'see', MAGIC_INTS_LEMMA]
-    options_per_field = SurfaceVerb.all_options(verbs_used, [False, True])
-    zz = list(map(len, options_per_field))
-    be_s2nn = to_ints(be, options_per_field, zz)
-    pro_verb_s2nn = to_ints(pro, options_per_field, zz)
-    deverbed_s2nn = to_ints(deverbed, options_per_field, zz)
-    d = {
-        'be': be_s2nn,
-        'pro-verb': pro_verb_s2nn,
-        'deverbed': deverbed_s2nn,
-    }
+    if not f.endswith('.json'):
+        save_verb_tables(name2s2nn, f, name2input)
+        return
 
     dir_name = os.path.dirname(f)
     if not os.path.exists(dir_name):
         os.makedirs(dir_name)
 
+    d = {
+        'tables': name2s2nn,
+        'inputs': name2input,
+    }
     json.dump(d, open(f, 'w'))
 
 
-def from_ints(s2nn, options_per_field, num_options_per_field):
-    sss2vv = defaultdict(list)
-    for s, nn in s2nn.items():
-        sss = unpack_verb_words(s)
-        vv = []
-        for n in nn:
-            ints = wildcardy_int_tuple_from_int(n, num_options_per_field)
-            v = SurfaceVerb.from_int_tuple(ints, options_per_field)
-            vv.append(v)
-        sss2vv[sss] = vv
-    return sss2vv
-
-
 def load_lookup_tables(f):
     """
-    f -> be, pro, deverbed
-    """
-    verbs_used = ['be', 'see', MAGIC_INTS_LEMMA]
-    options_per_field = SurfaceVerb.all_options(verbs_used, [False, True])
-    zz = list(map(len, options_per_field))
-    d = json.load(open(f))
-    be = from_ints(d['be'], options_per_field, zz)
-    pro = from_ints(d['pro-verb'], options_per_field, zz)
-    deverbed = from_ints(d['deverbed'], options_per_field, zz)
-    return be, pro, deverbed
+    f -> table name -> VerbTable, table name -> input hash
 
-
-def construct_one_lookup_table(verb_sayer, lemmas, is_pro_verbs):
-    finite_options = SurfaceVerb.finite_options(lemmas, is_pro_verbs)
-    nonfinite_options = SurfaceVerb.nonfinite_options(lemmas, is_pro_verbs)
-    sss2vv = defaultdict(list)
-    for aa in chain(product(*finite_options), product(*nonfinite_options)):
-        v = SurfaceVerb.from_tuple(aa)
-        for sss in verb_sayer.get_all_say_options(v):
-            sss = (tuple(sss[0]), tuple(sss[1]))
-            sss2vv[sss].append(v)
-    return sss2vv
-
-
-def construct_lookup_tables(sayer):
+    Memory-maps the binary format, or reads JSON if the file name ends in
+    .json.  Either way, SurfaceVerbs are only decoded on lookup.  Tables saved
+    without input hashes get none.
     """
-    None -> be, pro, deverbed
-    """
-    print('Conjugating forms of "to be"...')
-    be = construct_one_lookup_table(sayer, ['be'], [False, True])
-    print('Conjugating pro-verbs...')
-    pro = construct_one_lookup_table(sayer, ['see'], [True])
-    print('Conjugating all other verbs...')
-    deverbed = construct_one_lookup_table(sayer, [MAGIC_INTS_LEMMA], [False])
-    print('Done conjugating.')
-    return be, pro, deverbed
+    options_per_field = lookup_options_per_field()
+    if not f.endswith('.json'):
+        return load_verb_tables(f, options_per_field)
+
+    d = json.load(open(f))
+    if 'tables' not in d:
+        d = {'tables': d, 'inputs': {}}
+    name2table = {}
+    for name, s2nn in d['tables'].items():
+        name2table[name] = VerbTable.from_s2nn(s2nn, options_per_field)
+    return name2table, d['inputs']
 
 
 class VerbParser(object):
@@ -172,45 +72,80 @@ class VerbParser(object):
         #
         # The "to be" table.  "To be" conjugates specially.
         self.be_sss2vv = be_sss2vv
-        assert isinstance(self.be_sss2vv, defaultdict)
+        assert isinstance(self.be_sss2vv, VerbTable)
 
         # (pre words, main words) -> list of SurfaceVerb.
         #
         # Pro-verbs also conjugate specially.
         self.pro_verb_sss2vv = pro_verb_sss2vv
-        assert isinstance(self.pro_verb_sss2vv, defaultdict)
+        assert isinstance(self.pro_verb_sss2vv, VerbTable)
 
         # (pre words, main words with int) -> list of de-lemma'd SurfaceVerb.
         #
         # Table for everything else.  Replace conjugated lemma-specific word
         # with its field index to use.
         self.deverbed_sss2vv = deverbed_sss2vv
-        assert isinstance(self.deverbed_sss2vv, defaultdict)
+        assert isinstance(self.deverbed_sss2vv, VerbTable)
 
         # Used by main_sss2vv parsing.
         self.deverbed_sss_set = \
             set(filter(bool, list(map(remove_lemma_specific_word,
                                  self.deverbed_sss2vv))))
 
+    @staticmethod
+    def from_tables(conjugator, name2table):
+        return VerbParser(conjugator, name2table['be'],
+                          name2table['pro-verb'], name2table['deverbed'])
+
     @staticmethod
     def load(conjugator, f):
-        be, pro, deverbed = load_lookup_tables(f)
-        return VerbParser(conjugator, be, pro, deverbed)
+        name2table, _ = load_lookup_tables(f)
+        return VerbParser.from_tables(conjugator, name2table)
 
     @staticmethod
-    def regenerate(verb_sayer, f):
-        be, pro, deverbed = construct_lookup_tables(verb_sayer)
-        save_lookup_tables(be, pro, deverbed, f)
-        return VerbParser(verb_sayer.conjugator, be, pro, deverbed)
+    def regenerate(verb_sayer, f, num_workers=None, keep=None):
+        """
+        VerbSayer, f, number of worker processes, table name -> VerbTable to
+        keep as is -> VerbParser
+
+        Build the tables (other than the ones to keep) and save them with
+        their input hashes.
+        """
+        conjugator = verb_sayer.conjugator
+        keep = keep or {}
+        name2s2nn = {}
+        for name, table in keep.items():
+            name2s2nn[name] = table.to_s2nn()
+        specs = [spec for spec in TABLE_SPECS if spec[0] not in keep]
+        name2s2nn.update(build_tables(conjugator.verbs, specs, num_workers))
+        save_lookup_tables(name2s2nn, table_input_hashes(conjugator), f)
+        return VerbParser.load(conjugator, f)
 
     @staticmethod
-    def load_or_regenerate(verb_sayer, f):
-        if os.path.exists(f):
-            print('Loading from "%s"' % f)
-            return VerbParser.load(verb_sayer.conjugator, f)
-        else:
+    def load_or_regenerate(verb_sayer, f, num_workers=None):
+        """
+        VerbSayer, f, number of worker processes -> VerbParser
+
+        Rebuilds just the tables whose inputs (conjugations used, code
+        version) changed since they were saved.
+        """
+        if not os.path.exists(f):
             print('"%s" does not exist, constructing from scratch' % f)
-            return VerbParser.regenerate(verb_sayer, f)
+            return VerbParser.regenerate(verb_sayer, f, num_workers)
+
+        print('Loading from "%s"' % f)
+        name2table, name2old = load_lookup_tables(f)
+        name2input = table_input_hashes(verb_sayer.conjugator)
+        keep = {}
+        for name, table in name2table.items():
+            if name2old.get(name) == name2input.get(name):
+                keep[name] = table
+        if len(keep) == len(TABLE_SPECS):
+            return VerbParser.from_tables(verb_sayer.conjugator, name2table)
+
+        stale = sorted(set(name2input) - set(keep))
+        print('Inputs of %s changed, rebuilding' % ', '.join(stale))
+        return VerbParser.regenerate(verb_sayer, f, num_workers, keep)
 
     def parse_field_index_replacing(self, sss):
         """
@@ -240,16 +175,19 @@ class VerbParser(object):
                    tuple(list(deverbed_sss[1]) + [str(field_index)]))
             sub_rr = self.deverbed_sss2vv[key]
 
-            # Put our lemma into the results found.
+            # Put our lemma into (new verbs sharing the rest of) the results
+            # found.  The table entries are shared, so never change them.
             for r in sub_rr:
-                r.intrinsics.lemma = lemma
-
-            rr += sub_rr
+                intrinsics = r.intrinsics.replace(lemma=lemma)
+                rr.append(r.replace(intrinsics=intrinsics))
         return rr
 
     def parse(self, sss):
         """
         (pre words tuple, main words tuple) -> list of SurfaceVerb
+
+        The verbs are frozen and may be shared with other callers.  Safe to
+        call from several threads at once.
         """
         rr = []
         rr += self.be_sss2vv[sss]
@@ -0,0 +1,198 @@
+from array import array
+import json
+import mmap
+import os
+import struct
+import sys
+
+from panoptes.etc.atomic import atomic_write
+from panoptes.ling.verb.verb import SurfaceVerb
+
+
+# Start of a binary verb table file.
+MAGIC = b'PNVERBS1'
+
+# Magic, then the length of the JSON header that follows it.
+PREFIX = struct.Struct('<8sQ')
+
+
+def int_from_wildcardy_int_tuple(nn, num_options_per_field):
+    """
+    int tuple, num options per field -> int
+    """
+    r = 0
+    mul = 1
+    for n, z in zip(nn, num_options_per_field):
+        r += n * mul
+        mul *= (z + 1)  # Reserve the top slot for wildcard values.
+    return r
+
+
+def wildcardy_int_tuple_from_int(n, num_options_per_field):
+    """
+    int, num options per field -> int tuple
+    """
+    rr = []
+    for z in num_options_per_field:
+        r = n % (z + 1)
+        rr.append(r)
+        n //= (z + 1)
+    return rr
+
+
+def pack_verb_words(sss):
+    return ' '.join(list(sss[0]) + ['|'] + list(sss[1]))
+
+
+def unpack_verb_words(s):
+    ss = list(map(sys.intern, s.split()))
+    x = ss.index('|')
+    return tuple(ss[:x]), tuple(ss[x + 1:])
+
+
+class VerbTable(object):
+    """
+    (pre words, main words) -> list of SurfaceVerb.
+
+    Each key maps to a span of a flat sequence of packed (wildcardy) ints, one
+    per SurfaceVerb, sorted.  The SurfaceVerbs are only decoded when their key
+    is looked up, and then kept.  The ints may be a memoryview of a mapped
+    file (see load_verb_tables()), so processes share one copy of them.
+
+    Lookups of unknown keys return an empty list (without adding the key).
+    The SurfaceVerbs are frozen and shared by every lookup.  Safe to share
+    between threads: a race just decodes a key twice.
+    """
+
+    def __init__(self, sss2span, ints, options_per_field):
+        # (pre words, main words) -> (begin, end) index into ints.
+        self.sss2span = sss2span
+
+        # Sequence of packed ints.
+        self.ints = ints
+
+        self.options_per_field = options_per_field
+        self.num_options_per_field = list(map(len, options_per_field))
+
+        # (pre words, main words) -> list of SurfaceVerb decoded so far.
+        self.sss2vv = {}
+
+    @staticmethod
+    def from_s2nn(s2nn, options_per_field):
+        """
+        packed verb words -> list of packed int, options per field
+            -> VerbTable
+        """
+        sss2span = {}
+        ints = array('Q')
+        for s in sorted(s2nn):
+            begin = len(ints)
+            ints.extend(sorted(s2nn[s]))
+            sss2span[unpack_verb_words(s)] = begin, len(ints)
+        return VerbTable(sss2span, ints, options_per_field)
+
+    def to_s2nn(self):
+        """
+        -> packed verb words -> list of packed int
+        """
+        s2nn = {}
+        for sss, (begin, end) in self.sss2span.items():
+            s2nn[pack_verb_words(sss)] = list(self.ints[begin:end])
+        return s2nn
+
+    def __len__(self):
+        return len(self.sss2span)
+
+    def __iter__(self):
+        return iter(self.sss2span)
+
+    def __contains__(self, sss):
+        return sss in self.sss2span
+
+    def decode(self, n):
+        """
+        packed int -> SurfaceVerb
+        """
+        nn = wildcardy_int_tuple_from_int(n, self.num_options_per_field)
+        return SurfaceVerb.from_int_tuple(nn, self.options_per_field)
+
+    def __getitem__(self, sss):
+        vv = self.sss2vv.get(sss)
+        if vv is not None:
+            return vv
+
+        span = self.sss2span.get(sss)
+        if span is None:
+            return []
+
+        begin, end = span
+        vv = [self.decode(n) for n in self.ints[begin:end]]
+        self.sss2vv[sss] = vv
+        return vv
+
+
+def save_verb_tables(name2s2nn, f, name2input=None):
+    """
+    table name -> packed verb words -> list of packed int, output file, table
+    name -> hash of its inputs ->
+
+    Binary layout: PREFIX, a JSON header giving the span of each key of each
+    table (and the input hashes), zero padding to a multiple of 8 bytes, then
+    all the packed ints as one array of uint64.  Written atomically.
+    """
+    ints = array('Q')
+    name2spans = {}
+    for name in sorted(name2s2nn):
+        s2nn = name2s2nn[name]
+        spans = []
+        for s in sorted(s2nn):
+            begin = len(ints)
+            ints.extend(sorted(s2nn[s]))
+            spans.append([s, begin, len(ints)])
+        name2spans[name] = spans
+
+    header = json.dumps({
+        'byteorder': sys.byteorder,
+        'inputs': name2input or {},
+        'tables': name2spans,
+    }, sort_keys=True).encode('utf-8')
+    pad = -(PREFIX.size + len(header)) % ints.itemsize
+
+    d = os.path.dirname(f) or '.'
+    if not os.path.exists(d):
+        os.makedirs(d)
+    with atomic_write(f, 'wb') as out:
+        out.write(PREFIX.pack(MAGIC, len(header)))
+        out.write(header)
+        out.write(b'\0' * pad)
+        ints.tofile(out)
+
+
+def load_verb_tables(f, options_per_field):
+    """
+    binary verb table file, options per field
+        -> table name -> VerbTable, table name -> hash of its inputs
+
+    The file is memory-mapped read-only and left mapped for the life of the
+    tables.
+    """
+    with open(f, 'rb') as fp:
+        mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, header_size = PREFIX.unpack_from(mm, 0)
+    assert magic == MAGIC
+    begin = PREFIX.size
+    header = json.loads(mm[begin:begin + header_size].decode('utf-8'))
+    assert header['byteorder'] == sys.byteorder
+
+    begin += header_size
+    begin += -begin % 8
+    ints = memoryview(mm)[begin:].cast('Q')
+
+    name2table = {}
+    for name, spans in header['tables'].items():
+        sss2span = {}
+        for s, a, z in spans:
+            sss2span[unpack_verb_words(s)] = a, z
+        name2table[name] = VerbTable(sss2span, ints, options_per_field)
+    return name2table, header.get('inputs', {})
@@ -0,0 +1,210 @@
+from collections import defaultdict
+from itertools import product
+import hashlib
+import json
+from multiprocessing import Pool
+import os
+
+import panoptes.etc.combinatorics
+from panoptes.etc.combinatorics import collapse_int_tuples_to_wildcards_fast
+import panoptes.ling.glue.inflection
+import panoptes.ling.verb.annotation
+import panoptes.ling.verb.conjugation
+from panoptes.ling.verb.conjugation import Conjugator, MAGIC_INTS_LEMMA
+import panoptes.ling.verb.verb
+from panoptes.ling.verb.verb import SurfaceVerb
+import panoptes.ling.verb.verb_sayer
+from panoptes.ling.verb.verb_sayer import VerbSayer
+import panoptes.ling.verb.verb_table
+from panoptes.ling.verb.verb_table import int_from_wildcardy_int_tuple, \
+    pack_verb_words, wildcardy_int_tuple_from_int
+
+
+# (table name, lemmas, is pro-verb options) per lookup table.
+TABLE_SPECS = [
+    ('be', ['be'], [False, True]),
+    ('pro-verb', ['see'], [True]),
+    ('deverbed', [MAGIC_INTS_LEMMA], [False]),
+]
+
+
+# Verbs the sayer conjugates for every table (see EphemeralSayer).
+AUX_LEMMAS = ['be', 'have', 'do']
+
+
+# Modules whose code decides what goes in the tables.  Their source is part of
+# each table's input hash.
+CODE_MODULES = [
+    panoptes.etc.combinatorics,
+    panoptes.ling.glue.inflection,
+    panoptes.ling.verb.annotation,
+    panoptes.ling.verb.conjugation,
+    panoptes.ling.verb.verb,
+    panoptes.ling.verb.verb_sayer,
+    panoptes.ling.verb.verb_table,
+]
+
+
+# How many jobs to cut the work into per worker.
+JOBS_PER_WORKER = 4
+
+
+def lookup_options_per_field():
+    """
+    -> options per field of the SurfaceVerbs in the lookup tables
+    """
+    lemmas = [lemma for _, ll, _ in TABLE_SPECS for lemma in ll]
+    return SurfaceVerb.all_options(lemmas, [False, True])
+
+
+def code_version():
+    """
+    -> hex digest of the source of CODE_MODULES
+    """
+    h = hashlib.sha1()
+    for module in CODE_MODULES:
+        with open(module.__file__, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def table_input_hashes(conjugator):
+    """
+    Conjugator -> table name -> hex digest of everything the table is made from
+
+    That is the code version, the table's spec, and the conjugations (rows of
+    conjugations.csv, as derived) of the verbs the sayer uses for it.  Edits to
+    the conjugations of other verbs don't change it.
+    """
+    version = code_version()
+    name2input = {}
+    for spec in TABLE_SPECS:
+        name, lemmas, _ = spec
+        verbs = [conjugator.create_verb(lemma).dump()
+                 for lemma in AUX_LEMMAS + lemmas]
+        s = json.dumps([version, spec, verbs], sort_keys=True)
+        name2input[name] = hashlib.sha1(s.encode('utf-8')).hexdigest()
+    return name2input
+
+
+# The sayer of this worker process (built once by init_worker()).
+_SAYER = None
+
+
+def init_worker(verbs):
+    """
+    list of Verb (see Conjugator) ->
+    """
+    global _SAYER
+    _SAYER = VerbSayer(Conjugator(verbs))
+
+
+def say_job(job):
+    """
+    (options per field, fixed leading values) -> packed verb words -> list of
+    packed int
+
+    Say every SurfaceVerb in the slice of the option space that starts with
+    the given values.
+    """
+    options_per_field, prefix = job
+    all_options = lookup_options_per_field()
+    zz = list(map(len, all_options))
+    s2nn = defaultdict(list)
+    for aa in product(*options_per_field[len(prefix):]):
+        v = SurfaceVerb.from_tuple(prefix + aa)
+        n = int_from_wildcardy_int_tuple(v.to_int_tuple(all_options), zz)
+        for sss in _SAYER.get_all_say_options(v):
+            s2nn[pack_verb_words(sss)].append(n)
+    return dict(s2nn)
+
+
+def collapse_job(nn):
+    """
+    list of packed int -> list of packed int with wildcards
+    """
+    zz = list(map(len, lookup_options_per_field()))
+    nnn = [wildcardy_int_tuple_from_int(n, zz) for n in nn]
+    collapsed = collapse_int_tuples_to_wildcards_fast(nnn, zz)
+    return [int_from_wildcardy_int_tuple(nn, zz) for nn in collapsed]
+
+
+def slice_option_space(options_per_field, num_slices):
+    """
+    options per field, min number of slices -> list of (options per field,
+    prefix)
+
+    Split the product of the options into slices by fixing the values of its
+    leading fields.  In product order, so concatenating the slices gives the
+    same order as the whole.
+    """
+    x = 0
+    num_prefixes = 1
+    while num_prefixes < num_slices and x < len(options_per_field):
+        num_prefixes *= len(options_per_field[x])
+        x += 1
+    return [(options_per_field, prefix)
+            for prefix in product(*options_per_field[:x])]
+
+
+def map_in_process(f, items, chunksize):
+    return list(map(f, items))
+
+
+def build_tables(verbs, specs, num_workers=None):
+    """
+    list of Verb, table specs, number of worker processes
+        -> table name -> packed verb words -> list of packed int
+
+    Say every verb in the option space of each table, then collapse the verbs
+    of each verb words into wildcards, both across a pool of processes.  Gives
+    the same tables as doing it in order in one process.
+    """
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    num_slices = num_workers * JOBS_PER_WORKER
+
+    jobs = []
+    job_names = []
+    for name, lemmas, is_pro_verbs in specs:
+        for options in [SurfaceVerb.finite_options(lemmas, is_pro_verbs),
+                        SurfaceVerb.nonfinite_options(lemmas, is_pro_verbs)]:
+            for job in slice_option_space(options, num_slices):
+                jobs.append(job)
+                job_names.append(name)
+
+    if 1 < num_workers:
+        pool = Pool(num_workers, init_worker, (verbs,))
+        map_ = pool.map
+    else:
+        pool = None
+        init_worker(verbs)
+        map_ = map_in_process
+
+    try:
+        print('Conjugating %s in %d processes...' % (
+            ', '.join([spec[0] for spec in specs]), num_workers))
+        name2s2nn = {}
+        for name, s2nn in zip(job_names, map_(say_job, jobs, 1)):
+            all_s2nn = name2s2nn.setdefault(name, defaultdict(list))
+            for s, nn in s2nn.items():
+                all_s2nn[s] += nn
+
+        print('Collapsing...')
+        keys = [(name, s) for name in sorted(name2s2nn)
+                for s in sorted(name2s2nn[name])]
+        chunksize = max(len(keys) // num_slices, 1)
+        collapsed = map_(collapse_job, [name2s2nn[name][s] for name, s in keys],
+                         chunksize)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    r = {}
+    for (name, s), nn in zip(keys, collapsed):
+        print('%s: %6d -> %2d: %s' % (
+            name, len(name2s2nn[name][s]), len(nn), s.replace('|', '...')))
+        r.setdefault(name, {})[s] = nn
+    print('Done conjugating.')
+    return r
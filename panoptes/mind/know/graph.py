@@ -1,8 +1,16 @@
+from collections import defaultdict, deque
+
+
 class Node(object):
     def __init__(self, name):
         self.name = name
+
+        # List of (direction, name), in the order they were added.
         self.links = []
 
+        # Direction -> list of names, for looking in one direction.
+        self.direction2xx = defaultdict(list)
+
     def dump(self):
         return {
             'name': self.name,
@@ -11,10 +19,19 @@ class Node(object):
 
     def add_link(self, direction, name):
         self.links.append((direction, name))
+        self.direction2xx[direction].append(name)
+
+    def remove_last_link(self):
+        direction, name = self.links.pop()
+        self.direction2xx[direction].pop()
 
 
 class Graph(object):
-    def __init__(self):
+    def __init__(self, journal=None):
+        # Called with a function that reverts each mutation (see
+        # Memory.journal()).
+        self.journal = journal
+
         self.x2node = {}
         self.direction2inverse = {
             'is_north_of': 'is_south_of',
@@ -47,83 +64,143 @@ class Graph(object):
             return n
 
         self.x2node[name] = Node(name)
+        if self.journal:
+            self.journal(lambda: self.x2node.pop(name))
         return self.x2node[name]
 
+    def add_link(self, node, direction, to_x):
+        node.add_link(direction, to_x)
+        if self.journal:
+            self.journal(node.remove_last_link)
+
     def link(self, from_x, direction, to_x):
         assert direction in self.direction2inverse
         from_node = self.get(from_x)
-        from_node.add_link(direction, to_x)
+        self.add_link(from_node, direction, to_x)
         inverse_direction = self.direction2inverse[direction]
         to_node = self.get(to_x)
-        to_node.add_link(inverse_direction, from_x)
+        self.add_link(to_node, inverse_direction, from_x)
 
     def look_toward_direction(self, from_x, direction):
         direction = self.direction2inverse[direction]
         node = self.get(from_x)
-        rr = []
-        for link_direction, to_x in node.links:
-            if link_direction == direction:
-                rr.append(to_x)
-        return rr
+        return list(node.direction2xx.get(direction, []))
 
     def look_from_direction(self, from_x, direction):
         assert direction in self.direction2inverse
         node = self.get(from_x)
-        rr = []
-        for link_direction, to_x in node.links:
-            if link_direction == direction:
-                rr.append(to_x)
-        return rr
+        return list(node.direction2xx.get(direction, []))
+
+    def shortest_path(self, from_x, to_x):
+        """
+        from, to -> list of directions or None if unreachable
 
-    def sub_decide_path(self, from_x, to_x, visited):
+        Breadth-first, following links in the order they were added, so ties
+        go to the same path that a depth-first search would find first.
+        """
         if from_x == to_x:
             return []
 
-        node = self.get(from_x)
-        best_path = None
-        for direction, next_x in node.links:
-            if next_x in visited:
+        x2prev = {from_x: None}
+        queue = deque([from_x])
+        while queue:
+            x = queue.popleft()
+            node = self.x2node.get(x)
+            if not node:
                 continue
-            path = self.sub_decide_path(
-                next_x, to_x, visited + [from_x])
-            if path is None:
+            for direction, next_x in node.links:
+                if next_x in x2prev:
+                    continue
+                x2prev[next_x] = (x, direction)
+                if next_x == to_x:
+                    return self.path_back(x2prev, to_x)
+                queue.append(next_x)
+        return None
+
+    def path_back(self, x2prev, to_x):
+        path = []
+        x = to_x
+        while x2prev[x]:
+            x, direction = x2prev[x]
+            path.append(direction)
+        path.reverse()
+        return path
+
+    def is_reachable(self, from_x, to_x, avoid_direction):
+        """
+        from, direction to avoid, to -> bool
+
+        Whether there is a path that never takes the given direction.
+        """
+        seen = set([from_x])
+        queue = deque([from_x])
+        while queue:
+            x = queue.popleft()
+            if x == to_x:
+                return True
+            node = self.x2node.get(x)
+            if not node:
                 continue
-            path = [direction] + path
-            if best_path is None or len(path) < len(best_path):
-                best_path = path
-        return best_path
-
-    def shortest_path(self, from_x, to_x):
-        return self.sub_decide_path(from_x, to_x, [])
+            for direction, xx in node.direction2xx.items():
+                if direction == avoid_direction:
+                    continue
+                for next_x in xx:
+                    if next_x in seen:
+                        continue
+                    seen.add(next_x)
+                    queue.append(next_x)
+        return False
+
+    def is_reachable_via(self, from_x, direction, to_x, avoid_direction):
+        """
+        from, direction, to, direction to avoid -> bool
+
+        Whether there is a walk that takes the given direction at least once
+        and the direction to avoid never.  Searches over (node, whether we have
+        taken the direction yet).
+        """
+        start = (from_x, False)
+        seen = set([start])
+        queue = deque([start])
+        while queue:
+            x, is_taken = queue.popleft()
+            if x == to_x and is_taken:
+                return True
+            node = self.x2node.get(x)
+            if not node:
+                continue
+            for link_direction, xx in node.direction2xx.items():
+                if link_direction == avoid_direction:
+                    continue
+                next_is_taken = is_taken or link_direction == direction
+                for next_x in xx:
+                    state = (next_x, next_is_taken)
+                    if state in seen:
+                        continue
+                    seen.add(state)
+                    queue.append(state)
+        return False
 
-    def sub_each_path(self, from_x, to_x, visited):
+    def is_direction(self, from_x, direction, to_x):
+        """
+        from, direction, to -> 'yes', 'no', or 'same_thing'
+
+        Judge each path from one to the other by its directions: a path that
+        never goes in the direction says no, one that goes in the direction but
+        never the opposite way says yes, and one that goes both ways says
+        nothing.  No wins over yes, and if nothing says anything it's a no.
+        """
         if from_x == to_x:
-            yield visited + []
+            return 'same_thing'
 
-        node = self.get(from_x)
-        for direction, next_x in node.links:
-            if next_x in visited:
-                continue
-            for path in self.sub_each_path(next_x, to_x, visited + [from_x]):
-                yield [direction] + path
+        if self.is_reachable(from_x, to_x, direction):
+            return 'no'
 
-    def each_path(self, from_x, to_x):
-        for path in self.sub_each_path(from_x, to_x, []):
-            yield path
+        # Any walk found here contains a simple path that avoids the opposite
+        # direction.  That path must take the direction too, or it would have
+        # been found above, so it says yes.
+        opposite = self.direction2inverse[direction]
+        if self.is_reachable_via(from_x, direction, to_x, opposite):
+            return 'yes'
 
-    def is_direction(self, from_x, direction, to_x):
-        for path in self.each_path(from_x, to_x):
-            if not path:
-                return 'same_thing'
-
-            rels = set(path)
-            opposite = self.direction2inverse[direction]
-            if direction in rels:
-                if opposite in rels:
-                    continue
-                else:
-                    r = 'yes'
-            else:
-                r = 'no'
-            return r
         return 'no'
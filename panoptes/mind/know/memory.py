@@ -1,6 +1,7 @@
 from copy import deepcopy
 import json
 
+from panoptes.etc.trace import INFO, TRACE
 from panoptes.ling.glue.conjunction import Conjunction
 from panoptes.ling.glue.grammatical_number import N5
 from panoptes.ling.glue.inflection import Declension, Gender
@@ -18,6 +19,7 @@ from panoptes.ling.tree.deep.conjunction import DeepConjunction
 from panoptes.ling.tree.deep.content_clause import DeepContentClause
 from panoptes.ling.tree.deep.direction import DeepDirection
 from panoptes.mind.know.graph import Graph
+from panoptes.mind.know.noun_index import NounIndex
 from panoptes.mind.idea.clause import Clause, ClauseFeatures
 from panoptes.mind.idea.comparative import Comparative
 from panoptes.mind.idea.direction import Direction
@@ -63,8 +65,18 @@ class IdeaReference(object):
 
 class Memory(object):
     def __init__(self):
+        # Undo log of the open transactions (see begin()).  Each entry is a
+        # function that reverts one mutation.  undo_marks holds the log length
+        # at the start of each (possibly nested) transaction.
+        self.undo_log = []
+        self.undo_marks = []
+
         self.ideas = []
 
+        # Where to look when resolving nouns.  Must be updated on every change
+        # to self.ideas.
+        self.noun_index = NounIndex()
+
         self.type2decode = {
             Adjective: self.decode_adjective,
             DeepCommonNoun: self.decode_common_noun,
@@ -88,27 +100,38 @@ class Memory(object):
 
         self.gender_clf = GenderClassifier()
 
-        self.graph = Graph()
+        self.graph = Graph(self.journal)
+
+    def begin(self):
+        """
+        Start a transaction.  Until the matching commit() or rollback(), every
+        mutation of memory is logged so that it can be undone.
+        """
+        self.undo_marks.append(len(self.undo_log))
 
-    def make_checkpoint(self):
-        return deepcopy(self)
+    def commit(self):
+        """
+        Keep the changes made since the matching begin().
+        """
+        self.undo_marks.pop()
+        if not self.undo_marks:
+            self.undo_log = []
 
-    def load_checkpoint(self, checkpoint):
+    def rollback(self):
+        """
+        Undo the changes made since the matching begin(), newest first.
         """
-        This doesn't work!
+        mark = self.undo_marks.pop()
+        while mark < len(self.undo_log):
+            undo = self.undo_log.pop()
+            undo()
 
-        for attr in dir(checkpoint):
-            if attr.startswith('__'):
-                continue
-            setattr(self, attr, getattr(checkpoint, attr))
+    def journal(self, undo):
+        """
+        Record how to revert a mutation, if we are in a transaction.
         """
-        self.ideas = checkpoint.ideas
-        self.type2decode = checkpoint.type2decode
-        self.next_clause_id = checkpoint.next_clause_id
-        self.place_rels = checkpoint.place_rels
-        self.place_kinds = checkpoint.place_kinds
-        self.gender_clf = checkpoint.gender_clf
-        self.graph = checkpoint.graph
+        if self.undo_marks:
+            self.undo_log.append(undo)
 
     def show(self):
         print('=' * 80)
@@ -123,13 +146,67 @@ class Memory(object):
     def new_clause_id(self):
         r = self.next_clause_id
         self.next_clause_id += 1
+
+        def undo():
+            self.next_clause_id = r
+
+        self.journal(undo)
         return r
 
     def add_idea(self, idea):
         x = len(self.ideas)
         self.ideas.append(idea)
+        self.noun_index.add(x, idea)
+
+        def undo():
+            self.ideas.pop()
+            self.noun_index.remove(x)
+
+        self.journal(undo)
         return x
 
+    def replace_idea(self, x, idea):
+        self.ideas[x] = idea
+        self.noun_index.replace(x, idea)
+
+    def set_idea(self, x, idea):
+        """
+        Replace the idea at a memory index (eg, with None).
+        """
+        old = self.ideas[x]
+        self.replace_idea(x, idea)
+        self.journal(lambda: self.replace_idea(x, old))
+
+    def edit_idea(self, x):
+        """
+        memory index -> Idea
+
+        Get an idea in order to modify it in place.  Must be used instead of
+        self.ideas[x] for that, so the change can be rolled back.
+        """
+        idea = self.ideas[x]
+        if self.undo_marks:
+            old = deepcopy(idea)
+            self.journal(lambda: self.replace_idea(x, old))
+        return idea
+
+    def assign_noun(self, x, to):
+        """
+        memory index, Noun ->
+
+        Merge what we know from another Noun into the one at the index.
+        """
+        n = self.edit_idea(x)
+        n.assign(to)
+        self.noun_index.replace(x, n)
+
+    def add_place_kind(self, kind):
+        if kind in self.place_kinds:
+            return
+
+        self.place_kinds.add(kind)
+        self.journal(lambda: self.place_kinds.discard(kind))
+
     def go_to_the_source(self, x):
         while True:
             idea = self.ideas[x]
@@ -138,9 +215,17 @@ class Memory(object):
             x = idea.x
         return x
 
+    def each_noun_candidate(self, features):
+        """
+        NounFeatures -> yields (memory index, Idea), newest first
+
+        Only visits the ideas that the noun index says could match.
+        """
+        for i in self.noun_index.get_candidates(features, self.place_kinds):
+            yield i, self.ideas[i]
+
     def resolve_one_noun(self, features):
-        for i in range(len(self.ideas) - 1, -1, -1):
-            idea = self.ideas[i]
+        for i, idea in self.each_noun_candidate(features):
             if not idea:
                 continue
             if idea.matches_noun_features(
@@ -156,8 +241,7 @@ class Memory(object):
 
     def resolve_each_noun(self, features):
         true_ii = set()
-        for i in range(len(self.ideas) - 1, -1, -1):
-            idea = self.ideas[i]
+        for i, idea in self.each_noun_candidate(features):
             if not idea:
                 continue
             if idea.matches_noun_features(
@@ -171,8 +255,7 @@ class Memory(object):
 
     def resolve_plural_noun(self, features):
         rr = []
-        for i in range(len(self.ideas) - 1, -1, -1):
-            idea = self.ideas[i]
+        for i, idea in self.each_noun_candidate(features):
             if not idea:
                 continue
             if idea.matches_noun_features(
@@ -184,7 +267,7 @@ class Memory(object):
                 if 1 < len(rr):
                     return rr
 
-        idea = Noun.from_feature(features)
+        idea = Noun.from_features(features)
         x = self.add_idea(idea)
         return [x]
 
@@ -332,7 +415,7 @@ class Memory(object):
                         if isinstance(idea, Noun):
                             if not idea.kind:
                                 continue
-                            self.place_kinds.add(idea.kind)
+                            self.add_place_kind(idea.kind)
 
             assert xxx
             rel2xxx[rel] = xxx
@@ -382,8 +465,9 @@ class Memory(object):
             xx = self.resolve_plural_noun(features)
             return [xx]
         else:
-            print('Unhandled declension, bailing on this dsen:', \
-                Declension.to_str[d])
+            if TRACE.enabled(INFO):
+                TRACE.emit(INFO, 'memory.unhandled_declension',
+                           declension=Declension.to_str[d])
             return None
 
         xx = self.resolve_one_noun(features)
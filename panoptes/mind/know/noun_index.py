@@ -0,0 +1,163 @@
+from collections import defaultdict
+
+from panoptes.mind.idea.noun import Noun
+from panoptes.mind.idea.reverb import Reverb
+
+
+def keys_from_noun(n):
+    """
+    Noun -> list of keys to file it under
+    """
+    keys = [
+        ('query', n.query),
+        ('name', n.name),
+        ('kind', n.kind),
+        ('gender', n.gender),
+    ]
+    for s in set(n.attributes):
+        keys.append(('attr', s))
+    return keys
+
+
+class NounIndex(object):
+    """
+    Inverted indexes over the Nouns in Memory, for coreference resolution.
+
+    Every memory index that resolves to a Noun (the Noun itself and each
+    Reverb that points back to it, directly or through other Reverbs) is filed
+    under the query, name, kind, gender, and attributes of that Noun.  Given
+    NounFeatures, we return a superset of the memory indexes that could match,
+    newest first, without looking at the rest of memory.
+
+    Ideas can be replaced by anything (eg, a Noun by None, or back again on
+    rollback), so we keep the links between Reverbs and what they point to,
+    and refile everything that resolves through an idea when it changes.
+    """
+
+    def __init__(self):
+        # Memory index of a Reverb -> memory index it points to.
+        self.x2parent = {}
+
+        # Memory index -> memory indexes of the Reverbs that point to it.
+        self.x2children = defaultdict(set)
+
+        # Memory index of a Noun -> keys to file it and its Reverbs under.
+        self.noun2keys = {}
+
+        # Memory index -> keys it is currently filed under.
+        self.x2keys = {}
+
+        # Key -> memory indexes.
+        self.key2xx = defaultdict(set)
+
+    def resolve(self, x):
+        """
+        memory index -> memory index of the Noun it resolves to, or None
+        """
+        while x in self.x2parent:
+            x = self.x2parent[x]
+        return x if x in self.noun2keys else None
+
+    def subtree(self, x):
+        """
+        memory index -> it and every memory index that resolves through it
+        """
+        xx = [x]
+        for y in xx:
+            xx += self.x2children.get(y, ())
+        return xx
+
+    def refile(self, xx):
+        for x in xx:
+            for key in self.x2keys.pop(x, ()):
+                self.key2xx[key].discard(x)
+
+            source = self.resolve(x)
+            if source is None:
+                continue
+
+            keys = self.noun2keys[source]
+            self.x2keys[x] = keys
+            for key in keys:
+                self.key2xx[key].add(x)
+
+    def link(self, x, idea):
+        if isinstance(idea, Reverb):
+            self.x2parent[x] = idea.x
+            self.x2children[idea.x].add(x)
+        elif isinstance(idea, Noun):
+            self.noun2keys[x] = keys_from_noun(idea)
+
+    def unlink(self, x):
+        parent = self.x2parent.pop(x, None)
+        if parent is not None:
+            self.x2children[parent].discard(x)
+        self.noun2keys.pop(x, None)
+
+    def add(self, x, idea):
+        """
+        memory index, Idea ->
+
+        Index a new idea.
+        """
+        self.link(x, idea)
+        self.refile(self.subtree(x))
+
+    def remove(self, x):
+        """
+        memory index ->
+
+        Forget an idea (eg, because the transaction that added it was rolled
+        back).
+        """
+        self.unlink(x)
+        self.refile(self.subtree(x))
+
+    def replace(self, x, idea):
+        """
+        memory index, Idea or None ->
+
+        Refile an idea that was replaced or changed in place.  Everything that
+        resolves through it is refiled with it.
+        """
+        self.unlink(x)
+        self.link(x, idea)
+        self.refile(self.subtree(x))
+
+    def get_candidates(self, f, place_kinds):
+        """
+        NounFeatures, place kinds -> memory indexes, newest first
+
+        Every memory index that could match comes back, but some that don't
+        may too, so check them.  Uses whichever key narrows it down the most.
+        """
+        key_sets = [[('query', f.query)]]
+
+        if f.name:
+            key_sets.append([('name', f.name)])
+
+        if f.kind:
+            keys = [('kind', f.kind), ('kind', None)]
+            if f.kind == 'place':
+                for kind in place_kinds:
+                    keys.append(('kind', kind))
+            key_sets.append(keys)
+
+        if f.gender:
+            key_sets.append([('gender', f.gender), ('gender', None)])
+
+        for s in f.attributes:
+            key_sets.append([('attr', s)])
+
+        best_keys = None
+        best_size = None
+        for keys in key_sets:
+            size = sum([len(self.key2xx.get(key, ())) for key in keys])
+            if best_size is None or size < best_size:
+                best_keys = keys
+                best_size = size
+
+        xx = set()
+        for key in best_keys:
+            xx.update(self.key2xx.get(key, ()))
+        return sorted(xx, reverse=True)
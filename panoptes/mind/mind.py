@@ -1,3 +1,4 @@
+from panoptes.etc.instrument import INSTRUMENT
 from panoptes.mind.know.memory import Memory
 from panoptes.mind.know.user import UserManager
 from panoptes.mind.verb.manager import VerbSemanticsManager
@@ -13,21 +14,32 @@ class Mind(object):
         return self.user_mgr.new()
 
     def overhear(self, dsen, from_uids, to_uids):
-        checkpoint = self.memory.make_checkpoint()
+        self.memory.begin()
+        try:
+            r = self.decode_and_handle(dsen, from_uids, to_uids)
+        except:
+            self.memory.rollback()
+            raise
 
+        if not r:
+            self.memory.rollback()
+            return None
+
+        self.memory.commit()
+        return r
+
+    def decode_and_handle(self, dsen, from_uids, to_uids):
         from_xx = list(map(self.user_mgr.get, from_uids))
         to_xx = list(map(self.user_mgr.get, to_uids))
+        t = INSTRUMENT.start()
         x = self.memory.decode_dsen(dsen, from_xx, to_xx)
+        INSTRUMENT.stop('decode', t)
 
         if x is None:
-            self.memory.load_checkpoint(checkpoint)
             return None
 
         c = self.memory.ideas[x]
+        t = INSTRUMENT.start()
         r = self.semantics_mgr.handle(c)
-
-        if not r:
-            self.memory.load_checkpoint(checkpoint)
-            return None
-
+        INSTRUMENT.stop('handle', t)
         return r
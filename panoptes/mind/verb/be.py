@@ -56,9 +56,8 @@ class AgentIsTarget(ClauseMeaning):
             memory.graph.link(agent_x, direction, target.of_x)
             return Response()
         elif isinstance(agent, Noun) and isinstance(target, Noun):
-            agent.assign(target)
-            memory.ideas[agent_x] = agent
-            memory.ideas[target_x] = None
+            memory.assign_noun(agent_x, target)
+            memory.set_idea(target_x, None)
             return Response()
         else:
             pass
@@ -456,7 +455,7 @@ class AgentIn(ClauseMeaning):
         if len(place_xx) != 1:
             return None
 
-        agent = memory.ideas[agent_xx[0]]
+        agent = memory.edit_idea(agent_xx[0])
         place_x, = place_xx
         if c.adverbs == ['no', 'longer']:
             loc = NotAt(place_x)
@@ -482,7 +481,7 @@ class AgentIn(ClauseMeaning):
         place_xx = [xx[0] for xx in place_xxx]
 
         for agent_x in agent_xx:
-            agent = memory.ideas[agent_x]
+            agent = memory.edit_idea(agent_x)
             loc = AtOneOf(place_xx)
             agent.location_history.set_location(loc)
 
@@ -24,7 +24,7 @@ class Take(ClauseMeaning):
         if to_xx and len(to_xx) != 1:
             return None
 
-        agent = memory.ideas[agent_xx[0]]
+        agent = memory.edit_idea(agent_xx[0])
 
         for x in target_xx:
             agent.carrying.append(x)
@@ -32,7 +32,7 @@ class Take(ClauseMeaning):
         if to_xx:
             to_x, = to_xx
             for x in target_xx:
-                target = memory.ideas[x]
+                target = memory.edit_idea(x)
                 loc = At(to_x)
                 target.location_history.set_location(loc)
 
@@ -55,13 +55,13 @@ class Drop(ClauseMeaning):
             return None
 
         for x in agent_xx:
-            agent = memory.ideas[x]
+            agent = memory.edit_idea(x)
             agent.carrying = [n for n in agent.carrying if n not in target_xx]
 
         if to_xx:
             to_x, = to_xx
             for x in target_xx:
-                target = memory.ideas[x]
+                target = memory.edit_idea(x)
                 loc = At(to_x)
                 target.location_history.set_location(loc)
 
@@ -90,12 +90,12 @@ class PickUp(ClauseMeaning):
         else:
             at_x = None
         x, = agent_xx
-        agent = memory.ideas[x]
+        agent = memory.edit_idea(x)
         for x in target_xx:
             agent.carrying.append(x)
             if at_x is not None:
                 loc = At(at_x)
-                memory.ideas[x].location_history.set_location(loc)
+                memory.edit_idea(x).location_history.set_location(loc)
 
         return Response()
 
@@ -22,11 +22,11 @@ class Give(ClauseMeaning):
             return None
 
         for give_x in give_xx:
-            giver = memory.ideas[give_x]
+            giver = memory.edit_idea(give_x)
             giver.carrying = [x for x in giver.carrying if x not in what_xx]
 
         for recv_x in recv_xx:
-            receiver = memory.ideas[recv_x]
+            receiver = memory.edit_idea(recv_x)
             receiver.carrying += what_xx
 
             xx = []
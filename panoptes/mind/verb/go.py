@@ -30,12 +30,12 @@ def go_common(c, memory, agent_xx, to_xx, when_xx=None):
 
     to_x, = to_xx
     for x in agent_xx:
-        agent = memory.ideas[x]
+        agent = memory.edit_idea(x)
         loc = At(to_x)
         agent.location_history.set_location(loc, time_span)
         for x2 in agent.carrying:
             loc = At(to_x)
-            memory.ideas[x2].location_history.set_location(loc, time_span)
+            memory.edit_idea(x2).location_history.set_location(loc, time_span)
 
     return Response()
 
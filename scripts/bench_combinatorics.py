@@ -0,0 +1,83 @@
+import sys
+from time import monotonic
+
+from panoptes.etc.combinatorics import can_use_numpy, \
+    collapse_int_tuples_to_wildcards, \
+    collapse_int_tuples_to_wildcards_numpy, \
+    expand_int_tuples_from_wildcards, expand_int_tuples_from_wildcards_numpy
+from panoptes.ling.verb.verb_parser import load_lookup_tables
+from panoptes.ling.verb.verb_table import wildcardy_int_tuple_from_int
+from panoptes.ling.verb.verb_table_builder import lookup_options_per_field
+
+
+def timed(f, *args):
+    """
+    function, args -> (result, seconds)
+    """
+    t = monotonic()
+    r = f(*args)
+    return r, monotonic() - t
+
+
+def main():
+    """
+    Time wildcard expanding and collapsing, in pure Python vs numpy, on the
+    verb lookup tables, and check that they agree.
+
+    Optional argument: max number of keys per table (default: all).
+    """
+    verb_f = 'data/verbs.bin'
+    max_keys = int(sys.argv[1]) if 1 < len(sys.argv) else None
+
+    zz = list(map(len, lookup_options_per_field()))
+    use_numpy = can_use_numpy(zz)
+    if not use_numpy:
+        print('numpy is not installed, timing pure Python only')
+
+    name2table, _ = load_lookup_tables(verb_f)
+    for name in sorted(name2table):
+        s2nn = name2table[name].to_s2nn()
+        keys = sorted(s2nn)[:max_keys]
+
+        num_tuples = 0
+        name2secs = {'expand': 0.0, 'expand_numpy': 0.0, 'collapse': 0.0,
+                     'collapse_numpy': 0.0}
+        for s in keys:
+            collapsed = sorted([wildcardy_int_tuple_from_int(n, zz)
+                                for n in s2nn[s]])
+
+            expanded, secs = timed(
+                expand_int_tuples_from_wildcards, collapsed, zz)
+            name2secs['expand'] += secs
+            num_tuples += len(expanded)
+
+            r, secs = timed(collapse_int_tuples_to_wildcards, expanded, zz)
+            name2secs['collapse'] += secs
+            assert r == collapsed
+
+            if not use_numpy:
+                continue
+
+            r, secs = timed(
+                expand_int_tuples_from_wildcards_numpy, collapsed, zz)
+            name2secs['expand_numpy'] += secs
+            assert r == expanded
+
+            r, secs = timed(
+                collapse_int_tuples_to_wildcards_numpy, expanded, zz)
+            name2secs['collapse_numpy'] += secs
+            assert r == collapsed
+
+        print('-- %s (%d keys, %d tuples)' % (name, len(keys), num_tuples))
+        for stage in ['expand', 'collapse']:
+            secs = name2secs[stage]
+            line = '   * %s: python %.3f sec' % (stage, secs)
+            if use_numpy:
+                np_secs = name2secs[stage + '_numpy']
+                line += ', numpy %.3f sec (%.1fx)' % (
+                    np_secs, secs / max(np_secs, 1e-9))
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+from panoptes.dataset.babi import load_babi
+from panoptes.dataset.dataset import each_input
+from panoptes.ling.parse.backend import SpacyBackend
+from panoptes.ling.parse.rewriter import Rewriter
+from panoptes.ling.parse.table_backend import TableBackend
+
+
+def main():
+    d = 'data/tasks_1-20_v1-2/en-10k/'
+    out_f = 'data/parse_table.json'
+
+    # The texts the Parser would give its backends, from the training split
+    # only, so we don't learn from the texts we are evaluated on.
+    rewriter = Rewriter.default()
+    texts = set()
+    for task in load_babi(d, 'train').tasks:
+        for in_s in each_input(task.episodes):
+            text, _ = rewriter.rewrite(in_s)
+            texts.add(text)
+    texts = sorted(texts)
+
+    spacy = SpacyBackend()
+    table = TableBackend.empty()
+    for text, tokens in zip(texts, spacy.parse_many(texts, 256, 1)):
+        table.learn(text, tokens)
+    table.save(out_f)
+    print(table.stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+from time import time
+
+from panoptes.mind.know.graph import Graph
+
+
+def make_grid(size):
+    """
+    Rooms on a size x size grid, each linked to its neighbors to the north and
+    east.
+    """
+    g = Graph()
+    for y in range(size):
+        for x in range(size):
+            n = y * size + x
+            if x:
+                g.link(n, 'is_east_of', n - 1)
+            if y:
+                g.link(n, 'is_north_of', n - size)
+    return g
+
+
+def main():
+    for size in [4, 8, 16, 32, 64, 128]:
+        g = make_grid(size)
+        corner = size * size - 1
+
+        t0 = time()
+        path = g.shortest_path(0, corner)
+        t1 = time()
+        assert len(path) == 2 * (size - 1)
+        assert set(path) == set(['is_west_of', 'is_south_of'])
+
+        assert g.is_direction(corner, 'is_north_of', 0) == 'yes'
+        assert g.is_direction(0, 'is_north_of', corner) == 'no'
+        assert g.is_direction(size - 1, 'is_east_of', size - 1) == 'same_thing'
+        t2 = time()
+
+        print('%5d nodes: shortest_path %.3f ms, is_direction x3 %.3f ms' % (
+            size * size, (t1 - t0) * 1000, (t2 - t1) * 1000))
+
+
+if __name__ == '__main__':
+    main()
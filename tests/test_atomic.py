@@ -0,0 +1,65 @@
+import os
+from tempfile import TemporaryDirectory
+
+from panoptes.etc.atomic import atomic_write
+from panoptes.ling.english import Recognition
+from panoptes.ling.parse.table_backend import TableBackend
+from panoptes.ling.recognition_cache import RecognitionCache
+from panoptes.ling.verb.verb_table import save_verb_tables
+
+
+def umask():
+    r = os.umask(0)
+    os.umask(r)
+    return r
+
+
+def mode_of(f):
+    return os.stat(f).st_mode & 0o777
+
+
+def test_atomic_write():
+    with TemporaryDirectory() as d:
+        f = os.path.join(d, 'out.txt')
+        with atomic_write(f) as out:
+            out.write('old')
+        assert open(f).read() == 'old'
+        assert mode_of(f) == 0o666 & ~umask()
+
+        # A failed write leaves the old contents, and no temporary file.
+        try:
+            with atomic_write(f) as out:
+                out.write('new')
+                raise ValueError
+        except ValueError:
+            pass
+        assert open(f).read() == 'old'
+        assert os.listdir(d) == ['out.txt']
+
+
+def test_modes():
+    # Everything we write atomically gets the usual permissions of a new file.
+    want = 0o666 & ~umask()
+    with TemporaryDirectory() as d:
+        cache = RecognitionCache('x', 16, d)
+        cache.put('Where is Mary?', Recognition([], [], []))
+        f = cache.path_for('Where is Mary?')
+        assert mode_of(f) == want
+        assert os.listdir(os.path.dirname(f)) == [os.path.basename(f)]
+
+        f = os.path.join(d, 'parse_table.json')
+        TableBackend.empty().save(f)
+        assert mode_of(f) == want
+
+        f = os.path.join(d, 'verbs.bin')
+        save_verb_tables({}, f)
+        assert mode_of(f) == want
+
+
+def main():
+    test_atomic_write()
+    test_modes()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+import os
+
+import yaml
+
+from panoptes.ling.parse.parser import parses_from_tokens
+from panoptes.ling.parse.shape_cache import TOKEN_RE
+from panoptes.ling.parse.table_backend import TableToken
+
+
+FIXED_PARSES_FN = os.path.join(os.path.dirname(__file__), 'fixed_parses.yaml')
+
+
+def make_tokens(text, spec):
+    """
+    text, list of (tag, dep, head index) -> spacy-style tokens
+    """
+    ms = list(TOKEN_RE.finditer(text))
+    assert len(ms) == len(spec)
+    tokens = []
+    for i, (m, (tag, dep, _)) in enumerate(zip(ms, spec)):
+        tokens.append(TableToken(i, m.start(), m.group(0), tag, dep, None))
+    for t, (_, _, head) in zip(tokens, spec):
+        t.head = t if head is None else tokens[head]
+    return tokens
+
+
+def test_fixed_parses():
+    for d in yaml.safe_load(open(FIXED_PARSES_FN)):
+        parses = parses_from_tokens(make_tokens(d['text'], d['spacy']), {})
+        assert len(parses) == 1, d['text']
+        got = parses[0].format()
+        if got != d['fixed'].rstrip('\n'):
+            print(d['text'])
+            print(got)
+            assert False
+
+
+def main():
+    test_fixed_parses()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import pickle
+import random
+
+from panoptes.dataset.latency import GAMMA, PERCENTILES, Histogram, \
+    LatencyReport
+from panoptes.etc.instrument import Measurement
+
+
+def exact(values, num_values, p):
+    nn = sorted(values + [0] * (num_values - len(values)))
+    rank = -(-num_values * p // 100)
+    rank = min(max(rank, 1), num_values)
+    return nn[rank - 1]
+
+
+def test_counts_are_exact():
+    rand = random.Random(1337)
+    nn = [rand.randint(0, 50) for i in range(1000)]
+    h = Histogram()
+    for n in nn:
+        h.add(n)
+    pp = [1, 50, 95, 99, 100]
+    assert h.percentiles(1200, pp) == [exact(nn, 1200, p) for p in pp]
+    assert len(h.bucket2n) <= 50
+
+
+def test_timings_are_close():
+    rand = random.Random(1337)
+    secs = [rand.lognormvariate(-6, 2) for i in range(10000)]
+    h = Histogram(GAMMA)
+    for x in secs:
+        h.add(x)
+    max_error = (GAMMA - 1) / (GAMMA + 1)
+    for p in [10, 50, 90, 95, 99]:
+        want = exact(secs, len(secs), p)
+        got, = h.percentiles(len(secs), [p])
+        assert abs(got - want) <= want * max_error * 1.0001
+
+
+def test_merge():
+    a = LatencyReport()
+    b = LatencyReport()
+    both = LatencyReport()
+    for i in range(100):
+        m = Measurement({'deep': i * 0.001}, {'dsens_tried': i % 7})
+        (a if i % 3 else b).add(m)
+        both.add(m)
+    b = pickle.loads(pickle.dumps(b))
+    a.merge(b)
+    for name2hist, both_name2hist in [
+            (a.stage2hist, both.stage2hist),
+            (a.counter2hist, both.counter2hist)]:
+        for name, hist in both_name2hist.items():
+            assert name2hist[name].percentiles(100, PERCENTILES) == \
+                hist.percentiles(100, PERCENTILES)
+
+
+def main():
+    test_counts_are_exact()
+    test_timings_are_close()
+    test_merge()
+
+
+if __name__ == '__main__':
+    main()
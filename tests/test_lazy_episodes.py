@@ -0,0 +1,122 @@
+import json
+import os
+from tempfile import TemporaryDirectory
+
+from panoptes.dataset.babi import LazyEpisodes, index_fn, \
+    load_episode_offsets, task_from_fn
+
+
+# Three episodes.  Line numbers restart at 1 for each (the second ends on a
+# higher number than the first, the third is one line long and has no trailing
+# newline).
+TASK = '''1 Mary moved to the bathroom.
+2 John went to the hallway.
+3 Where is Mary? \tbathroom\t1
+
+1 Daniel went back to the hallway.
+2 Sandra moved to the garden.
+3 Where is Daniel? \thallway\t1
+4 John moved to the office.
+5 Where is John? \toffice\t4
+1 Where is nobody? \tnowhere\t1'''
+
+
+def write(f, text):
+    with open(f, 'w') as out:
+        out.write(text)
+
+
+def umask():
+    r = os.umask(0)
+    os.umask(r)
+    return r
+
+
+def test_episodes():
+    with TemporaryDirectory() as d:
+        fn = os.path.join(d, 'qa1_single-supporting-fact_test.txt')
+        write(fn, TASK)
+
+        task = task_from_fn(fn)
+        assert task.name == 'single-supporting-fact'
+        episodes = task.episodes
+        assert len(episodes) == 3
+
+        first = episodes[0]
+        assert first.pairs == [
+            ('Mary moved to the bathroom.', None),
+            ('John went to the hallway.', None),
+            ('Where is Mary?', 'bathroom'),
+        ]
+        assert len(episodes[1].pairs) == 5
+        assert episodes[1].pairs[-1] == ('Where is John?', 'office')
+
+        last = episodes[2]
+        assert last.pairs == [('Where is nobody?', 'nowhere')]
+        assert episodes[-1].pairs == last.pairs
+
+        for x in [3, -4]:
+            try:
+                episodes[x]
+                assert False
+            except IndexError:
+                pass
+
+        # Slices, as used to take the first n episodes and to shard them.
+        assert [e.pairs for e in episodes[:2]] == \
+            [first.pairs, episodes[1].pairs]
+        assert [e.pairs for e in episodes[1:]] == \
+            [episodes[1].pairs, last.pairs]
+        assert [e.pairs for e in episodes[::2]] == [first.pairs, last.pairs]
+        assert [e.pairs for e in episodes[:None]] == \
+            [e.pairs for e in episodes]
+        assert episodes[5:] == []
+
+
+def test_sidecar():
+    with TemporaryDirectory() as d:
+        fn = os.path.join(d, 'qa2_two-supporting-facts_test.txt')
+        write(fn, TASK)
+
+        offsets = load_episode_offsets(fn)
+        assert offsets[0] == 0
+        assert offsets[-1] == len(TASK.encode('utf-8'))
+        assert len(offsets) == 4
+
+        # The sidecar has the usual permissions of a new file.
+        idx_f = index_fn(fn)
+        mode = os.stat(idx_f).st_mode & 0o777
+        assert mode == 0o666 & ~umask()
+
+        # It is used while the task file is unchanged...
+        with open(idx_f) as f:
+            j = json.load(f)
+        j['offsets'] = [0, len(TASK)]
+        write(idx_f, json.dumps(j))
+        assert load_episode_offsets(fn) == [0, len(TASK)]
+
+        # ...but not once its mtime changes, even at the same size...
+        st = os.stat(fn)
+        os.utime(fn, (st.st_atime, st.st_mtime + 10))
+        assert load_episode_offsets(fn) == offsets
+
+        # ...or its size does.
+        write(fn, TASK + '\n2 Where is nobody? \tnowhere\t1\n')
+        assert len(LazyEpisodes.from_fn(fn)) == 3
+        write(fn, TASK + '\n1 Where is Mary? \tbathroom\t1\n')
+        assert len(LazyEpisodes.from_fn(fn)) == 4
+
+        # An unreadable sidecar is rebuilt.
+        write(idx_f, '{')
+        assert len(LazyEpisodes.from_fn(fn)) == 4
+        with open(idx_f) as f:
+            assert len(json.load(f)['offsets']) == 5
+
+
+def main():
+    test_episodes()
+    test_sidecar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+import json
+
+from panoptes.ling.glue.inflection import Gender
+from panoptes.mind.idea.noun import Noun
+from panoptes.mind.idea.reverb import Reverb
+from panoptes.mind.know.memory import Memory
+
+
+def snapshot(m):
+    """
+    Memory -> everything a transaction may change, in comparable form
+    """
+    ideas = [idea.dump() if idea else None for idea in m.ideas]
+    index = m.noun_index
+    return {
+        'ideas': json.dumps(ideas, sort_keys=True),
+        'place_kinds': sorted(m.place_kinds),
+        'next_clause_id': m.next_clause_id,
+        'x2parent': dict(index.x2parent),
+        'noun2keys': dict(index.noun2keys),
+        'x2keys': dict(index.x2keys),
+        'key2xx': dict([(k, xx) for k, xx in index.key2xx.items() if xx]),
+    }
+
+
+def make_memory():
+    """
+    -> (Memory, index of Mary, index of the kitchen), outside a transaction
+    """
+    m = Memory()
+    mary = m.add_idea(Noun(name=('Mary',), gender=Gender.FEMALE,
+                           kind='person'))
+    kitchen = m.add_idea(Noun(kind='kitchen'))
+    m.add_place_kind('kitchen')
+    return m, mary, kitchen
+
+
+def outer_edits(m, mary, kitchen):
+    m.new_clause_id()
+    m.add_idea(Reverb(mary))
+    m.assign_noun(mary, Noun(attributes=['tall']))
+    m.add_place_kind('garden')
+    m.add_idea(Noun(kind='garden'))
+
+
+def inner_edits(m, mary, kitchen):
+    m.new_clause_id()
+    m.add_idea(Reverb(kitchen))
+    m.assign_noun(mary, Noun(kind='girl', attributes=['happy']))
+    m.edit_idea(mary).carrying.append(kitchen)
+    m.set_idea(kitchen, None)
+    m.add_place_kind('hallway')
+
+
+def test_rollback():
+    m, mary, kitchen = make_memory()
+    before = snapshot(m)
+
+    m.begin()
+    outer_edits(m, mary, kitchen)
+    middle = snapshot(m)
+    assert middle != before
+
+    m.begin()
+    inner_edits(m, mary, kitchen)
+    assert snapshot(m) != middle
+
+    m.rollback()
+    assert snapshot(m) == middle
+
+    m.rollback()
+    assert snapshot(m) == before
+    assert not m.undo_log
+    assert not m.undo_marks
+
+
+def test_rollback_over_commit():
+    m, mary, kitchen = make_memory()
+    before = snapshot(m)
+
+    # Committing a nested transaction folds it into the outer one.
+    m.begin()
+    outer_edits(m, mary, kitchen)
+    m.begin()
+    inner_edits(m, mary, kitchen)
+    m.commit()
+    m.rollback()
+    assert snapshot(m) == before
+
+
+def test_commit():
+    m, mary, kitchen = make_memory()
+
+    m.begin()
+    outer_edits(m, mary, kitchen)
+    m.begin()
+    inner_edits(m, mary, kitchen)
+    m.commit()
+    after = snapshot(m)
+    m.commit()
+    assert snapshot(m) == after
+    assert not m.undo_log
+    assert not m.undo_marks
+
+    assert m.ideas[kitchen] is None
+    assert m.ideas[mary].kind == 'girl'
+    assert m.ideas[mary].attributes == ['happy', 'tall']
+    assert m.ideas[mary].carrying == [kitchen]
+    assert m.place_kinds == set(['kitchen', 'garden', 'hallway'])
+    assert m.next_clause_id == 2
+
+    # Edits outside of a transaction are not logged.
+    m.add_place_kind('office')
+    assert not m.undo_log
+
+
+def main():
+    test_rollback()
+    test_rollback_over_commit()
+    test_commit()
+
+
+if __name__ == '__main__':
+    main()
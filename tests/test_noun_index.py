@@ -0,0 +1,108 @@
+from random import Random
+
+from panoptes.ling.glue.inflection import Gender
+from panoptes.mind.idea.noun import Noun, NounFeatures, Query
+from panoptes.mind.idea.reverb import Reverb
+from panoptes.mind.know.memory import Memory
+
+
+NAMES = [None, ('Mary',), ('John',)]
+GENDERS = [None, Gender.MALE, Gender.FEMALE, Gender.NEUTER]
+KINDS = [None, 'person', 'kitchen', 'garden', 'place']
+ATTRIBUTES = ['tall', 'red']
+QUERIES = [None, None, Query.IDENTITY]
+
+
+def random_attributes(rand):
+    return [s for s in ATTRIBUTES if rand.random() < 0.3]
+
+
+def random_noun(rand, query=True):
+    return Noun(query=rand.choice(QUERIES) if query else None,
+                name=rand.choice(NAMES), gender=rand.choice(GENDERS),
+                attributes=random_attributes(rand), kind=rand.choice(KINDS))
+
+
+def random_features(rand):
+    return NounFeatures(query=rand.choice(QUERIES), name=rand.choice(NAMES),
+                        gender=rand.choice(GENDERS),
+                        attributes=random_attributes(rand),
+                        kind=rand.choice(KINDS))
+
+
+def source_of(m, x):
+    """
+    Memory, memory index -> the Noun it resolves to, or None
+    """
+    idea = m.ideas[x]
+    while isinstance(idea, Reverb):
+        idea = m.ideas[idea.x]
+    return idea if isinstance(idea, Noun) else None
+
+
+def edit(rand, m):
+    """
+    Make one random change to memory.
+    """
+    xx = [x for x in range(len(m.ideas)) if source_of(m, x)]
+    r = rand.random()
+    if r < 0.3 or not xx:
+        m.add_idea(random_noun(rand))
+    elif r < 0.5:
+        m.add_idea(Reverb(rand.choice(xx)))
+    elif r < 0.65:
+        nouns = [x for x in xx if isinstance(m.ideas[x], Noun) and
+                 not m.ideas[x].query]
+        if nouns:
+            m.assign_noun(rand.choice(nouns), random_noun(rand, False))
+    elif r < 0.8:
+        # Don't leave Reverbs pointing at nothing (Memory never does).
+        pointed_to = set([idea.x for idea in m.ideas
+                          if isinstance(idea, Reverb)])
+        x = rand.choice([x for x in xx if x not in pointed_to] or xx)
+        if x in pointed_to:
+            m.set_idea(x, random_noun(rand))
+        else:
+            m.set_idea(x, rand.choice([None, random_noun(rand)]))
+    elif r < 0.9:
+        m.add_place_kind(rand.choice(['kitchen', 'garden']))
+    elif m.undo_marks and r < 0.95:
+        # Undoes adds (NounIndex.remove) as well as replaces.
+        m.rollback()
+    elif m.undo_marks:
+        m.commit()
+    else:
+        m.begin()
+
+
+def check(rand, m):
+    """
+    Every idea that matches the features must be a candidate.
+    """
+    for _ in range(10):
+        f = random_features(rand)
+        candidates = m.noun_index.get_candidates(f, m.place_kinds)
+        assert candidates == sorted(set(candidates), reverse=True)
+        candidates = set(candidates)
+        for x, idea in enumerate(m.ideas):
+            if not source_of(m, x):
+                continue
+            if idea.matches_noun_features(f, m.ideas, m.place_kinds):
+                assert x in candidates
+
+
+def test_superset():
+    for seed in range(10):
+        rand = Random(seed)
+        m = Memory()
+        for _ in range(250):
+            edit(rand, m)
+            check(rand, m)
+
+
+def main():
+    test_superset()
+
+
+if __name__ == '__main__':
+    main()
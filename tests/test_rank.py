@@ -0,0 +1,82 @@
+import json
+
+import yaml
+
+from panoptes.ling.english import English, rank_key
+from panoptes.ling.parse.parser import parses_from_tokens
+from panoptes.ling.tree.base import freeze, json_order
+from tests.test_fixes import FIXED_PARSES_FN, make_tokens
+
+
+# Values whose JSON is tricky to order: empty containers, numbers that are
+# prefixes of each other, strings with characters that sort before a quote.
+EDGE_VALUES = [
+    None, True, False, 0, 9, 10, 1.5, -1, 1e-05, 1e+20, '', 'a', 'a b', 'ab',
+    'a"', 'a\n', 'caf\xe9', [], [[]], [{}], [None], [1], [1, 2], [12], {},
+    {'a': None}, {'a': 1}, {'a': 12}, {'a': []}, {'a': {}}, {'a b': 0},
+    {'a': 0, 'b': 0}, {'b': 0}, {'a': [1, {}]}, {'a': [1, {'b': []}]},
+]
+
+
+def to_json(x):
+    return json.dumps(x, indent=4, sort_keys=True)
+
+
+def values_in(x):
+    """
+    dump -> yields it and every value inside it
+    """
+    yield x
+    if isinstance(x, dict):
+        x = list(x.values())
+    if isinstance(x, list):
+        for y in x:
+            for z in values_in(y):
+                yield z
+
+
+def check_order(xx, key):
+    """
+    list of value, value -> key ->
+    """
+    got = [to_json(x) for x in sorted(xx, key=key)]
+    assert got == sorted(map(to_json, xx))
+
+
+def test_edge_values():
+    xx = []
+    for x in EDGE_VALUES:
+        xx.extend(values_in(x))
+    check_order(xx, lambda x: json_order(freeze(x)))
+
+
+def test_recognized():
+    english = English()
+    allowance = english.budget.start()
+    ssens = []
+    dsens = []
+    for d in yaml.safe_load(open(FIXED_PARSES_FN)):
+        tokens = make_tokens(d['text'], d['spacy'])
+        for parse in parses_from_tokens(tokens, {}):
+            for ssen in english.parse_to_surface.recog(parse, allowance):
+                ssens.append(ssen)
+                dsens.extend(english.surface_to_deep.recog(ssen, allowance))
+    assert ssens and dsens
+
+    for trees in [ssens, dsens]:
+        got = [to_json(t.dump()) for t in sorted(trees, key=rank_key)]
+        assert got == sorted([to_json(t.dump()) for t in trees])
+
+        xx = []
+        for t in trees:
+            xx.extend(values_in(t.dump()))
+        check_order(xx, lambda x: json_order(freeze(x)))
+
+
+def main():
+    test_edge_values()
+    test_recognized()
+
+
+if __name__ == '__main__':
+    main()
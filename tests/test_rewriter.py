@@ -0,0 +1,95 @@
+from panoptes.ling.parse.parser import parses_from_tokens
+from panoptes.ling.parse.rewriter import Rewrite, Rewriter
+from panoptes.ling.parse.shape_cache import TOKEN_RE
+from panoptes.ling.parse.table_backend import TableToken
+
+
+# What spacy says about "NAME is seen by NAME ." (tag, dep, head index).
+SEEN_BY = [('NNP', 'nsubjpass', 2), ('VBZ', 'auxpass', 2),
+           ('VBN', 'ROOT', None), ('IN', 'agent', 2), ('NNP', 'pobj', 3),
+           ('.', 'punct', 2)]
+
+
+def make_tokens(text, spec):
+    """
+    text, list of (tag, dep, head index) -> spacy-style tokens
+    """
+    tokens = []
+    for i, (m, (tag, dep, _)) in enumerate(zip(TOKEN_RE.finditer(text), spec)):
+        tokens.append(TableToken(i, m.start(), m.group(0), tag, dep, None))
+    for t, (_, _, head) in zip(tokens, spec):
+        t.head = t if head is None else tokens[head]
+    return tokens
+
+
+def words_of(text, spec, offset2word):
+    parses = parses_from_tokens(make_tokens(text, spec), offset2word)
+    return [t.text for t in parses[0].tokens]
+
+
+def test_longest_first():
+    r = Rewriter.default()
+    assert r.rewrite('Mary is afraid of John.') == \
+        ('Mary is seen by John.', {8: 'thwacked'})
+    assert r.rewrite('Mary is afraid.') == ('Mary is seen.', {8: 'thwacked'})
+
+    # Whatever order they are given in.
+    r = Rewriter([Rewrite('ab', 'X', None, False),
+                  Rewrite('abc', 'Y', None, False)])
+    assert r.rewrite('abcab abc') == ('YX Y', {})
+
+
+def test_spaced():
+    r = Rewriter.default()
+    assert r.rewrite('Is Fred here?') == ('Is Jameson here?', {3: 'Fred'})
+
+    # Only between two spaces.
+    assert r.rewrite('Fred is here.') == ('Fred is here.', {})
+    assert r.rewrite('Ask Fred.') == ('Ask Fred.', {})
+    assert r.rewrite('I saw Alfred go.') == ('I saw Alfred go.', {})
+
+    # The spaces aren't used up, so neighbors both match.
+    assert r.rewrite('I saw Fred Fred today.') == \
+        ('I saw Jameson Jameson today.', {6: 'Fred', 14: 'Fred'})
+
+
+def test_offsets():
+    r = Rewriter.default()
+
+    # Each offset is where its word ended up after the rewrites before it.
+    text, offset2word = r.rewrite('Then emily was afraid of Fred today.')
+    assert text == 'Then Elliot was seen by Jameson today.'
+    assert offset2word == {5: 'Emily', 16: 'thwacked', 24: 'Fred'}
+
+    text, offset2word = r.rewrite('Following that, Fred left.')
+    assert text == 'After that, Jameson left.'
+    assert offset2word == {12: 'Fred'}
+
+
+def test_restore():
+    r = Rewriter.default()
+
+    # "afraid of" -> "seen by" -> "thwacked by": only the word that differs is
+    # put back.
+    text, offset2word = r.rewrite('Mary is afraid of Fred .')
+    assert text == 'Mary is seen by Jameson .'
+    assert words_of(text, SEEN_BY, offset2word) == \
+        ['Mary', 'is', 'thwacked', 'by', 'Fred', '.']
+
+    # Words that were in the text to begin with are left alone, even if a
+    # rewrite could have put them there.
+    text, offset2word = r.rewrite('Mary is seen by Jameson .')
+    assert offset2word == {}
+    assert words_of(text, SEEN_BY, offset2word) == \
+        ['Mary', 'is', 'seen', 'by', 'Jameson', '.']
+
+
+def main():
+    test_longest_first()
+    test_spaced()
+    test_offsets()
+    test_restore()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+from panoptes.ling.parse.parser import Parser, parses_from_tokens
+from panoptes.ling.parse.shape_cache import ShapeCache, TOKEN_RE
+from panoptes.ling.parse.table_backend import TableToken
+
+
+# What spacy says about "NAME went to the PLACE." (tag, dep, head index).
+WENT_TO = [('NNP', 'nsubj', 1), ('VBD', 'ROOT', None), ('IN', 'prep', 1),
+           ('DT', 'det', 4), ('NN', 'pobj', 2), ('.', 'punct', 1)]
+
+
+def make_tokens(text, spec, words=None):
+    """
+    text, list of (tag, dep, head index), words (default: ours)
+        -> spacy-style tokens
+    """
+    ms = list(TOKEN_RE.finditer(text))
+    if words is None:
+        words = [m.group(0) for m in ms]
+    tokens = []
+    for i, (m, word, (tag, dep, _)) in enumerate(zip(ms, words, spec)):
+        tokens.append(TableToken(i, m.start(), word, tag, dep, None))
+    for t, (_, _, head) in zip(tokens, spec):
+        t.head = t if head is None else tokens[head]
+    return tokens
+
+
+def put(cache, text, spec, words=None, offset2word=None):
+    """
+    ShapeCache, text, spec, words -> list of Parse it was given
+    """
+    offset2word = offset2word or {}
+    tokens = make_tokens(text, spec, words)
+    parses = parses_from_tokens(tokens, offset2word)
+    cache.put(text, offset2word, tokens, parses)
+    return parses
+
+
+def formats(parses):
+    return [p.format() for p in parses]
+
+
+def test_hit():
+    cache = ShapeCache.default()
+    put(cache, 'Mary went to the kitchen.', WENT_TO)
+
+    text = 'John went to the garden.'
+    assert cache.has(text, {})
+    got = cache.get(text, {})
+    want = parses_from_tokens(make_tokens(text, WENT_TO), {})
+    assert formats(got) == formats(want)
+    assert [t.text for t in got[0].tokens] == \
+        ['John', 'went', 'to', 'the', 'garden', '.']
+
+    # Filling a hit leaves the cached parses alone.
+    again = cache.get('Sandra went to the office.', {})
+    assert again[0].tokens[0].text == 'Sandra'
+    assert cache.get(text, {})[0].tokens[0].text == 'John'
+
+    # Other words outside of the slots make another shape.
+    assert not cache.has('John moved to the garden.', {})
+    assert cache.get('John moved to the garden.', {}) is None
+
+
+def test_refusals():
+    text = 'Mary went to the kitchen.'
+    other = 'John went to the garden.'
+
+    # Spacy tokenized it differently from us.
+    cache = ShapeCache.default()
+    words = ['Mary', 'went', 'to', 'the', 'kitchen', '!']
+    put(cache, text, WENT_TO, words)
+    assert not cache.has(other, {})
+
+    # A slot word didn't get the slot's tag.
+    cache = ShapeCache.default()
+    spec = [('NN', 'nsubj', 1)] + WENT_TO[1:]
+    put(cache, text, spec)
+    assert not cache.has(other, {})
+
+    # The parse cased a slot word other than as written or lowercase.
+    cache = ShapeCache.default()
+    tokens = make_tokens(text, WENT_TO)
+    parses = parses_from_tokens(tokens, {})
+    parses[0].tokens[0].text = 'MARY'
+    cache.put(text, {}, tokens, parses)
+    assert not cache.has(other, {})
+
+    # No slots to fill, so nothing worth caching.
+    cache = ShapeCache.default()
+    put(cache, 'He went to the bank.', WENT_TO)
+    assert not cache.shape2skeleton
+
+
+def test_restores():
+    # The words the rewriter will restore are part of the shape.
+    cache = ShapeCache.default()
+    text = 'Mary went to the kitchen.'
+    put(cache, text, WENT_TO, offset2word={5: 'journeyed'})
+    assert not cache.has('John went to the garden.', {})
+    assert cache.has('John went to the garden.', {5: 'journeyed'})
+    got = cache.get('John went to the garden.', {5: 'journeyed'})
+    assert got[0].tokens[1].text == 'journeyed'
+
+
+def test_opt_in():
+    # Off unless asked for, as it makes parses depend on the input order.
+    assert Parser(backends=[]).shape_cache is None
+    assert Parser(backends=[], cache_shapes=True).shape_cache is not None
+
+
+def main():
+    test_hit()
+    test_refusals()
+    test_restores()
+    test_opt_in()
+
+
+if __name__ == '__main__':
+    main()
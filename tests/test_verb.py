@@ -7,7 +7,7 @@ from panoptes.ling.verb.verb_manager import VerbManager
 
 def main():
     conj_f = 'panoptes/ling/verb/conjugations.csv'
-    verb_f = 'data/verbs.json'
+    verb_f = 'data/verbs.bin'
     m = VerbManager.from_files(conj_f, verb_f)
 
     j = {